@@ -1,10 +1,42 @@
-from .input_output.Input import Input
-from .input_output.InputCNS import InputCNS
-from .geometry.Prototype import Prototype
-from .fuzzy.FuzzyColorSpace import FuzzyColorSpace
-from .interface.modules.VisualManager import VisualManager
-from .colorspace.ReferenceDomain import ReferenceDomain
-from .geometry.Point import Point
-from .interface.modules.ImageManager import ImageManager
-from .interface.modules.FuzzyColorSpaceManager import FuzzyColorSpaceManager
-from .interface.modules.ColorEvaluationManager import ColorEvaluationManager
+import importlib
+
+
+"""
+PyFCS package
+
+The public classes below are loaded on first access (module __getattr__), so
+`import Source` stays cheap and importing the fuzzy engine does not pull in the
+GUI stack (tkinter, matplotlib, plotly, scikit-learn, pandas). Headless code
+should import from Source.core, which only exposes the GUI-free subpackages:
+geometry, fuzzy, membership, colorspace and input_output.
+"""
+
+
+_LAZY_ATTRIBUTES = {
+    "Input": "Source.input_output.Input",
+    "InputCNS": "Source.input_output.InputCNS",
+    "Prototype": "Source.geometry.Prototype",
+    "FuzzyColorSpace": "Source.fuzzy.FuzzyColorSpace",
+    "VisualManager": "Source.interface.modules.VisualManager",
+    "ReferenceDomain": "Source.colorspace.ReferenceDomain",
+    "Point": "Source.geometry.Point",
+    "ImageManager": "Source.interface.modules.ImageManager",
+    "FuzzyColorSpaceManager": "Source.interface.modules.FuzzyColorSpaceManager",
+    "ColorEvaluationManager": "Source.interface.modules.ColorEvaluationManager",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,294 @@
+import os
+import sys
+import csv
+import glob
+import time
+import argparse
+import numpy as np
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+### my libraries ###
+from Source.input_output.Input import Input
+from Source.geometry.Prototype import Prototype
+from Source.fuzzy.FuzzyColorSpace import FuzzyColorSpace
+from Source.core import labelmaps
+
+
+"""
+Headless batch processing for PyFCS
+
+Entry point for running image mapping without the Tk GUI:
+
+    python -m Source.batch map COLOR_SPACE INPUT [INPUT ...] -o OUTPUT_DIR [options]
+
+COLOR_SPACE is a .fcs or .cns file. Each INPUT is an image file, a directory
+(scanned for images) or a glob pattern. For every image the command writes:
+    - <name>_labels.npy   best-prototype label map (int16, -1 = unassigned/transparent)
+    - <name>_mapped.png   recolored label map (via labelmaps.recolor_label_map)
+    - <name>_coverage.csv per-prototype pixel counts and percentages
+
+Images are processed in parallel worker processes. The color space is loaded
+once per worker (in the pool initializer), not once per image. Only the
+GUI-free Source.core helpers are imported, so no display or tkinter is needed.
+"""
+
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".webp"}
+
+# Per-process state filled by _init_worker
+_WORKER_STATE = {}
+
+
+# ============================================================================================================================================================
+#  COLOR SPACE / INPUT HELPERS
+# ============================================================================================================================================================
+
+def load_fuzzy_color_space(file_path):
+    """
+    Load a .fcs or .cns file and return a ready-to-query FuzzyColorSpace.
+
+    .fcs files already store the geometry; .cns files are built from their
+    prototypes, as PyFCSApp.update_volumes does.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    input_class = Input.instance(extension)
+
+    if extension == ".fcs":
+        _color_data, fuzzy_color_space = input_class.read_file(file_path)
+    else:
+        color_data = input_class.read_file(file_path)
+        prototypes = [
+            Prototype(
+                label=color_name,
+                positive=color_value["positive_prototype"],
+                negatives=color_value["negative_prototypes"]
+            )
+            for color_name, color_value in color_data.items()
+        ]
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        fuzzy_color_space = FuzzyColorSpace(space_name=name, prototypes=prototypes)
+
+    fuzzy_color_space.precompute_pack()
+    return fuzzy_color_space
+
+
+def collect_images(inputs, recursive=False):
+    """
+    Expand files, directories and glob patterns into a sorted list of image paths.
+    """
+    found = []
+
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        elif os.path.isfile(item):
+            candidates = [item]
+        else:
+            candidates = glob.glob(item, recursive=recursive)
+
+        for path in candidates:
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+                found.append(os.path.abspath(path))
+
+    # Keep order deterministic and drop duplicates
+    return sorted(set(found))
+
+
+def assign_output_names(image_paths):
+    """
+    Return a unique output base name per image (file stem, suffixed on collisions).
+    """
+    names = {}
+    used = set()
+
+    for path in image_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        suffix = 2
+        while name in used:
+            name = f"{stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        names[path] = name
+
+    return names
+
+
+# ============================================================================================================================================================
+#  WORKER
+# ============================================================================================================================================================
+
+def _init_worker(color_space_path, palette_scheme):
+    """Load the color space and palettes once for this worker process."""
+    fuzzy_color_space = load_fuzzy_color_space(color_space_path)
+    prototypes = fuzzy_color_space.get_prototypes()
+
+    if palette_scheme == "original":
+        palette = labelmaps.build_original_palette_uint8(prototypes)
+    else:
+        palette = labelmaps.build_alt_palette_uint8(prototypes, fuzzy_color_space.get_hex_colors())
+
+    _WORKER_STATE["fuzzy_color_space"] = fuzzy_color_space
+    _WORKER_STATE["prototypes"] = prototypes
+    _WORKER_STATE["palette"] = palette
+
+
+def _map_image(image_path, output_dir, output_name, max_side=None, write_labels=True, write_png=True, write_csv=True):
+    """
+    Map one image with the worker's color space and write the requested outputs.
+
+    Returns (image_path, error_message_or_None, elapsed_seconds).
+    """
+    start = time.perf_counter()
+
+    try:
+        fuzzy_color_space = _WORKER_STATE["fuzzy_color_space"]
+        prototypes = _WORKER_STATE["prototypes"]
+
+        pil_img = Image.open(image_path).convert("RGBA")
+
+        if max_side is not None and max_side > 0 and max(pil_img.size) > max_side:
+            scale = float(max_side) / float(max(pil_img.size))
+            new_size = (max(1, int(pil_img.width * scale)), max(1, int(pil_img.height * scale)))
+            pil_img = pil_img.resize(new_size, Image.Resampling.LANCZOS)
+
+        valid_mask = labelmaps.alpha_mask_from_pil(pil_img)
+        processing_img = labelmaps.rgb_for_processing(pil_img)
+
+        label_map = labelmaps.best_prototype_label_map(
+            image=processing_img,
+            fuzzy_color_space=fuzzy_color_space,
+            valid_mask=valid_mask
+        )
+
+        base = os.path.join(output_dir, output_name)
+
+        if write_labels:
+            np.save(f"{base}_labels.npy", label_map.astype(np.int16))
+
+        if write_png:
+            recolored = labelmaps.recolor_label_map(label_map, _WORKER_STATE["palette"])
+            Image.fromarray(recolored, mode="RGBA").save(f"{base}_mapped.png")
+
+        if write_csv:
+            # Exact pixel counts; percentages are derived from them
+            counts, valid_total = labelmaps.proto_pixel_counts(
+                label_map,
+                valid_mask=valid_mask,
+                n_prototypes=len(prototypes)
+            )
+            with open(f"{base}_coverage.csv", "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["prototype", "pixels", "percentage"])
+                for i, prototype in enumerate(prototypes):
+                    writer.writerow([
+                        prototype.label,
+                        int(counts[i]),
+                        f"{100.0 * counts[i] / valid_total if valid_total else 0.0:.4f}"
+                    ])
+
+        return image_path, None, time.perf_counter() - start
+
+    except Exception as e:
+        return image_path, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+# ============================================================================================================================================================
+#  COMMANDS
+# ============================================================================================================================================================
+
+def run_map(args):
+    """Run the 'map' command. Returns the process exit code."""
+    image_paths = collect_images(args.inputs, recursive=args.recursive)
+    if not image_paths:
+        print("No images found.", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    output_names = assign_output_names(image_paths)
+
+    workers = args.workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(image_paths)))
+
+    task_kwargs = {
+        "max_side": args.max_side,
+        "write_labels": not args.no_labels,
+        "write_png": not args.no_png,
+        "write_csv": not args.no_csv,
+    }
+
+    total = len(image_paths)
+    failures = 0
+    done = 0
+
+    def report(result):
+        nonlocal done, failures
+        path, error, elapsed = result
+        done += 1
+        if error is None:
+            print(f"[{done}/{total}] {os.path.basename(path)} ({elapsed:.2f}s)")
+        else:
+            failures += 1
+            print(f"[{done}/{total}] {os.path.basename(path)} FAILED: {error}", file=sys.stderr)
+
+    if workers == 1:
+        _init_worker(args.color_space, args.palette)
+        for path in image_paths:
+            report(_map_image(path, args.output, output_names[path], **task_kwargs))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(args.color_space, args.palette)
+        ) as executor:
+            futures = [
+                executor.submit(_map_image, path, args.output, output_names[path], **task_kwargs)
+                for path in image_paths
+            ]
+            for future in as_completed(futures):
+                report(future.result())
+
+    print(f"Mapped {total - failures}/{total} images into {args.output}")
+    return 1 if failures else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m Source.batch",
+        description="Headless batch processing with PyFCS fuzzy color spaces."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    map_parser = subparsers.add_parser(
+        "map",
+        help="Compute best-prototype label maps, recolored images and coverage CSVs."
+    )
+    map_parser.add_argument("color_space", help="Path to a .fcs or .cns file.")
+    map_parser.add_argument("inputs", nargs="+", help="Image files, directories or glob patterns.")
+    map_parser.add_argument("-o", "--output", required=True, help="Output directory.")
+    map_parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    map_parser.add_argument("-r", "--recursive", action="store_true", help="Recurse into input directories.")
+    map_parser.add_argument("--max-side", type=int, default=None, help="Downscale images so the longest side fits.")
+    map_parser.add_argument(
+        "--palette",
+        choices=("alt", "original"),
+        default="alt",
+        help="Recolor with representative prototype colors (alt) or the high-contrast palette (original)."
+    )
+    map_parser.add_argument("--no-labels", action="store_true", help="Do not write label maps.")
+    map_parser.add_argument("--no-png", action="store_true", help="Do not write recolored PNGs.")
+    map_parser.add_argument("--no-csv", action="store_true", help="Do not write coverage CSVs.")
+    map_parser.set_defaults(func=run_map)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
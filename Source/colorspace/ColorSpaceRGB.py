@@ -1,3 +1,4 @@
+import numpy as np
 from Source.colorspace.ColorSpace import ColorSpace
 from skimage import color
 
@@ -14,4 +15,20 @@ class ColorSpaceRGB(ColorSpace):
     def convert_from(cls, lab):
         # Conversion from RGB to LAB
         rgb_color = color.lab2rgb(lab)
-        return rgb_color
\ No newline at end of file
+        return rgb_color
+
+    @staticmethod
+    def from_lab_array(lab_array):
+        # Vectorized LAB -> sRGB for N colors: (N, 3) LAB to (N, 3) uint8,
+        # matching UtilsTools.lab_to_rgb row by row
+        lab_array = np.asarray(lab_array, dtype=float).reshape(-1, 3)
+        if lab_array.shape[0] == 0:
+            return np.zeros((0, 3), dtype=np.uint8)
+
+        rgb_float = np.clip(color.lab2rgb(lab_array), 0, 1)
+        return np.round(rgb_float * 255).astype(np.uint8)
+
+    @staticmethod
+    def to_hex_array(rgb_array):
+        # (N, 3) uint8 RGB to a list of '#rrggbb' strings
+        return ["#{:02x}{:02x}{:02x}".format(r, g, b) for r, g, b in np.asarray(rgb_array, dtype=np.uint8).tolist()]
@@ -1,9 +1,16 @@
+import functools
+import numpy as np
+
 from Source.geometry.Volume import Volume
 from Source.geometry.Point import Point
 from Source.geometry.Face import Face
 from Source.geometry.Plane import Plane
 
 
+# LAB box used to close the Voronoi cells
+DEFAULT_VORONOI_BOUNDS = (0, 100, -128, 128, -128, 128)
+
+
 class ReferenceDomain:
     def __init__(self, c1min, c1max, c2min, c2max, c3min, c3max):
         self.comp1 = [c1min, c1max]
@@ -13,10 +20,39 @@ class ReferenceDomain:
         self.dimension = 3
         self.reference = [self.comp1, self.comp2, self.comp3]
         self.volume = self.create_volume()
+        self._packed = None
 
     @staticmethod
     def default_voronoi_reference_domain():
-        return ReferenceDomain(0, 100, -128, 128, -128, 128)
+        """Shared, read-only domain used to close Voronoi cells (see cached)."""
+        return ReferenceDomain.cached(*DEFAULT_VORONOI_BOUNDS)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def cached(c1min, c1max, c2min, c2max, c3min, c3max):
+        """
+        One shared ReferenceDomain per set of bounds, so hot paths never rebuild
+        the box. It is shared by every caller and frozen: its face list is a
+        tuple and its packed arrays are read-only. Copy the volume to modify it.
+        """
+        domain = ReferenceDomain(c1min, c1max, c2min, c2max, c3min, c3max)
+        domain.volume.faces = tuple(domain.volume.faces)
+        domain.get_packed()
+        return domain
+
+    def get_packed(self):
+        """
+        (6, 4) plane coefficients and (3,) representative of the domain volume,
+        in the FuzzyColor.pack_volume layout. Built once, read-only.
+        """
+        if self._packed is None:
+            rep = self.volume.getRepresentative()
+            planes = np.asarray([face.getPlane().getPlane() for face in self.volume.getFaces()], dtype=np.float64)
+            rep = np.array([rep.x, rep.y, rep.z], dtype=np.float64)
+            planes.setflags(write=False)
+            rep.setflags(write=False)
+            self._packed = {"planes": planes, "rep": rep}
+        return self._packed
 
     def get_domain(self, dimension):
         return self.comp1 if dimension == 0 else (self.comp2 if dimension == 1 else self.comp3)
@@ -74,7 +110,7 @@ class ReferenceDomain:
         )
 
     def transform_default_domain(self, x):
-        return self.transform(x, ReferenceDomain(0, 1, 0, 1, 0, 1))
+        return self.transform(x, ReferenceDomain.cached(0, 1, 0, 1, 0, 1))
 
     def get_dimension(self):
         return self.dimension
@@ -0,0 +1,47 @@
+import importlib
+
+
+"""
+PyFCS core
+
+GUI-free entry point to the fuzzy color engine: geometry, fuzzy, membership,
+colorspace and input_output. Nothing here imports tkinter, matplotlib, plotly,
+scikit-learn or pandas, so headless workers start quickly:
+
+    from Source.core import Input, FuzzyColorSpace
+
+Classes are loaded on first access, like in the top-level Source package.
+"""
+
+
+_LAZY_ATTRIBUTES = {
+    "Input": "Source.input_output.Input",
+    "InputCNS": "Source.input_output.InputCNS",
+    "InputFCS": "Source.input_output.InputFCS",
+    "Prototype": "Source.geometry.Prototype",
+    "Point": "Source.geometry.Point",
+    "Plane": "Source.geometry.Plane",
+    "Face": "Source.geometry.Face",
+    "Volume": "Source.geometry.Volume",
+    "FuzzyColor": "Source.fuzzy.FuzzyColor",
+    "FuzzyColorSpace": "Source.fuzzy.FuzzyColorSpace",
+    "MembershipFunction": "Source.membership.MembershipFunction",
+    "ReferenceDomain": "Source.colorspace.ReferenceDomain",
+    "get_base_path": "Source.core.paths",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,312 @@
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+
+
+"""
+Module summary
+--------------
+Lightweight timers and counters for the main PyFCS stages (LAB conversion,
+np.unique, membership evaluation, Voronoi construction, .fcs I/O, GUI jobs and
+redraws).
+
+Instrumentation is off by default and then costs one global flag check per
+instrumented call. It is switched on with enable() or with environment variables
+read at import time:
+
+    PYFCS_INSTRUMENT=1              collect timers and counters
+    PYFCS_INSTRUMENT_JSON=path      ... and write the report to path at exit
+    PYFCS_INSTRUMENT_TRACE=path     ... and write a Chrome trace (chrome://tracing,
+                                    Perfetto) to path at exit
+
+Usage in the code base:
+
+    with instrumentation.stage("image.unique"):
+        ...
+
+    @instrumentation.timed("fcs.read_file")
+    def read_file(...):
+        ...
+
+    instrumentation.count("image.unique_colors", n)
+
+report() returns per-stage totals (calls, total/mean/min/max seconds) with a
+log2 histogram of durations, plus the counters. Stages are recorded per process;
+work done inside process-pool workers is only visible as the parent's waiting
+stage.
+"""
+
+
+ENV_ENABLE = "PYFCS_INSTRUMENT"
+ENV_JSON = "PYFCS_INSTRUMENT_JSON"
+ENV_TRACE = "PYFCS_INSTRUMENT_TRACE"
+
+# Upper bound on Chrome trace events kept in memory (oldest events are kept)
+MAX_TRACE_EVENTS = 500_000
+
+# Histogram buckets: bucket k holds durations in [2^(k-1), 2^k) microseconds
+_HISTOGRAM_BUCKETS = 40
+
+_enabled = False
+_trace = False
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_events = []
+_thread_names = {}
+_origin_ns = time.perf_counter_ns()
+
+
+class _NullStage:
+    """Shared no-op context manager returned by stage() while disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "trace", "start_ns")
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, self.start_ns, time.perf_counter_ns() - self.start_ns, self.trace)
+        return False
+
+
+# ============================================================================================================================================================
+#  SWITCHES
+# ============================================================================================================================================================
+
+def enable(trace=False):
+    """Start collecting. With trace=True, every traced stage is also kept as a Chrome trace event."""
+    global _enabled, _trace
+    _trace = bool(trace)
+    _enabled = True
+
+
+def disable():
+    """Stop collecting (collected data is kept until reset())."""
+    global _enabled, _trace
+    _enabled = False
+    _trace = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drop every collected timer, counter and trace event."""
+    global _origin_ns
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        del _events[:]
+        _thread_names.clear()
+        _origin_ns = time.perf_counter_ns()
+
+
+# ============================================================================================================================================================
+#  RECORDING
+# ============================================================================================================================================================
+
+def stage(name, trace=True):
+    """
+    Context manager timing a stage. Nested stages are recorded independently.
+    trace=False keeps the stage out of the Chrome trace (for per-color calls).
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, trace)
+
+
+def timed(name, trace=True):
+    """Decorator timing every call of a function as stage `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, start_ns, time.perf_counter_ns() - start_ns, trace)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Add n to counter `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def record(name, seconds, trace=False):
+    """Record an externally measured duration (e.g. time a job spent queued)."""
+    if not _enabled:
+        return
+    duration_ns = int(max(0.0, seconds) * 1e9)
+    _record(name, time.perf_counter_ns() - duration_ns, duration_ns, trace)
+
+
+def _record(name, start_ns, duration_ns, trace):
+    bucket = min(_HISTOGRAM_BUCKETS - 1, (duration_ns // 1000).bit_length())
+
+    with _lock:
+        entry = _stages.get(name)
+        if entry is None:
+            entry = _stages[name] = {
+                "calls": 0,
+                "total_ns": 0,
+                "min_ns": duration_ns,
+                "max_ns": duration_ns,
+                "histogram": [0] * _HISTOGRAM_BUCKETS,
+            }
+
+        entry["calls"] += 1
+        entry["total_ns"] += duration_ns
+        entry["min_ns"] = min(entry["min_ns"], duration_ns)
+        entry["max_ns"] = max(entry["max_ns"], duration_ns)
+        entry["histogram"][bucket] += 1
+
+        if trace and _trace and len(_events) < MAX_TRACE_EVENTS:
+            thread = threading.current_thread()
+            _thread_names.setdefault(thread.ident, thread.name)
+            _events.append((name, start_ns, duration_ns, thread.ident))
+
+
+# ============================================================================================================================================================
+#  EXPORT
+# ============================================================================================================================================================
+
+def report():
+    """
+    Snapshot of the collected data:
+
+        {"stages": {name: {"calls", "total_s", "mean_s", "min_s", "max_s",
+                           "histogram": {"upper_us": [...], "counts": [...]}}},
+         "counters": {name: value}}
+
+    Histogram bucket i counts calls shorter than upper_us[i] microseconds and
+    at least as long as upper_us[i - 1]; empty trailing buckets are dropped.
+    """
+    with _lock:
+        stages = {name: dict(entry, histogram=list(entry["histogram"])) for name, entry in _stages.items()}
+        counters = dict(_counters)
+
+    result = {}
+    for name in sorted(stages):
+        entry = stages[name]
+        counts = entry["histogram"]
+        last = max((i for i, c in enumerate(counts) if c), default=-1) + 1
+        result[name] = {
+            "calls": entry["calls"],
+            "total_s": entry["total_ns"] / 1e9,
+            "mean_s": entry["total_ns"] / 1e9 / entry["calls"],
+            "min_s": entry["min_ns"] / 1e9,
+            "max_s": entry["max_ns"] / 1e9,
+            "histogram": {
+                "upper_us": [2 ** i for i in range(last)],
+                "counts": counts[:last],
+            },
+        }
+
+    return {"stages": result, "counters": dict(sorted(counters.items()))}
+
+
+def write_json(path):
+    """Write report() to path as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report(), f, indent=2)
+
+
+def write_chrome_trace(path):
+    """
+    Write the traced stages as a Chrome trace file (Trace Event Format), readable
+    by chrome://tracing and Perfetto. Counters are added as final counter events.
+    Only stages recorded after enable(trace=True) are included.
+    """
+    pid = os.getpid()
+
+    with _lock:
+        events = list(_events)
+        thread_names = dict(_thread_names)
+        counters = dict(_counters)
+        origin_ns = _origin_ns
+
+    trace_events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in thread_names.items()
+    ]
+
+    end_us = 0.0
+    for name, start_ns, duration_ns, tid in events:
+        ts = (start_ns - origin_ns) / 1000.0
+        trace_events.append({
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": ts,
+            "dur": duration_ns / 1000.0,
+            "pid": pid,
+            "tid": tid,
+        })
+        end_us = max(end_us, ts + duration_ns / 1000.0)
+
+    for name, value in sorted(counters.items()):
+        trace_events.append({"name": name, "ph": "C", "ts": end_us, "pid": pid, "args": {"value": value}})
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+
+def _write_at_exit(json_path, trace_path):
+    try:
+        if json_path:
+            write_json(json_path)
+        if trace_path:
+            write_chrome_trace(trace_path)
+    except OSError as e:
+        print(f"Could not write instrumentation output: {e}")
+
+
+def _enable_from_environment():
+    json_path = os.environ.get(ENV_JSON)
+    trace_path = os.environ.get(ENV_TRACE)
+    flag = os.environ.get(ENV_ENABLE, "").strip().lower()
+
+    if flag in ("1", "true", "yes", "on") or json_path or trace_path:
+        enable(trace=bool(trace_path))
+
+        if json_path or trace_path:
+            import multiprocessing
+
+            # Worker processes inherit the variables but must not overwrite the parent's files
+            if multiprocessing.parent_process() is not None:
+                return
+            atexit.register(_write_at_exit, json_path, trace_path)
+
+
+_enable_from_environment()
@@ -0,0 +1,329 @@
+import numpy as np
+from skimage import color
+
+### my libraries ###
+from Source.core import instrumentation
+
+
+"""
+Module summary
+--------------
+GUI-free helpers to map images onto a fuzzy color space.
+
+It provides:
+    - Alpha masks and RGB/LAB conversion of PIL images.
+    - Best-prototype label maps computed over the unique colors of an image.
+    - Per-prototype coverage of a label map or membership stack.
+    - Visualization palettes and recoloring of label maps into RGBA images.
+
+The Tk interface (ImageManager) and the headless batch CLI share these
+functions. Nothing here imports tkinter, scikit-learn or pandas; matplotlib is
+only imported by build_original_palette_uint8, when it is called.
+"""
+
+
+# Unique colors per vectorized membership call in best_prototype_label_map
+MEMBERSHIP_BATCH_SIZE = 2048
+
+
+# ============================================================================================================================================================
+#  IMAGE CONVERSION
+# ============================================================================================================================================================
+
+def alpha_mask_from_pil(pil_img):
+    """
+    Returns a boolean mask where True means valid visible pixel.
+    If the image has no alpha channel, all pixels are valid.
+    """
+    if pil_img.mode == "RGBA":
+        alpha = np.array(pil_img.getchannel("A"))
+        return alpha > 0
+
+    return np.ones((pil_img.height, pil_img.width), dtype=bool)
+
+
+def rgb_for_processing(pil_img):
+    """
+    Returns an RGB version for LAB processing.
+    Transparent pixels are kept as RGB but will be ignored using the alpha mask.
+    """
+    return pil_img.convert("RGB")
+
+
+def apply_alpha_to_rgb_array(rgb_array, valid_mask):
+    """
+    Converts an RGB array into RGBA, using valid_mask as alpha.
+    Transparent pixels get alpha 0.
+    """
+    rgb = rgb_array.astype(np.uint8)
+
+    rgba = np.zeros((rgb.shape[0], rgb.shape[1], 4), dtype=np.uint8)
+    rgba[..., :3] = rgb
+    rgba[..., 3] = np.where(valid_mask, 255, 0).astype(np.uint8)
+
+    return rgba
+
+
+def pil_to_rgb_uint8(image):
+    """Return a uint8 RGB NumPy array from a PIL image, safely handling grayscale/RGBA images."""
+    img_np = np.asarray(image)
+
+    if img_np.ndim == 2:
+        img_np = np.stack([img_np, img_np, img_np], axis=-1)
+    elif img_np.shape[-1] > 3:
+        img_np = img_np[..., :3]
+
+    return img_np.astype(np.uint8, copy=False)
+
+
+def pil_to_lab_image(image):
+    """Convert a PIL image to LAB using skimage, returning an H x W x 3 float array."""
+    with instrumentation.stage("image.lab_conversion"):
+        img01 = pil_to_rgb_uint8(image).astype(np.float32) / 255.0
+        return color.rgb2lab(img01)
+
+
+# ============================================================================================================================================================
+#  LABEL MAPS
+# ============================================================================================================================================================
+
+def lab_from_scaled(lab_int):
+    """(N, 3) float64 LAB from int LAB scaled by 100, rounded through float32 as the scalar paths do."""
+    return (np.asarray(lab_int).astype(np.float32) / 100.0).astype(np.float64)
+
+
+def best_labels_for_lab_chunk(fuzzy_color_space, lab_chunk):
+    """
+    Best-prototype index for each LAB value (int32, scaled by 100) in lab_chunk.
+    Module-level so it can run in a JobScheduler process pool.
+    """
+    return fuzzy_color_space.best_prototype_indices_from_lab(lab_from_scaled(lab_chunk))
+
+
+def image_uniques(image):
+    """
+    Unique LAB colors (scaled by 100) of a PIL image and the flat inverse index.
+    Returns (uniq, inv, height, width).
+    """
+    lab_image = pil_to_lab_image(image)
+    height, width = lab_image.shape[:2]
+
+    with instrumentation.stage("image.unique"):
+        lab_int = np.round(lab_image.reshape(-1, 3) * 100.0).astype(np.int32)
+        uniq, inv = np.unique(lab_int, axis=0, return_inverse=True)
+
+    instrumentation.count("image.pixels", height * width)
+    instrumentation.count("image.unique_colors", int(uniq.shape[0]))
+
+    return uniq, inv.reshape(-1), height, width
+
+
+@instrumentation.timed("image.expand")
+def finish_label_map(flat_labels, height, width, valid_mask):
+    """Reshape per-pixel labels to (H, W) int32, with -1 where valid_mask is False."""
+    label_map = flat_labels.reshape(height, width).astype(np.int32)
+
+    if valid_mask is not None:
+        if valid_mask.shape != label_map.shape:
+            raise ValueError("valid_mask shape does not match the generated label map.")
+        label_map[~valid_mask] = -1
+
+    return label_map
+
+
+def best_prototype_label_map(image, fuzzy_color_space, valid_mask=None):
+    """
+    Best-prototype label map of a PIL image, evaluated once per unique color.
+
+    Returns:
+        np.ndarray of shape (H, W), dtype int32.
+        Pixels outside valid_mask are -1.
+    """
+    fuzzy_color_space.precompute_pack()
+
+    uniq, inv, height, width = image_uniques(image)
+    instrumentation.count("image.evaluated_colors", int(uniq.shape[0]))
+
+    best_for_uniq = np.empty((uniq.shape[0],), dtype=np.int32)
+    with instrumentation.stage("image.classify"):
+        for start in range(0, uniq.shape[0], MEMBERSHIP_BATCH_SIZE):
+            stop = start + MEMBERSHIP_BATCH_SIZE
+            best_for_uniq[start:stop] = best_labels_for_lab_chunk(fuzzy_color_space, uniq[start:stop])
+
+    return finish_label_map(best_for_uniq[inv], height, width, valid_mask)
+
+
+# ============================================================================================================================================================
+#  COVERAGE
+# ============================================================================================================================================================
+
+def proto_pixel_counts(label_map=None, membership_stack=None, valid_mask=None, n_prototypes=None, alpha_cuts=None):
+    """
+    Number of valid pixels covered by every prototype in a single pass.
+
+    - With a best-prototype label map, counts are a np.bincount of the labels.
+    - With a membership stack (H, W, P), a pixel covers prototype p when its
+      membership reaches alpha_cuts[p] (default 0.5, i.e. the 128 threshold
+      used by ImageManager.estimate_proto_coverage). uint8 stacks are read as
+      value / 255.
+    - With both, a labelled pixel only counts if it also passes the alpha-cut
+      of its label.
+
+    Returns:
+        (counts, valid_total): int64 array of shape (P,) and the number of
+        valid pixels.
+    """
+    if label_map is None and membership_stack is None:
+        raise ValueError("A label map or a membership stack is required.")
+
+    shape = label_map.shape if label_map is not None else membership_stack.shape[:2]
+
+    if n_prototypes is None:
+        if membership_stack is not None:
+            n_prototypes = int(membership_stack.shape[-1])
+        else:
+            n_prototypes = int(label_map.max()) + 1 if label_map.size else 0
+
+    if valid_mask is None:
+        valid_mask = np.ones(shape, dtype=bool)
+    elif valid_mask.shape != shape:
+        raise ValueError("valid_mask shape does not match the label map.")
+
+    valid_total = int(np.count_nonzero(valid_mask))
+    if valid_total == 0 or n_prototypes == 0:
+        return np.zeros((n_prototypes,), dtype=np.int64), valid_total
+
+    cuts = np.broadcast_to(
+        np.asarray(0.5 if alpha_cuts is None else alpha_cuts, dtype=np.float64),
+        (n_prototypes,)
+    )
+
+    if membership_stack is not None:
+        values = membership_stack[valid_mask]
+        if values.dtype == np.uint8:
+            passes = values >= np.ceil(cuts * 255.0 - 1e-9)
+        else:
+            passes = values >= cuts
+
+    if label_map is not None:
+        labels = label_map[valid_mask].astype(np.int64, copy=False)
+        keep = (labels >= 0) & (labels < n_prototypes)
+
+        if membership_stack is not None:
+            rows = np.flatnonzero(keep)
+            keep[rows] = passes[rows, labels[rows]]
+
+        counts = np.bincount(labels[keep], minlength=n_prototypes)[:n_prototypes]
+    else:
+        counts = np.count_nonzero(passes, axis=0)
+
+    return counts.astype(np.int64, copy=False), valid_total
+
+
+def estimate_all_proto_coverage(label_map=None, membership_stack=None, valid_mask=None, n_prototypes=None, alpha_cuts=None):
+    """
+    Percentage of valid pixels covered by every prototype (see proto_pixel_counts).
+
+    Returns:
+        np.ndarray of shape (P,), percentages in [0, 100].
+    """
+    counts, valid_total = proto_pixel_counts(label_map, membership_stack, valid_mask, n_prototypes, alpha_cuts)
+    if valid_total == 0:
+        return np.zeros(counts.shape, dtype=np.float64)
+
+    return 100.0 * counts.astype(np.float64) / valid_total
+
+
+# ============================================================================================================================================================
+#  PALETTES
+# ============================================================================================================================================================
+
+def build_original_palette_uint8(prototypes):
+    """
+    Build a dynamic high-contrast visualization palette in prototype order.
+    """
+    n = len(prototypes)
+    if n == 0:
+        return np.zeros((0, 3), dtype=np.uint8)
+
+    # Colormaps only; importing matplotlib does not start a GUI backend
+    import matplotlib
+
+    qualitative_cmaps = ["tab20", "tab20b", "tab20c", "Set3", "Dark2", "Accent"]
+    colors = []
+
+    for cmap_name in qualitative_cmaps:
+        cmap = matplotlib.colormaps[cmap_name]
+        for i in range(cmap.N):
+            rgb01 = np.array(cmap(i)[:3], dtype=float)
+            colors.append((np.clip(rgb01, 0, 1) * 255).astype(np.uint8))
+            if len(colors) >= n:
+                break
+        if len(colors) >= n:
+            break
+
+    if len(colors) < n:
+        remaining = n - len(colors)
+        hsv = matplotlib.colormaps["hsv"].resampled(remaining)
+        for i in range(remaining):
+            rgb01 = np.array(hsv(i)[:3], dtype=float)
+            colors.append((np.clip(rgb01, 0, 1) * 255).astype(np.uint8))
+
+    palette = []
+    for i, prototype in enumerate(prototypes):
+        rgb255 = colors[i].copy()
+        if getattr(prototype, "label", "").lower() == "black":
+            rgb255 = np.array([0, 0, 0], dtype=np.uint8)
+        palette.append(rgb255)
+
+    return np.stack(palette, axis=0).astype(np.uint8)
+
+
+def build_alt_palette_uint8(prototypes, hex_color):
+    """
+    Build the representative-color palette using the colors stored in hex_color:
+    a list aligned with prototypes (FuzzyColorSpace.get_hex_colors) or a dict
+    whose keys are in prototype order.
+    """
+    if isinstance(hex_color, dict):
+        hex_colors = list(hex_color.keys())
+    else:
+        hex_colors = list(hex_color or [])
+
+    alt = []
+    for i, _prototype in enumerate(prototypes):
+        rgb = np.array([0, 0, 0], dtype=np.uint8)
+
+        if i < len(hex_colors):
+            hx = str(hex_colors[i]).strip()
+            if hx.startswith("#") and len(hx) == 7:
+                try:
+                    rgb = np.array(
+                        [int(hx[j:j + 2], 16) for j in (1, 3, 5)],
+                        dtype=np.uint8
+                    )
+                except ValueError:
+                    rgb = np.array([0, 0, 0], dtype=np.uint8)
+
+        alt.append(rgb)
+
+    if not alt:
+        return np.zeros((0, 3), dtype=np.uint8)
+
+    return np.stack(alt, axis=0).astype(np.uint8)
+
+
+def recolor_label_map(label_map, palette_uint8):
+    """
+    Convert a label map to an RGBA image using a palette.
+    label_map == -1 remains transparent/background.
+    """
+    h, w = label_map.shape[:2]
+    recolored_rgb = np.zeros((h, w, 3), dtype=np.uint8)
+
+    valid_label_mask = (label_map >= 0) & (label_map < len(palette_uint8))
+    if np.any(valid_label_mask):
+        idx = label_map[valid_label_mask].astype(np.int32)
+        recolored_rgb[valid_label_mask] = palette_uint8[idx]
+
+    return apply_alpha_to_rgb_array(recolored_rgb, valid_label_mask)
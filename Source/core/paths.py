@@ -0,0 +1,19 @@
+import os
+import sys
+
+
+def get_base_path():
+    """
+    Return the base directory of the application.
+
+    Behavior depends on how the application is executed:
+    - When running as a .py file -> returns the project root directory.
+    - When running as a frozen .exe, e.g. via PyInstaller -> returns the
+      directory containing the executable.
+    """
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+
+    return os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "..")
+    )
@@ -1,3 +1,6 @@
+import math
+import numpy as np
+
 ### my libraries ###
 from Source.geometry.Point import Point
 from Source.geometry.Plane import Plane
@@ -6,6 +9,7 @@ from Source.geometry.Volume import Volume
 from Source.geometry.GeometryTools import GeometryTools
 from Source.colorspace.ReferenceDomain import ReferenceDomain
 from Source.geometry.Prototype import Prototype
+from Source.core import instrumentation
 
 
 class FuzzyColor:
@@ -52,6 +56,7 @@ class FuzzyColor:
 
 
     @staticmethod
+    @instrumentation.timed("fuzzy.create_core_support")
     def create_core_support(prototypes, scaling_factor):
         """
         Create core and support volumes by scaling the prototypes according to the scaling factor.
@@ -82,84 +87,199 @@ class FuzzyColor:
 
 
     @staticmethod
-    def update_geometry(prototypes, cores, supports):
+    @instrumentation.timed("fuzzy.update_geometry")
+    def update_geometry(prototypes, cores, supports, indices=None):
         """
         Java-style adjustment (updateVoronoiFuzzyColors):
         - If a support vertex of c1 falls inside the core of c2, that face is retracted.
         - If a core vertex of c2 falls inside the support of c1, the nearest face is moved.
+
+        Only supports are modified, and each support only depends on its own
+        faces and on the (fixed) cores, so every support is adjusted on its own
+        against the cores it can touch: those whose bounding box overlaps its
+        own. Supports only shrink, so pairs without overlap never interact and
+        skipping them gives the same geometry as testing every pair. The vertex
+        tests run on packed plane and vertex arrays.
+
+        Parameters:
+            indices (iterable, optional): Supports to adjust (default: all).
         """
         n = len(prototypes)
+        targets = range(n) if indices is None else sorted(set(indices))
+
+        core_packs = [None] * n
+        core_boxes = np.array([FuzzyColor._bounding_box(cores[j].voronoi_volume) for j in range(n)]).reshape(n, 2, 3)
 
-        for i in range(n):
-            c1 = prototypes[i]
+        for i in targets:
             s1 = supports[i].voronoi_volume
-            rep1 = c1.voronoi_volume.getRepresentative()
+            box = FuzzyColor._bounding_box(s1)
 
-            for j in range(n):
-                if i == j:
-                    continue
+            overlap = np.all(core_boxes[:, 0] <= box[1], axis=1) & np.all(core_boxes[:, 1] >= box[0], axis=1)
+            overlap[i] = False
+            candidates = np.flatnonzero(overlap)
+            if not candidates.size:
+                continue
 
-                core2 = cores[j].voronoi_volume
+            support = FuzzyColor._pack_support(s1)
+            rep1 = prototypes[i].voronoi_volume.getRepresentative()
+            rep1 = np.array([rep1.x, rep1.y, rep1.z], dtype=np.float64)
 
-                # Rule 1: support(i) vertex inside core(j)
-                for fs in s1.getFaces():
-                    vi = fs.getArrayVertex()
-                    if not vi:
-                        continue
+            for j in candidates:
+                if core_packs[j] is None:
+                    core_packs[j] = FuzzyColor._pack_core(cores[j].voronoi_volume)
+                FuzzyColor._retract_support_faces(support, core_packs[j], rep1)
+                FuzzyColor._move_support_faces(support, core_packs[j], rep1)
 
-                    for v in vi:
-                        if core2.isInside(v) and not core2.isInFace(v):
-                            p_face = GeometryTools.intersection_with_volume(core2, v, rep1)
-                            if p_face is not None:
-                                new_plane = Plane.from_normal_point(fs.getPlane().getNormal(), p_face)
-                                fs.setPlane(new_plane)
+            FuzzyColor._unpack_support(support, s1)
 
-                                # Recalculate vertices
-                                if fs.getArrayVertex():
-                                    new_vs = []
-                                    for vv in fs.getArrayVertex():
-                                        nv = GeometryTools.intersection_plane_rect(new_plane, rep1, vv)
-                                        if nv is not None:
-                                            new_vs.append(nv)
-                                    fs.setArrayVertex(new_vs)
-                            break
+    @staticmethod
+    def _bounding_box(volume, pad=1e-6):
+        """(2, 3) min/max corner of a volume's vertices, padded; infinite if it has none."""
+        vertices = [(v.x, v.y, v.z) for face in volume.getFaces() for v in (face.getArrayVertex() or ())]
+        if not vertices:
+            return np.array([[-np.inf] * 3, [np.inf] * 3])
+        vertices = np.asarray(vertices, dtype=np.float64)
+        return np.array([vertices.min(axis=0) - pad, vertices.max(axis=0) + pad])
 
-                # Rule 2: core(j) vertex inside support(i)
-                for fk in core2.getFaces():
-                    vi = fk.getArrayVertex()
-                    if not vi:
-                        continue
+    @staticmethod
+    def _signed_values(points, planes):
+        """(K, F) plane values x * A + y * B + z * C + D, in Plane.evaluatePoint order."""
+        return (
+            points[:, 0:1] * planes[:, 0] + points[:, 1:2] * planes[:, 1]
+            + points[:, 2:3] * planes[:, 2] + planes[:, 3]
+        )
 
-                    for vk in vi:
-                        if s1.isInside(vk) and not s1.isInFace(vk):
-                            nearest = None
-                            min_d = float("inf")
+    @staticmethod
+    def _strictly_inside(points, planes, rep, eps=GeometryTools.SMALL_NUM):
+        """Volume.isInside and not Volume.isInFace, for (K, 3) points. Returns (mask, values)."""
+        values = FuzzyColor._signed_values(points, planes)
+        s_rep = FuzzyColor._signed_values(rep.reshape(1, 3), planes)[0]
+        inside = ~np.any(s_rep * values < -eps, axis=1)
+        in_face = np.any(np.abs(values) <= eps, axis=1)
+        return inside & ~in_face, values
 
-                            for fs in s1.getFaces():
-                                d = GeometryTools.distance_point_plane(fs.getPlane(), vk)
-                                if d < min_d:
-                                    min_d = d
-                                    nearest = fs
+    @staticmethod
+    def _pack_core(volume):
+        faces = [f for f in volume.getFaces()]
+        vertices, face_ids = [], []
+        for k, face in enumerate(faces):
+            for v in face.getArrayVertex() or ():
+                vertices.append((v.x, v.y, v.z))
+                face_ids.append(k)
+
+        rep = volume.getRepresentative()
+        return {
+            "planes": np.asarray([f.getPlane().getPlane() for f in faces], dtype=np.float64).reshape(-1, 4),
+            "rep": np.array([rep.x, rep.y, rep.z], dtype=np.float64),
+            "vertices": np.asarray(vertices, dtype=np.float64).reshape(-1, 3),
+            "face_ids": np.asarray(face_ids, dtype=np.int64),
+        }
 
-                            if nearest is not None:
-                                new_plane = Plane.from_normal_point(nearest.getPlane().getNormal(), vk)
-                                nearest.setPlane(new_plane)
+    @staticmethod
+    def _pack_support(volume):
+        faces = volume.getFaces()
+        rep = volume.getRepresentative()
+        return {
+            "planes": np.asarray([f.getPlane().getPlane() for f in faces], dtype=np.float64).reshape(-1, 4),
+            # Same expression as GeometryTools.distance_point_plane
+            "norms": np.array([math.sqrt(f.getPlane().A ** 2 + f.getPlane().B ** 2 + f.getPlane().C ** 2) for f in faces]),
+            "rep": np.array([rep.x, rep.y, rep.z], dtype=np.float64),
+            "vertices": [
+                np.asarray([(v.x, v.y, v.z) for v in f.getArrayVertex()], dtype=np.float64).reshape(-1, 3)
+                if f.getArrayVertex() else None
+                for f in faces
+            ],
+            "moved_to": [None] * len(faces),
+        }
 
-                                if nearest.getArrayVertex():
-                                    new_vs = []
-                                    for vv in nearest.getArrayVertex():
-                                        nv = GeometryTools.intersection_plane_rect(new_plane, rep1, vv)
-                                        if nv is not None:
-                                            new_vs.append(nv)
-                                    nearest.setArrayVertex(new_vs)
-                            break
+    @staticmethod
+    def _unpack_support(support, volume):
+        """Write moved planes and their recomputed vertices back to the Face objects."""
+        for face, point, vertices in zip(volume.getFaces(), support["moved_to"], support["vertices"]):
+            if point is None:
+                continue
+            face.setPlane(Plane.from_normal_point(face.getPlane().getNormal(), Point(*point.tolist())))
+            if vertices is not None:
+                face.setArrayVertex([Point(*v) for v in vertices.tolist()])
 
+    @staticmethod
+    def _move_face(support, k, point, rep1):
+        """
+        Plane.from_normal_point through `point` for face k, with its vertices
+        projected from rep1 (GeometryTools.intersection_plane_rect).
+        """
+        A, B, C, _D = support["planes"][k].tolist()
+        px, py, pz = point.tolist()
+        D = -1.0 * (px * A + py * B + pz * C)
+        support["planes"][k, 3] = D
+        support["moved_to"][k] = point
+
+        vertices = support["vertices"][k]
+        if vertices is None or not len(vertices):
+            return
+
+        rx, ry, rz = rep1.tolist()
+        diff = vertices - rep1
+        denom = A * diff[:, 0] + B * diff[:, 1] + C * diff[:, 2]
+        num = ((-D - A * rx) - B * ry) - C * rz
+
+        keep = denom != 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = num / denom
+        support["vertices"][k] = (diff * t[:, None] + rep1)[keep]
 
+    @staticmethod
+    def _retract_support_faces(support, core, rep1, eps=1e-9):
+        """Rule 1: the first support vertex of each face strictly inside the core retracts that face."""
+        owners = [k for k, v in enumerate(support["vertices"]) if v is not None and len(v)]
+        if not owners or not core["planes"].shape[0]:
+            return
+
+        vertices = np.concatenate([support["vertices"][k] for k in owners])
+        face_ids = np.repeat(owners, [len(support["vertices"][k]) for k in owners])
+
+        hit, _values = FuzzyColor._strictly_inside(vertices, core["planes"], core["rep"])
+        if not hit.any():
+            return
+
+        hit_rows = np.flatnonzero(hit)
+        hit_faces, first = np.unique(face_ids[hit_rows], return_index=True)
+
+        for k, row in zip(hit_faces.tolist(), hit_rows[first].tolist()):
+            # GeometryTools.intersection_with_volume(core, vertex, rep1)
+            x0, y0, z0 = vertices[row].tolist()
+            dx, dy, dz = (rep1 - vertices[row]).tolist()
+            min_t = float("inf")
+            for A, B, C, D in core["planes"].tolist():
+                denom = A * dx + B * dy + C * dz
+                if abs(denom) <= eps:
+                    continue
+                t = -(A * x0 + B * y0 + C * z0 + D) / denom
+                if eps <= t < min_t:
+                    min_t = t
 
+            if min_t != float("inf"):
+                point = np.array([x0 + min_t * dx, y0 + min_t * dy, z0 + min_t * dz])
+                FuzzyColor._move_face(support, k, point, rep1)
 
+    @staticmethod
+    def _move_support_faces(support, core, rep1):
+        """Rule 2: the first core vertex of each core face strictly inside the support moves the nearest support face."""
+        vertices = core["vertices"]
+        face_ids = core["face_ids"]
+        start = 0
 
+        while start < vertices.shape[0] and support["planes"].shape[0]:
+            hit, values = FuzzyColor._strictly_inside(vertices[start:], support["planes"], support["rep"])
+            if not hit.any():
+                return
 
+            row = int(np.argmax(hit))
+            nearest = int(np.argmin(np.abs(values[row]) / support["norms"]))
+            FuzzyColor._move_face(support, nearest, vertices[start + row].copy(), rep1)
 
+            # Later vertices of the same core face are skipped
+            start += row + int(np.count_nonzero(face_ids[start + row:] == face_ids[start + row]))
 
     @staticmethod
     def _raw_membership_for_index(new_color, i, function, pack):
@@ -200,9 +320,9 @@ class FuzzyColor:
             return 0.0
         param_c = GeometryTools.euclidean_distance(rep, p_face)
 
-        function.setParam([param_a, param_b, param_c])
+        # Stateless evaluation: the function instance is shared by every caller
         d = GeometryTools.euclidean_distance(rep, xyz)
-        value = function.getValue(d)
+        value = function.evaluate_scalar(d, param_a, param_b, param_c)
 
         if value < 0.0:
             return 0.0
@@ -211,6 +331,7 @@ class FuzzyColor:
         return value
 
     @staticmethod
+    @instrumentation.timed("fuzzy.best_prototype", trace=False)
     def get_membership_degree_mapping_all(new_color, prototypes, function, pack) -> int:
         xyz = Point(new_color[0], new_color[1], new_color[2])
 
@@ -237,6 +358,7 @@ class FuzzyColor:
         return best_idx if best_val > 0.0 else -1
 
     @staticmethod
+    @instrumentation.timed("fuzzy.membership", trace=False)
     def get_membership_degree(new_color, prototypes, function, pack):
         xyz = Point(*new_color)
 
@@ -279,6 +401,7 @@ class FuzzyColor:
         return {k: v / total for k, v in raw.items()}
 
     @staticmethod
+    @instrumentation.timed("fuzzy.membership_for_prototype", trace=False)
     def get_membership_degree_for_prototype(new_color, prototype, core, support, function):
         """
         Calculate fuzzy membership degree of a LAB color to a single prototype.
@@ -327,8 +450,204 @@ class FuzzyColor:
             return 0.0
         param_c = GeometryTools.euclidean_distance(rep_s, p_face)
 
-        function.setParam([param_a, param_b, param_c])
         d = GeometryTools.euclidean_distance(rep_p, xyz)
 
-        value = function.getValue(d)
-        return max(0.0, min(1.0, value))
\ No newline at end of file
+        value = function.evaluate_scalar(d, param_a, param_b, param_c)
+        return max(0.0, min(1.0, value))
+
+
+    # ------------------------------------------------------------------
+    # Batch membership (arrays of LAB colors)
+    #
+    # Same arithmetic as the scalar methods above, evaluated for every color
+    # at once with one NumPy pass per face. Results agree with the scalar
+    # methods up to the last bit of a float (NumPy squares with x * x, Python
+    # with pow), so best-prototype labels only differ on exact ties.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def pack_volume(volume):
+        """(F, 4) float64 plane coefficients and (3,) representative of a volume."""
+        planes = [face.getPlane().getPlane() for face in volume.getFaces()]
+        rep = volume.getRepresentative()
+        return {
+            "planes": np.asarray(planes, dtype=np.float64).reshape(-1, 4),
+            "rep": np.array([rep.x, rep.y, rep.z], dtype=np.float64),
+        }
+
+    @staticmethod
+    def _inside_batch(packed, x, y, z, eps=GeometryTools.SMALL_NUM):
+        """Volume.isInside for coordinate arrays."""
+        rx, ry, rz = packed["rep"].tolist()
+        inside = np.ones(x.shape, dtype=bool)
+
+        for A, B, C, D in packed["planes"].tolist():
+            s_rep = rx * A + ry * B + rz * C + D
+            s_xyz = x * A + y * B + z * C + D
+            inside &= ~(s_rep * s_xyz < -eps)
+
+        return inside
+
+    @staticmethod
+    def _exit_distance_batch(packed, origin, x, y, z, eps=1e-9):
+        """
+        Distance from `origin` to GeometryTools.intersection_with_volume(volume,
+        origin, xyz) for coordinate arrays; NaN where there is no intersection.
+        """
+        x0, y0, z0 = origin.tolist()
+        dx = x - x0
+        dy = y - y0
+        dz = z - z0
+        min_t = np.full(x.shape, np.inf)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for A, B, C, D in packed["planes"].tolist():
+                denom = A * dx + B * dy + C * dz
+                t = -(A * x0 + B * y0 + C * z0 + D) / denom
+                closer = (np.abs(denom) > eps) & (t >= eps) & (t < min_t)
+                min_t = np.where(closer, t, min_t)
+
+        found = np.isfinite(min_t)
+        t = np.where(found, min_t, 0.0)
+        dist = np.sqrt((x0 - (x0 + t * dx)) ** 2 + (y0 - (y0 + t * dy)) ** 2 + (z0 - (z0 + t * dz)) ** 2)
+        return np.where(found, dist, np.nan)
+
+    @staticmethod
+    def _raw_membership_batch(x, y, z, proto, core, supp, domain, function):
+        """
+        Raw membership of every color to one prototype, given its packed volumes.
+        Returns (values, core_hits): float64 memberships and the colors inside
+        both the support and the core.
+        """
+        values = np.zeros(x.shape, dtype=np.float64)
+        core_hits = np.zeros(x.shape, dtype=bool)
+
+        in_supp = np.flatnonzero(FuzzyColor._inside_batch(supp, x, y, z))
+        if not in_supp.size:
+            return values, core_hits
+
+        xs, ys, zs = x[in_supp], y[in_supp], z[in_supp]
+        in_core = FuzzyColor._inside_batch(core, xs, ys, zs)
+        core_hits[in_supp[in_core]] = True
+        values[in_supp[in_core]] = 1.0
+
+        rest = in_supp[~in_core]
+        if not rest.size:
+            return values, core_hits
+
+        xs, ys, zs = x[rest], y[rest], z[rest]
+        rep = proto["rep"]
+
+        cube = FuzzyColor._exit_distance_batch(domain, rep, xs, ys, zs)
+        param_a = FuzzyColor._exit_distance_batch(core, core["rep"], xs, ys, zs)
+        param_b = FuzzyColor._exit_distance_batch(proto, rep, xs, ys, zs)
+        param_c = FuzzyColor._exit_distance_batch(supp, supp["rep"], xs, ys, zs)
+
+        rx, ry, rz = rep.tolist()
+        d = np.sqrt((rx - xs) ** 2 + (ry - ys) ** 2 + (rz - zs) ** 2)
+
+        ok = ~(np.isnan(cube) | np.isnan(param_a) | np.isnan(param_b) | np.isnan(param_c))
+        value = np.clip(function.evaluate(d, param_a, param_b, param_c), 0.0, 1.0)
+        values[rest] = np.where(ok, value, 0.0)
+
+        return values, core_hits
+
+    @staticmethod
+    def _lab_columns(lab_points):
+        lab_points = np.asarray(lab_points, dtype=np.float64).reshape(-1, 3)
+        return (
+            np.ascontiguousarray(lab_points[:, 0]),
+            np.ascontiguousarray(lab_points[:, 1]),
+            np.ascontiguousarray(lab_points[:, 2]),
+        )
+
+    @staticmethod
+    @instrumentation.timed("fuzzy.best_prototype_batch", trace=False)
+    def get_membership_degree_mapping_all_batch(lab_points, prototypes, function, pack):
+        """
+        Array form of get_membership_degree_mapping_all for (N, 3) LAB colors.
+        `pack` must hold "packed" volumes (FuzzyColorSpace.precompute_pack).
+        Returns (N,) int32 best-prototype indices, -1 where no prototype applies.
+        """
+        x, y, z = FuzzyColor._lab_columns(lab_points)
+        packed = pack["packed"]
+
+        first_core = np.full(x.shape, -1, dtype=np.int32)
+        best_idx = np.full(x.shape, -1, dtype=np.int32)
+        best_val = np.zeros(x.shape, dtype=np.float64)
+
+        for i in range(len(prototypes)):
+            values, core_hits = FuzzyColor._raw_membership_batch(
+                x, y, z, packed["protos"][i], packed["cores"][i], packed["supps"][i], packed["domain"], function
+            )
+            first_core[(first_core < 0) & core_hits] = i
+
+            better = values > best_val
+            best_val[better] = values[better]
+            best_idx[better] = i
+
+        return np.where(first_core >= 0, first_core, best_idx).astype(np.int32, copy=False)
+
+    @staticmethod
+    @instrumentation.timed("fuzzy.membership_batch", trace=False)
+    def get_membership_degree_batch(lab_points, prototypes, function, pack):
+        """
+        Array form of get_membership_degree for (N, 3) LAB colors.
+        `pack` must hold "packed" volumes (FuzzyColorSpace.precompute_pack).
+        Returns (N, P) float64 memberships aligned with `prototypes`.
+        """
+        x, y, z = FuzzyColor._lab_columns(lab_points)
+        packed = pack["packed"]
+        n_prototypes = len(prototypes)
+
+        raw = np.zeros((x.shape[0], n_prototypes), dtype=np.float64)
+        core_dist = np.full((x.shape[0], n_prototypes), np.inf)
+
+        for i in range(n_prototypes):
+            values, core_hits = FuzzyColor._raw_membership_batch(
+                x, y, z, packed["protos"][i], packed["cores"][i], packed["supps"][i], packed["domain"], function
+            )
+            raw[:, i] = values
+
+            if core_hits.any():
+                rx, ry, rz = packed["protos"][i]["rep"].tolist()
+                hx, hy, hz = x[core_hits], y[core_hits], z[core_hits]
+                core_dist[core_hits, i] = np.sqrt((rx - hx) ** 2 + (ry - hy) ** 2 + (rz - hz) ** 2)
+
+        # Accumulated prototype by prototype, in the scalar order
+        total = np.zeros(x.shape, dtype=np.float64)
+        for i in range(n_prototypes):
+            total += raw[:, i]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = np.where(raw > 0.0, raw / total[:, None], 0.0)
+
+        # A single positive prototype gets exactly 1
+        single = np.count_nonzero(raw > 0.0, axis=1) == 1
+        result[single] = (raw[single] > 0.0).astype(np.float64)
+
+        # Colors inside one or more cores belong fully to the nearest of them
+        in_core = np.flatnonzero(np.isfinite(core_dist).any(axis=1))
+        if in_core.size:
+            result[in_core] = 0.0
+            result[in_core, np.argmin(core_dist[in_core], axis=1)] = 1.0
+
+        return result
+
+    @staticmethod
+    @instrumentation.timed("fuzzy.membership_for_prototype_batch", trace=False)
+    def get_membership_degree_for_prototype_batch(lab_points, prototype, core, support, function):
+        """
+        Array form of get_membership_degree_for_prototype for (N, 3) LAB colors.
+        Returns (N,) float64 memberships.
+        """
+        x, y, z = FuzzyColor._lab_columns(lab_points)
+        values, _core_hits = FuzzyColor._raw_membership_batch(
+            x, y, z,
+            FuzzyColor.pack_volume(prototype.voronoi_volume),
+            FuzzyColor.pack_volume(core.voronoi_volume),
+            FuzzyColor.pack_volume(support.voronoi_volume),
+            ReferenceDomain.default_voronoi_reference_domain().get_packed(),
+            function
+        )
+        return values
@@ -1,11 +1,37 @@
+import threading
+import numpy as np
+
 ### my libraries ###
 from Source.membership.MembershipFunction import MembershipFunction
 from Source.fuzzy.FuzzyColor import FuzzyColor
 from Source.colorspace.ReferenceDomain import ReferenceDomain
+from Source.colorspace.ColorSpaceRGB import ColorSpaceRGB
+from Source.geometry.Prototype import Prototype
+
+
+# Guards lazy creation of per-space locks (spaces built with __new__)
+_LOCK_CREATION = threading.Lock()
 
 
 class FuzzyColorSpace(FuzzyColor):
-    def __init__(self, space_name, prototypes, cores=None, supports=None, improve_geometry=True):
+    """
+    A fuzzy color space: prototypes with their Voronoi cells, cores and supports.
+
+    Thread safety: one loaded space can serve any number of threads at once.
+    Queries (calculate_membership*, best_prototype_index*, get_*_colors,
+    get_cached) keep no per-call state on the space or on its shared
+    MembershipFunction; the precomputed pack and derived data are built once
+    under a lock and only read afterwards. Geometry is never modified in place:
+    edits return a new space (see edited).
+    """
+
+    def __init__(self, space_name, prototypes, cores=None, supports=None, improve_geometry=True, adjacency=None, adjusted_geometry=False):
+        """
+        Build cores and supports from the prototypes (adjusted with
+        update_geometry when improve_geometry is set), or take the given ones.
+        adjusted_geometry tells whether given supports were adjusted, so that
+        edited rebuilds changed cells the same way (.fcs files record it).
+        """
         self.space_name = space_name
         self.prototypes = prototypes
         self.function = MembershipFunction()
@@ -13,17 +39,61 @@ class FuzzyColorSpace(FuzzyColor):
         scaling_factor = 0.5
         if cores is None and supports is None:
             self.cores, self.supports = FuzzyColor.create_core_support(prototypes, scaling_factor)
+
+            # Geometry read from a file (or reused by edited) is kept as stored
+            if improve_geometry:
+                FuzzyColor.update_geometry(self.prototypes, self.cores, self.supports)
+            self.adjusted_geometry = bool(improve_geometry)
         else:
             self.cores = cores
             self.supports = supports
+            self.adjusted_geometry = bool(adjusted_geometry)
 
-        # if improve_geometry:
-        #     FuzzyColor.update_geometry(self.prototypes, self.cores, self.supports)
+        # Voronoi neighbours per prototype (see get_adjacency); computed on demand
+        self._adjacency = FuzzyColorSpace._symmetric_adjacency(adjacency) if adjacency is not None else None
 
         self._precomputed = None
+        self._derived_cache = {}
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled; derived display data is rebuilt on demand
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        state["_derived_cache"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _get_lock(self):
+        lock = self.__dict__.get("_lock")
+        if lock is None:
+            with _LOCK_CREATION:
+                lock = self.__dict__.setdefault("_lock", threading.RLock())
+        return lock
 
-    def precompute_pack(self):
-        domain_volume = ReferenceDomain.default_voronoi_reference_domain().get_volume()
+    def _get_pack(self):
+        pack = self._precomputed
+        if pack is None:
+            pack = self.precompute_pack()
+        return pack
+
+    def precompute_pack(self, force=False):
+        """
+        Build (once) and return the read-only data used by membership queries.
+        Safe to call concurrently; pass force=True to rebuild it.
+        """
+        with self._get_lock():
+            if self._precomputed is not None and not force:
+                return self._precomputed
+            self._precomputed = self._build_pack()
+            return self._precomputed
+
+    def _build_pack(self):
+        domain = ReferenceDomain.default_voronoi_reference_domain()
+        domain_volume = domain.get_volume()
 
         v_protos = [p.voronoi_volume for p in self.prototypes]
         v_cores  = [c.voronoi_volume for c in self.cores]
@@ -31,34 +101,46 @@ class FuzzyColorSpace(FuzzyColor):
 
         rep = [v.getRepresentative() for v in v_protos]
 
-        self._precomputed = {
+        # Plane arrays for the batch (array) membership methods
+        packed = {
+            "domain": domain.get_packed(),
+            "protos": [FuzzyColor.pack_volume(v) for v in v_protos],
+            "cores": [FuzzyColor.pack_volume(v) for v in v_cores],
+            "supps": [FuzzyColor.pack_volume(v) for v in v_supps],
+        }
+
+        return {
             "domain_volume": domain_volume,
             "v_protos": v_protos,
             "v_cores": v_cores,
             "v_supps": v_supps,
             "rep": rep,
+            "packed": packed,
         }
 
-        return self._precomputed
-
     def best_prototype_index_from_lab(self, lab_triplet):
-        if self._precomputed is None:
-            self.precompute_pack()
-        return FuzzyColor.get_membership_degree_mapping_all(lab_triplet, self.prototypes, self.function, self._precomputed)
+        return FuzzyColor.get_membership_degree_mapping_all(lab_triplet, self.prototypes, self.function, self._get_pack())
+
+    def best_prototype_indices_from_lab(self, lab_points):
+        """Array form of best_prototype_index_from_lab: (N,) int32 indices for (N, 3) LAB colors."""
+        return FuzzyColor.get_membership_degree_mapping_all_batch(lab_points, self.prototypes, self.function, self._get_pack())
 
     def clear_precompute(self):
-        self._precomputed = None
+        with self._get_lock():
+            self._precomputed = None
 
     def calculate_membership(self, new_color):
-        if self._precomputed is None:
-            self.precompute_pack()
         return FuzzyColor.get_membership_degree(
             new_color,
             self.prototypes,
             self.function,
-            self._precomputed
+            self._get_pack()
         )
 
+    def calculate_membership_batch(self, lab_points):
+        """Array form of calculate_membership: (N, P) memberships aligned with the prototypes."""
+        return FuzzyColor.get_membership_degree_batch(lab_points, self.prototypes, self.function, self._get_pack())
+
     def calculate_membership_for_prototype(self, new_color, idx_proto):
         return FuzzyColor.get_membership_degree_for_prototype(
             new_color,
@@ -68,6 +150,16 @@ class FuzzyColorSpace(FuzzyColor):
             self.function
         )
 
+    def calculate_membership_for_prototype_batch(self, lab_points, idx_proto):
+        """Array form of calculate_membership_for_prototype: (N,) memberships."""
+        return FuzzyColor.get_membership_degree_for_prototype_batch(
+            lab_points,
+            self.prototypes[idx_proto],
+            self.cores[idx_proto],
+            self.supports[idx_proto],
+            self.function
+        )
+
     def get_cores(self):
         return self.cores
 
@@ -75,4 +167,288 @@ class FuzzyColorSpace(FuzzyColor):
         return self.supports
 
     def get_prototypes(self):
-        return self.prototypes
\ No newline at end of file
+        return self.prototypes
+
+    def get_rgb_colors(self):
+        """(N, 3) uint8 sRGB display colors of the prototypes, aligned with prototype indices."""
+        return self.get_cached(
+            "rgb_colors",
+            lambda: ColorSpaceRGB.from_lab_array([p.positive for p in self.prototypes])
+        )
+
+    def get_hex_colors(self):
+        """'#rrggbb' display colors of the prototypes, aligned with prototype indices."""
+        return self.get_cached("hex_colors", lambda: ColorSpaceRGB.to_hex_array(self.get_rgb_colors()))
+
+    def get_cached(self, key, builder):
+        """
+        Return display data derived from this space's geometry (e.g. 3D meshes),
+        building it once with builder(). Edits produce a new space instead of
+        mutating this one, so cached entries never go stale. Concurrent
+        callers wait for the first builder() instead of running it again.
+        """
+        cache = self.__dict__.setdefault("_derived_cache", {})
+        if key in cache:
+            return cache[key]
+
+        with self._get_lock():
+            if key not in cache:
+                cache[key] = builder()
+            return cache[key]
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def get_adjacency(self):
+        """
+        Voronoi adjacency graph: a list with, for each prototype, the sorted
+        indices of the prototypes whose cells touch its cell. Built once from
+        the cell vertices, checking both cells of every pair (or read from
+        the .fcs file).
+        """
+        adjacency = self.__dict__.get("_adjacency")
+        if adjacency is not None:
+            return adjacency
+
+        with self._get_lock():
+            if self.__dict__.get("_adjacency") is None:
+                touches = np.array([self._touch_row(i) for i in range(len(self.prototypes))]).reshape(len(self.prototypes), -1)
+                mutual = touches & touches.T
+                self._adjacency = [np.flatnonzero(row).tolist() for row in mutual]
+            return self._adjacency
+
+    def adjacency_edges(self):
+        """Sorted (i, j) pairs, i < j, of neighbouring prototypes."""
+        return [(i, j) for i, neighbours in enumerate(self.get_adjacency()) for j in neighbours if i < j]
+
+    @staticmethod
+    def _symmetric_adjacency(neighbours):
+        """Sorted neighbour lists with every i -> j link also stored as j -> i."""
+        sets = [set() for _ in neighbours]
+        for i, js in enumerate(neighbours):
+            for j in js:
+                if j != i:
+                    sets[i].add(int(j))
+                    sets[int(j)].add(i)
+        return [sorted(s) for s in sets]
+
+    def voronoi_neighbours(self, index):
+        """Indices of the prototypes whose Voronoi cells touch the cell of `index`."""
+        return list(self.get_adjacency()[index])
+
+    def _cell_neighbours(self, index):
+        """
+        Neighbours of `index`: prototypes whose cell touches its cell, checked
+        from both cells of each pair (see _touch_row).
+        """
+        row = self._touch_row(index)
+        return [int(j) for j in np.flatnonzero(row) if self._touch_row(j)[index]]
+
+    def _touch_row(self, index):
+        """
+        (N,) bools: for each prototype j, whether the cell of `index` reaches
+        the bisector with j, i.e. has a vertex at least as close to j as to
+        its own prototype. Looking at one cell only can be wrong both ways
+        (a clipped cell may lose a small face, or keep a stray one), which
+        is why _cell_neighbours asks both cells.
+        """
+        positives = np.asarray([p.positive for p in self.prototypes], dtype=float)
+        row = FuzzyColorSpace._touched_points(self.prototypes[index], positives)
+        row[index] = False
+        return row
+
+    @staticmethod
+    def _touched_points(prototype, points, tol=1e-6):
+        """(len(points),) bools: the prototype's cell has a vertex at least as close to the point as to the prototype."""
+        vertices = [
+            (v.x, v.y, v.z)
+            for face in prototype.voronoi_volume.getFaces()
+            for v in (face.getArrayVertex() or ())
+        ]
+        if not vertices:
+            return np.ones(len(points), dtype=bool)
+
+        vertices = np.unique(np.asarray(vertices, dtype=float), axis=0)
+        own = np.linalg.norm(vertices - prototype.positive, axis=1)
+        other = np.linalg.norm(vertices[:, None, :] - points[None, :, :], axis=2)
+        margin = tol * np.maximum(1.0, np.linalg.norm(vertices, axis=1))
+        return np.any(other - own[:, None] <= margin[:, None], axis=0)
+
+    @staticmethod
+    def _cell_touches(prototype, points):
+        """
+        True if some vertex of the prototype's Voronoi cell is at least as close
+        to one of `points` as to the prototype. The cell is convex, so this is
+        exactly when adding such a point would take part of the cell, or when
+        removing it would give the cell its volume (the cells share a face).
+        """
+        return bool(np.any(FuzzyColorSpace._touched_points(prototype, points)))
+
+    def edited(self, colors, space_name=None, scaling_factor=0.5):
+        """
+        Build the color space that results from editing this one, reusing every
+        Voronoi cell, core and support that the edit does not affect.
+
+        Parameters
+        ----------
+        colors : dict
+            Target state as an ordered mapping {label: LAB}.
+        space_name : str, optional
+            Name of the new space (defaults to this one's).
+
+        Prototypes are matched by LAB value, so a changed label is a rename and
+        needs no geometry. Only the added points' cells and the cells that a
+        removed or added point touches (see _cell_touches) are rebuilt,
+        together with their cores and supports, adjusted as this space's are
+        (adjusted_geometry); the result equals a full rebuild of the same kind,
+        also for spaces read from .fcs files. The adjacency graph is carried over and only re-read for
+        rebuilt cells.
+
+        Returns
+        -------
+        (FuzzyColorSpace, dict)
+            The new space (this one is not modified) and a change report with
+            keys "renamed" {old: new}, "added", "removed", "recomputed" (labels
+            whose cells were rebuilt, in the new space), "readjusted" (kept
+            cells whose adjusted support was recomputed), "changed_old" /
+            "changed_new" (labels before/after the edit whose geometry changed)
+            and "changed" (every old or new label touched by the edit).
+        """
+        labels = list(colors.keys())
+        positives = [np.asarray(colors[label], dtype=float).reshape(-1)[:3] for label in labels]
+
+        # Match target colors to current prototypes by LAB value
+        available = {}
+        for i, proto in enumerate(self.prototypes):
+            available.setdefault(tuple(np.round(proto.positive, 9)), []).append(i)
+
+        source_index = []
+        for lab in positives:
+            candidates = available.get(tuple(np.round(lab, 9)))
+            source_index.append(candidates.pop(0) if candidates else None)
+
+        kept = {i for i in source_index if i is not None}
+        removed = [i for i in range(len(self.prototypes)) if i not in kept]
+        added = [k for k, i in enumerate(source_index) if i is None]
+
+        renamed = {
+            self.prototypes[i].label: labels[k]
+            for k, i in enumerate(source_index)
+            if i is not None and self.prototypes[i].label != labels[k]
+        }
+
+        # A kept cell changes exactly when a removed or added point gives it (or
+        # takes) some volume, i.e. when one of its vertices is at least as close
+        # to that point as to the cell's own prototype
+        new_index_of_old = {i: k for k, i in enumerate(source_index) if i is not None}
+        recompute = set(added)
+
+        edit_points = [self.prototypes[i].positive for i in removed] + [positives[k] for k in added]
+        if edit_points:
+            edit_points = np.asarray(edit_points, dtype=float)
+            for i, k in new_index_of_old.items():
+                if FuzzyColorSpace._cell_touches(self.prototypes[i], edit_points):
+                    recompute.add(k)
+
+        all_positives = np.asarray(positives, dtype=float)
+
+        def negatives_for(k):
+            return np.delete(all_positives, k, axis=0)
+
+        new_prototypes = [None] * len(labels)
+        new_cores = [None] * len(labels)
+        new_supports = [None] * len(labels)
+
+        # Unchanged cells: new wrappers (label/negatives) around the same volumes
+        def reuse(k):
+            i = source_index[k]
+            negatives = negatives_for(k)
+            new_prototypes[k] = Prototype(labels[k], positives[k], negatives, self.prototypes[i].voronoi_volume)
+            new_cores[k] = Prototype(labels[k], positives[k], negatives, self.cores[i].voronoi_volume)
+            new_supports[k] = Prototype(labels[k], positives[k], negatives, self.supports[i].voronoi_volume)
+
+        def rebuild(k):
+            proto = Prototype(labels[k], positives[k], negatives_for(k))
+            cores, supports = FuzzyColor.create_core_support([proto], scaling_factor)
+            new_prototypes[k] = proto
+            new_cores[k] = cores[0]
+            new_supports[k] = supports[0]
+
+        for k in range(len(labels)):
+            if k in recompute:
+                rebuild(k)
+            else:
+                reuse(k)
+
+        # Adjusted supports also depend on the cores around them: re-adjust the
+        # rebuilt ones and every kept one that can touch a changed core
+        readjusted = set()
+        if getattr(self, "adjusted_geometry", False):
+            changed_boxes = [FuzzyColor._bounding_box(new_cores[k].voronoi_volume) for k in recompute]
+            changed_boxes += [FuzzyColor._bounding_box(self.cores[i].voronoi_volume) for i in removed]
+            changed_boxes += [
+                FuzzyColor._bounding_box(self.cores[source_index[k]].voronoi_volume)
+                for k in recompute if source_index[k] is not None
+            ]
+
+            for k in range(len(labels)):
+                if k in recompute or not changed_boxes:
+                    continue
+
+                # Box of the unadjusted support, scaled from the Voronoi cell
+                low, high = FuzzyColor._bounding_box(new_prototypes[k].voronoi_volume)
+                factor = 2.0 - scaling_factor
+                low, high = positives[k] + factor * (low - positives[k]), positives[k] + factor * (high - positives[k])
+
+                if any(np.all(b[0] <= high) and np.all(b[1] >= low) for b in changed_boxes):
+                    # Fresh support: the one in this space is shared and must not change
+                    _cores, supports = FuzzyColor.create_core_support([new_prototypes[k]], scaling_factor)
+                    new_supports[k] = supports[0]
+                    readjusted.add(k)
+
+            FuzzyColor.update_geometry(new_prototypes, new_cores, new_supports, indices=recompute | readjusted)
+
+        space = FuzzyColorSpace(
+            space_name if space_name is not None else self.space_name,
+            new_prototypes,
+            new_cores,
+            new_supports,
+            adjusted_geometry=getattr(self, "adjusted_geometry", False)
+        )
+
+        # Untouched cells keep their links to other untouched cells; every link
+        # of a rebuilt cell is read again
+        old_adjacency = self.get_adjacency()
+        neighbours = [
+            space._cell_neighbours(k) if k in recompute
+            else [
+                new_index_of_old[j] for j in old_adjacency[source_index[k]]
+                if j in new_index_of_old and new_index_of_old[j] not in recompute
+            ]
+            for k in range(len(labels))
+        ]
+        space._adjacency = FuzzyColorSpace._symmetric_adjacency(neighbours)
+
+        recomputed = [labels[k] for k in sorted(recompute)]
+        removed_labels = [self.prototypes[i].label for i in removed]
+        changed_old = set(removed_labels)
+        for k in recompute:
+            if source_index[k] is not None:
+                changed_old.add(self.prototypes[source_index[k]].label)
+
+        for k in readjusted:
+            changed_old.add(self.prototypes[source_index[k]].label)
+
+        changes = {
+            "renamed": renamed,
+            "added": [labels[k] for k in added],
+            "removed": removed_labels,
+            "recomputed": recomputed,
+            "changed_old": changed_old,
+            "readjusted": [labels[k] for k in sorted(readjusted)],
+            "changed_new": set(recomputed) | {labels[k] for k in readjusted},
+            "changed": changed_old | set(recomputed) | set(renamed) | set(renamed.values()) | {labels[k] for k in readjusted},
+        }
+
+        return space, changes
@@ -1,6 +1,11 @@
 import numpy as np
 import subprocess
+import functools
+import shutil
+import sys
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 from Source.geometry.Plane import Plane
 from Source.geometry.Point import Point
@@ -8,6 +13,40 @@ from Source.geometry.Face import Face
 from Source.geometry.Volume import Volume
 from Source.geometry.GeometryTools import GeometryTools
 from Source.colorspace.ReferenceDomain import ReferenceDomain
+from Source.core.paths import get_base_path
+from Source.core import instrumentation
+
+
+# Below this many prototypes, process start-up costs more than it saves
+PARALLEL_MIN_PROTOTYPES = 16
+
+# Environment variable pointing to a qvoronoi executable to use instead of the default
+QVORONOI_ENV = "PYFCS_QVORONOI"
+
+
+@functools.lru_cache(maxsize=None)
+def find_qvoronoi():
+    """
+    Path of the qvoronoi executable, or None if there is none: $PYFCS_QVORONOI,
+    then the bundled Source/external/qvoronoi.exe on Windows, then qvoronoi on
+    the PATH (Qhull binaries: qhull-bin on Linux, Homebrew's qhull on macOS).
+    Without one, Prototype.run_qvoronoi uses scipy's Delaunay triangulation.
+    """
+    configured = os.environ.get(QVORONOI_ENV)
+    if configured:
+        return shutil.which(configured) or (configured if os.path.isfile(configured) else None)
+
+    if sys.platform.startswith("win"):
+        bundled = os.path.join(get_base_path(), "Source", "external", "qvoronoi.exe")
+        if os.path.isfile(bundled):
+            return bundled
+
+    return shutil.which("qvoronoi")
+
+
+def _build_prototype(label, positive, negatives):
+    """Process-pool task for Prototype.build_prototypes."""
+    return Prototype(label=label, positive=positive, negatives=negatives)
 
 
 class Prototype:
@@ -30,7 +69,9 @@ class Prototype:
         # Reuse a precomputed Voronoi volume when provided.
         if voronoi_volume is not None:
             self.voronoi_volume = voronoi_volume
+            instrumentation.count("prototype.reused_volumes")
         else:
+            instrumentation.count("prototype.built_volumes")
             total_points = 1 + len(self.negatives)
 
             # For small point sets, the direct half-space construction is more robust
@@ -47,7 +88,7 @@ class Prototype:
                     raise RuntimeError("Error running qvoronoi")
 
                 # Read the raw Voronoi cell and then clip it to the reference domain.
-                raw_volume = self.read_from_voronoi_file()
+                raw_volume = self.read_voronoi_output()
                 domain_volume = ReferenceDomain.default_voronoi_reference_domain().get_volume()
 
                 self.voronoi_volume = self._clip_volume_to_domain(
@@ -56,6 +97,43 @@ class Prototype:
                 )
 
     @staticmethod
+    @instrumentation.timed("prototype.build_prototypes")
+    def build_prototypes(specs, max_workers=None, executor=None):
+        """
+        Build many prototypes at once, fanning the independent Voronoi builds
+        out over worker processes.
+
+        Parameters:
+            specs (iterable): (label, positive, negatives) tuples.
+            max_workers (int, optional): Worker processes (default: the
+                executor's process_workers, else the CPU count); 1 builds them
+                here, one after another.
+            executor (optional): Long-lived process pool with an
+                Executor-style map(fn, *iterables, chunksize=...), e.g. the GUI's
+                JobScheduler. Without one, a temporary pool is started (spawn).
+
+        Returns:
+            list: Prototype objects, in the order of specs.
+        """
+        specs = [(label, np.asarray(positive, dtype=float), np.asarray(negatives, dtype=float)) for label, positive, negatives in specs]
+        workers = max_workers or getattr(executor, "process_workers", None) or os.cpu_count() or 1
+        workers = min(workers, len(specs))
+
+        if workers <= 1 or len(specs) < PARALLEL_MIN_PROTOTYPES:
+            return [_build_prototype(*spec) for spec in specs]
+
+        labels, positives, negatives = zip(*specs)
+        chunksize = max(1, len(specs) // (workers * 4))
+
+        if executor is not None:
+            return list(executor.map(_build_prototype, labels, positives, negatives, chunksize=chunksize))
+
+        # Callers may run on a thread of the GUI process, where fork is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(_build_prototype, labels, positives, negatives, chunksize=chunksize))
+
+    @staticmethod
+    @instrumentation.timed("prototype.clip_to_domain")
     def _clip_volume_to_domain(volume, domain_volume, eps=1e-7):
         """
         Close a possibly open Voronoi volume by adding the domain faces
@@ -84,6 +162,7 @@ class Prototype:
         return Volume(clipped.getRepresentative(), valid_faces)
 
     @staticmethod
+    @instrumentation.timed("prototype.build_volume_voronoi")
     def build_volume_voronoi(positive, negatives, eps=1e-7):
         """
         Build the Voronoi cell of one prototype directly from pairwise bisector planes
@@ -128,137 +207,215 @@ class Prototype:
         domain_volume = ReferenceDomain.default_voronoi_reference_domain().get_volume()
         return Prototype._clip_volume_to_domain(volume, domain_volume, eps=eps)
 
+    @instrumentation.timed("prototype.run_qvoronoi")
     def run_qvoronoi(self):
+        """
+        Compute the Voronoi ridges of the positive prototype (site 0) and keep
+        them in self.voronoi_output. qvoronoi is fed and read through pipes,
+        and the ridges it leaves out are added from the Delaunay neighbours;
+        without an executable (see find_qvoronoi) the ridges are the bisectors
+        of the Delaunay neighbours alone.
+        """
         try:
             # Stack the positive prototype first, followed by all negatives.
             points = np.vstack((self.positive, self.negatives))
             dimension = points.shape[1]
             num_points = points.shape[0]
 
+            command = find_qvoronoi()
+            if command is None:
+                self.voronoi_output = Prototype._voronoi_ridges_in_process(points)
+                return True
+
             # Build qvoronoi input format:
             # first dimension, then number of points, then coordinates.
             input_data = f"{dimension}\n{num_points}\n"
             input_data += "\n".join(" ".join(map(str, point)) for point in points)
 
             # Execute qvoronoi requesting incidence/facet/point/vertex information.
-            command = [r"Source\external\qvoronoi.exe", "Fi", "Fo", "p", "Fv"]
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+            process = subprocess.run(
+                [command, "Fi", "Fo", "p", "Fv"],
+                input=input_data,
+                capture_output=True,
+                text=True
             )
-            output, error = process.communicate(input=input_data)
 
             # Abort on execution failure.
             if process.returncode != 0:
-                print(f"Error running qvoronoi.exe: {error}")
+                print(f"Error running qvoronoi: {process.stderr}")
                 return False
 
-            self.voronoi_output = output
-
-            # Persist output temporarily for the parser.
-            temp_output_file = os.path.join(
-                "Source", "external", "temp", "temp_voronoi_output.txt"
-            )
-            with open(temp_output_file, "w") as f:
-                f.write(output)
-
+            ridges = Prototype.parse_qvoronoi_output(process.stdout, dimension)
+            self.voronoi_output = Prototype._add_missing_ridges(points, ridges)
             return True
 
         except Exception as e:
             print(f"Error in execution: {e}")
             return False
 
-    def read_from_voronoi_file(self):
-        # Read the temporary qvoronoi output file.
-        file_path = os.path.join("Source", "external", "temp", "temp_voronoi_output.txt")
-        points = np.vstack((self.positive, self.negatives))
-
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-
-        num_colors = len(points)
-
-        # faces[i][j] stores the separating face between site i and site j.
-        faces = [[None] * num_colors for _ in range(num_colors)]
-        cont = 0
-
-        # Read bounded planes.
-        num_planes = int(lines[0].strip())
-        cont += 1
-        for i in range(1, num_planes + cont):
-            parts = lines[i].split()
-            index1 = int(parts[1])
-            index2 = int(parts[2])
-            plane = Plane(*[float(part) for part in parts[3:]])
-
-            faces[index1][index2] = Face(
-                plane,
-                infinity=False,
-                source_index=index2,
-            )
+    @staticmethod
+    @instrumentation.timed("prototype.parse_qvoronoi", trace=False)
+    def parse_qvoronoi_output(output, dimension, site=0):
+        """
+        Parse qvoronoi "Fi Fo p Fv" output held in memory, keeping the ridges of `site`.
+
+        Returns a dict:
+            sites (K, 2)    site pair of each ridge
+            planes (K, 4)   separating hyperplane A, B, C, D
+            bounded (K,)    False for the unbounded ridges (Fo)
+            vertices (V, 3) Voronoi vertices
+            incidence       {(i, j): vertex numbers}, 1-based, 0 = vertex at infinity
+        """
+        lines = output.splitlines()
+
+        def numbers(start, count, dtype=float):
+            return np.array(" ".join(lines[start:start + count]).split(), dtype=dtype)
+
+        # Bounded (Fi) and unbounded (Fo) hyperplanes: "count i j normal offset"
+        pos = 0
+        blocks = []
+        for bounded in (True, False):
+            count = int(lines[pos])
+            rows = numbers(pos + 1, count).reshape(count, dimension + 4)
+            blocks.append((rows, np.full(count, bounded)))
+            pos += 1 + count
+
+        rows = np.vstack([b[0] for b in blocks])
+        bounded = np.concatenate([b[1] for b in blocks])
+        sites = rows[:, 1:3].astype(np.int64)
+        keep = np.any(sites == site, axis=1)
+
+        # Voronoi vertices (p): dimension line, count, coordinates.
+        count = int(lines[pos + 1])
+        vertices = numbers(pos + 2, count).reshape(count, dimension)
+        pos += 2 + count
+
+        # Ridge vertices (Fv): "count i j v1 v2 ...", one line per ridge. Only
+        # the site pair of each line is read; vertex lists are parsed for the
+        # ridges of `site` alone.
+        count = int(lines[pos])
+        incidence = {}
+        for line in lines[pos + 1:pos + 1 + count]:
+            head = line.split(None, 3)
+            i, j = int(head[1]), int(head[2])
+            if i == site or j == site:
+                incidence[(i, j)] = [int(v) for v in head[3].split()] if len(head) > 3 else []
+
+        return {
+            "sites": sites[keep],
+            "planes": rows[keep, 3:],
+            "bounded": bounded[keep],
+            "vertices": vertices,
+            "incidence": incidence,
+        }
+
+    @staticmethod
+    def _delaunay_neighbours(points, site=0):
+        """
+        Sites that share a Delaunay edge with `site`, i.e. its Voronoi
+        neighbours. If the triangulation fails or leaves `site` out (degenerate
+        or repeated points), every other site is returned: extra bisectors are
+        dropped when the cell is clipped.
+        """
+        from scipy.spatial import Delaunay
+        from scipy.spatial import QhullError
+
+        others = np.delete(np.arange(points.shape[0]), site)
+        try:
+            triangulation = Delaunay(points)
+        except (QhullError, ValueError):
+            return others
+
+        if site in triangulation.coplanar[:, 0]:
+            return others
+
+        indptr, indices = triangulation.vertex_neighbor_vertices
+        return np.sort(indices[indptr[site]:indptr[site + 1]]).astype(np.int64)
+
+    @staticmethod
+    def _bisector_ridges(points, neighbours, site=0):
+        """
+        Ridges in parse_qvoronoi_output's format for the bisector planes
+        between `site` and each neighbour, without vertices: the cell's
+        vertices are computed when it is clipped to the domain. As qvoronoi
+        prints them, each pair is (i, j) with i < j and the unit normal points
+        from site i to site j.
+        """
+        neighbours = np.asarray(neighbours, dtype=np.int64)
+        sites = np.sort(np.column_stack([np.full(neighbours.shape, site, dtype=np.int64), neighbours]), axis=1)
 
-        # Read unbounded planes.
-        num_unbounded_planes = int(lines[num_planes + cont].strip())
-        cont += 1
-        for i in range(num_planes + cont, num_planes + num_unbounded_planes + cont):
-            parts = lines[i].split()
-            index1 = int(parts[1])
-            index2 = int(parts[2])
-            plane = Plane(*[float(part) for part in parts[3:]])
-
-            faces[index1][index2] = Face(
-                plane,
-                infinity=True,
-                source_index=index2,
+        p, q = points[sites[:, 0]], points[sites[:, 1]]
+        normals = (q - p) / np.linalg.norm(q - p, axis=1)[:, None]
+        offsets = -np.einsum("ij,ij->i", normals, (p + q) / 2.0)
+
+        return {
+            "sites": sites,
+            "planes": np.column_stack([normals, offsets]).reshape(-1, 4),
+            "bounded": np.zeros(sites.shape[0], dtype=bool),
+            "vertices": np.empty((0, points.shape[1])),
+            "incidence": {},
+        }
+
+    @staticmethod
+    def _voronoi_ridges_in_process(points, site=0):
+        """
+        Ridges of `site` without a qvoronoi executable: one bisector plane per
+        Delaunay neighbour (scipy.spatial.Delaunay). Qhull's Voronoi output
+        (qvoronoi Fi/Fo, or scipy's Voronoi.ridge_points) leaves out some
+        unbounded ridges between Delaunay neighbours, which would let a cell
+        spill into its neighbour's.
+        """
+        return Prototype._bisector_ridges(points, Prototype._delaunay_neighbours(points, site), site)
+
+    @staticmethod
+    def _add_missing_ridges(points, ridges, site=0):
+        """Add bisector ridges for the Delaunay neighbours of `site` that qvoronoi's output left out."""
+        present = set(ridges["sites"].ravel().tolist())
+        missing = [j for j in Prototype._delaunay_neighbours(points, site).tolist() if j not in present]
+        if not missing:
+            return ridges
+
+        extra = Prototype._bisector_ridges(points, missing, site)
+        return {
+            "sites": np.vstack([ridges["sites"], extra["sites"]]),
+            "planes": np.vstack([ridges["planes"], extra["planes"]]),
+            "bounded": np.concatenate([ridges["bounded"], extra["bounded"]]),
+            "vertices": ridges["vertices"],
+            "incidence": ridges["incidence"],
+        }
+
+    @instrumentation.timed("prototype.read_voronoi_output")
+    def read_voronoi_output(self):
+        """
+        Build the raw (unclipped) Voronoi cell of the positive prototype from
+        the ridges computed by run_qvoronoi.
+        """
+        ridges = self.voronoi_output
+
+        # Faces keyed by site pair; source_index is the neighbouring site.
+        faces = {}
+        for (index1, index2), plane, bounded in zip(ridges["sites"].tolist(), ridges["planes"].tolist(), ridges["bounded"].tolist()):
+            faces[(index1, index2)] = Face(
+                Plane(*plane),
+                infinity=not bounded,
+                source_index=index2 if index1 == 0 else index1,
             )
 
-        # Read dimension and vertex count.
-        num_dimensions = int(lines[num_planes + num_unbounded_planes + cont].strip())
-        cont += 1
-        num_vertices = int(lines[num_planes + num_unbounded_planes + cont].strip())
-        cont += 1
-
-        # Read vertex coordinates.
-        vertices = []
-        for i in range(
-            num_planes + num_unbounded_planes + cont,
-            num_planes + num_unbounded_planes + num_vertices + cont
-        ):
-            coords = [float(part) for part in lines[i].split()]
-            vertices.append(Point(*coords))
-
-        # Read face-to-vertex incidence.
-        num_faces = int(lines[num_planes + num_unbounded_planes + num_vertices + cont].strip())
-        cont += 1
-        for i in range(
-            num_planes + num_unbounded_planes + num_vertices + cont,
-            num_planes + num_unbounded_planes + num_vertices + num_faces + cont
-        ):
-            parts = lines[i].split()
-            index1 = int(parts[1])
-            index2 = int(parts[2])
-            face = faces[index1][index2]
-
-            # Vertex index 0 indicates that the face is unbounded.
-            for j in range(3, int(parts[0]) + 1):
-                vertex_index = int(parts[j])
-                if vertex_index == 0:
+        vertices = ridges["vertices"]
+        points = {}
+        for key, numbers in ridges["incidence"].items():
+            face = faces.get(key)
+            if face is None:
+                continue
+
+            # Vertex number 0 indicates that the face is unbounded.
+            for number in numbers:
+                if number == 0:
                     face.setInfinity()
                 else:
-                    face.addVertex(vertices[vertex_index - 1])
-
-        # Build one volume per site.
-        volumes = [Volume(Point(*point)) for point in points]
-
-        # Each separating face belongs to both adjacent volumes.
-        for i in range(num_colors):
-            for j in range(num_colors):
-                if faces[i][j] is not None:
-                    volumes[i].addFace(faces[i][j])
-                    volumes[j].addFace(faces[i][j])
+                    if number not in points:
+                        points[number] = Point(*vertices[number - 1].tolist())
+                    face.addVertex(points[number])
 
-        # Return the Voronoi cell corresponding to the positive prototype.
-        return volumes[0]
\ No newline at end of file
+        # Voronoi cell of the positive prototype (faces in site-pair order).
+        return Volume(Point(*self.positive), [faces[key] for key in sorted(faces)])
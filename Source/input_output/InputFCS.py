@@ -6,7 +6,8 @@ from Source.geometry.Point import Point
 
 from Source.geometry.Prototype import Prototype
 from Source.fuzzy.FuzzyColorSpace import FuzzyColorSpace
-from Source.interface.modules.UtilsTools import get_base_path
+from Source.core.paths import get_base_path
+from Source.core import instrumentation
 
 import numpy as np
 import tempfile
@@ -16,19 +17,24 @@ import os
 
 class InputFCS(Input):
 
-    def write_file(self, name, selected_colors_lab, progress_callback=None):
-        # Step 1 & 2: Create Prototype objects
-        prototypes = [
-            Prototype(
-                label=color_name,
-                positive=lab_value,
-                negatives=[lab for other_name, lab in selected_colors_lab.items() if other_name != color_name]
-            )
-            for color_name, lab_value in selected_colors_lab.items()
-        ]
-
-        # Step 3: Create the fuzzy color space
-        fuzzy_color_space = FuzzyColorSpace(space_name=name, prototypes=prototypes)
+    @instrumentation.timed("fcs.write_file")
+    def write_file(self, name, selected_colors_lab, progress_callback=None, fuzzy_color_space=None):
+        # An already built space (e.g. from FuzzyColorSpace.edited) is written as is
+        if fuzzy_color_space is None:
+            # Step 1 & 2: Create Prototype objects
+            prototypes = [
+                Prototype(
+                    label=color_name,
+                    positive=lab_value,
+                    negatives=[lab for other_name, lab in selected_colors_lab.items() if other_name != color_name]
+                )
+                for color_name, lab_value in selected_colors_lab.items()
+            ]
+
+            # Step 3: Create the fuzzy color space
+            fuzzy_color_space = FuzzyColorSpace(space_name=name, prototypes=prototypes)
+
+        prototypes = fuzzy_color_space.prototypes
 
         cores_planes = self.extract_planes_and_vertex(getattr(fuzzy_color_space, "cores", None) or [])
         voronoi_planes = self.extract_planes_and_vertex(getattr(fuzzy_color_space, "prototypes", None) or [])
@@ -39,6 +45,8 @@ class InputFCS(Input):
         voronoi_planes = voronoi_planes or []
         supports_planes = supports_planes or []
 
+        adjacency_edges = fuzzy_color_space.adjacency_edges()
+
         save_path = os.path.join(get_base_path(), "fuzzy_color_spaces")
         os.makedirs(save_path, exist_ok=True)
 
@@ -90,7 +98,7 @@ class InputFCS(Input):
 
         # Total Lines for Loading
         total_lines = (
-            3 +
+            5 + len(adjacency_edges) +
             len(selected_colors_lab) +
             sum(1 for x in cores_planes if isinstance(x, str)) + count_plane_lines(cores_planes) +
             sum(1 for x in voronoi_planes if isinstance(x, str)) + count_plane_lines(voronoi_planes) +
@@ -118,6 +126,22 @@ class InputFCS(Input):
                 if progress_callback:
                     progress_callback(current_line, total_lines)
 
+                # Voronoi adjacency as "i j" color index pairs. It goes before
+                # @numberOfColors, where readers without @adjacency support skip it.
+                file.write(f"@adjacency {len(adjacency_edges)}\n")
+                for i, j in adjacency_edges:
+                    file.write(f"{i} {j}\n")
+                current_line += 1 + len(adjacency_edges)
+                if progress_callback:
+                    progress_callback(current_line, total_lines)
+
+                # Whether supports were adjusted (update_geometry), so edits of
+                # the space read back rebuild cells the same way
+                file.write(f"@adjustedGeometry {int(bool(getattr(fuzzy_color_space, 'adjusted_geometry', False)))}\n")
+                current_line += 1
+                if progress_callback:
+                    progress_callback(current_line, total_lines)
+
                 file.write(f"@numberOfColors {len(prototypes)}\n")
                 current_line += 1
                 if progress_callback:
@@ -266,64 +290,108 @@ class InputFCS(Input):
         vals = list(map(float, line.strip().split()))
         return Point(*vals)
 
-    def read_file(self, file_path):
-        try:
-            with open(file_path, 'r') as file:
-                lines = iter(file.readlines())
+    def _read_header_and_colors(self, lines):
+        """
+        Consume the header and color table from a line iterator. The optional
+        @adjacency block is returned as a list of (i, j) pairs, or None, and
+        @adjustedGeometry as a bool (False for files written without it).
+        """
+        fcs_name = None
+        cs = None
+        num_colors = None
+        adjacency_edges = None
+        adjusted_geometry = False
+
+        for line in lines:
+            if adjacency_edges is None:
+                match = re.search(r'^@adjacency\s*(\d+)\s*$', line)
+                if match:
+                    adjacency_edges = [tuple(map(int, next(lines).split()[:2])) for _ in range(int(match.group(1)))]
+                    continue
 
-                fcs_name = None
-                cs = None
-                num_colors = None
+            match = re.search(r'^@adjustedGeometry\s*([01])\s*$', line)
+            if match:
+                adjusted_geometry = match.group(1) == "1"
+                continue
 
-                for line in lines:
-                    if fcs_name is None:
-                        match = re.search(r'^@name\s*(.+)\s*$', line)
-                        if match:
-                            fcs_name = match.group(1).strip()
+            if fcs_name is None:
+                match = re.search(r'^@name\s*(.+)\s*$', line)
+                if match:
+                    fcs_name = match.group(1).strip()
+
+            if cs is None:
+                match = re.search(r'^@colorSpace(?:LAB)?\s*(.*)\s*$', line)
+                if match:
+                    cs = match.group(1).strip() or "LAB"
+
+            if num_colors is None:
+                match = re.search(r'^@numberOfColors\s*(\d+)\s*$', line)
+                if match:
+                    num_colors = int(match.group(1))
+
+            if fcs_name and cs and num_colors is not None:
+                break
+
+        colors = []
+        for _ in range(num_colors):
+            raw = next(lines).strip()
+            parts = shlex.split(raw)
+            if len(parts) != 4:
+                raise ValueError(f"Invalid color line (expected 4 tokens): {raw}")
+
+            color_name = parts[0]
+            L, A, B = map(float, parts[1:])
+            colors.append((color_name, L, A, B))
+
+        # Create color_data struct
+        color_data = {}
+        for i in range(num_colors):
+            color_name, L, A, B = colors[i]
+
+            positive_prototype = np.array([L, A, B])
+
+            negative_prototypes = []
+            for j in range(num_colors):
+                if i != j:
+                    _, L_neg, A_neg, B_neg = colors[j]
+                    negative_prototypes.append([L_neg, A_neg, B_neg])
+            negative_prototypes = np.array(negative_prototypes)
+
+            color_data[color_name] = {
+                'Color': [L, A, B],
+                'positive_prototype': positive_prototype,
+                'negative_prototypes': negative_prototypes
+            }
+
+        return fcs_name, colors, color_data, adjacency_edges, adjusted_geometry
+
+    @instrumentation.timed("fcs.read_color_table")
+    def read_color_table(self, file_path):
+        """
+        Read only the header and color table of a .fcs file, without the geometry.
+        Returns the same color_data dict as read_file.
+        """
+        try:
+            with open(file_path, 'r') as file:
+                _fcs_name, _colors, color_data, _adjacency_edges, _adjusted = self._read_header_and_colors(iter(file))
+                return color_data
 
-                    if cs is None:
-                        match = re.search(r'^@colorSpace(?:LAB)?\s*(.*)\s*$', line)
-                        if match:
-                            cs = match.group(1).strip() or "LAB"
+        except (ValueError, IndexError, KeyError, StopIteration, TypeError) as e:
+            raise ValueError(f"Error reading .fcs file: {str(e)}")
 
-                    if num_colors is None:
-                        match = re.search(r'^@numberOfColors\s*(\d+)\s*$', line)
-                        if match:
-                            num_colors = int(match.group(1))
+    @instrumentation.timed("fcs.read_file")
+    def read_file(self, file_path):
+        try:
+            with open(file_path, 'r') as file:
+                lines = iter(file.readlines())
 
-                    if fcs_name and cs and num_colors is not None:
-                        break
+                fcs_name, colors, color_data, adjacency_edges, adjusted_geometry = self._read_header_and_colors(lines)
 
-                colors = []
-                for _ in range(num_colors):
-                    raw = next(lines).strip()
-                    parts = shlex.split(raw)
-                    if len(parts) != 4:
-                        raise ValueError(f"Invalid color line (expected 4 tokens): {raw}")
-
-                    color_name = parts[0]
-                    L, A, B = map(float, parts[1:])
-                    colors.append((color_name, L, A, B))
-
-                # Create color_data struct
-                color_data = {}
-                for i in range(num_colors):
-                    color_name, L, A, B = colors[i]
-
-                    positive_prototype = np.array([L, A, B])
-
-                    negative_prototypes = []
-                    for j in range(num_colors):
-                        if i != j:
-                            _, L_neg, A_neg, B_neg = colors[j]
-                            negative_prototypes.append([L_neg, A_neg, B_neg])
-                    negative_prototypes = np.array(negative_prototypes)
-
-                    color_data[color_name] = {
-                        'Color': [L, A, B],
-                        'positive_prototype': positive_prototype,
-                        'negative_prototypes': negative_prototypes
-                    }
+                adjacency = None
+                if adjacency_edges is not None:
+                    adjacency = [[] for _ in colors]
+                    for a, b in adjacency_edges:
+                        adjacency[a].append(b)
 
                 # Read Core, alpha-cut and support
                 faces = []
@@ -425,7 +493,10 @@ class InputFCS(Input):
                         supports.append(Prototype(colors[i][0], colors[i][1:], negatives, voronoi_volume))
                         break
 
-                return color_data, FuzzyColorSpace(fcs_name, prototypes, cores, supports)
+                return color_data, FuzzyColorSpace(
+                    fcs_name, prototypes, cores, supports,
+                    adjacency=adjacency, adjusted_geometry=adjusted_geometry
+                )
 
         except (ValueError, IndexError, KeyError) as e:
             raise ValueError(f"Error reading .fcs file: {str(e)}")
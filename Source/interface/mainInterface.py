@@ -21,6 +21,7 @@ import platform
 import colorsys
 import itertools
 import threading
+import multiprocessing
 import webbrowser
 import numpy as np
 import tkinter as tk
@@ -39,6 +40,11 @@ from Source.fuzzy.FuzzyColorSpace import FuzzyColorSpace
 from Source.interface.modules.ImageManager import ImageManager
 from Source.interface.modules.FuzzyColorSpaceManager import FuzzyColorSpaceManager
 from Source.interface.modules.ColorEvaluationManager import ColorEvaluationManager
+from Source.interface.modules.JobScheduler import (
+    JobScheduler, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BATCH
+)
+from Source.interface.modules.ImageResultCache import ImageResultCache
+from Source.core import instrumentation
 
 import Source.interface.modules.UtilsTools as UtilsTools
 
@@ -46,6 +52,12 @@ import Source.interface.modules.UtilsTools as UtilsTools
 
 
 class PyFCSApp:
+    # Fields that describe the loaded color space (saved while a new one loads)
+    COLOR_SPACE_STATE_FIELDS = (
+        "file_path", "file_base_name", "color_data", "edit_color_data",
+        "fuzzy_color_space", "prototypes", "cores", "supports", "COLOR_SPACE",
+    )
+
     def __init__(self, root):
         # ---------------------------------------------------------------------
         # Core references / managers
@@ -65,6 +77,13 @@ class PyFCSApp:
         self.color_manager = ColorEvaluationManager(output_dir="test_results/Color_Evaluation")
         self.volume_limits = ReferenceDomain(0, 100, -128, 127, -128, 127)
 
+        # Shared background scheduler: bounded worker threads, priorities per job kind
+        # and a process pool for the CPU-heavy mapping kernel
+        self.job_scheduler = JobScheduler(process_kinds=("color_mapping_all",))
+
+        # Mapping results of every open image, stored per unique color under one LRU byte budget
+        self.image_result_cache = ImageResultCache()
+
         # ---------------------------------------------------------------------
         # Shared runtime state
         # ---------------------------------------------------------------------
@@ -81,6 +100,7 @@ class PyFCSApp:
         # Floating image viewport zoom state
         self.image_view_source = {}
         self.image_view_state = {}
+        self.image_view_pyramid = {}
         self._image_zoom_hover_window = None
         self._image_zoom_callbacks = {}
         self._image_zoom_mousewheel_bound = False
@@ -927,6 +947,7 @@ class PyFCSApp:
         """
         confirm_exit = messagebox.askyesno("Exit", "Are you sure you want to exit?")
         if confirm_exit:
+            self.job_scheduler.shutdown()
             self.root.destroy()
 
 
@@ -1869,8 +1890,9 @@ class PyFCSApp:
     # ============================================================================================================================================================
 
     def update_volumes(self):
-        # Process color prototypes from the input color data
-        self.prototypes = UtilsTools.process_prototypes(self.color_data)
+        # Process color prototypes from the input color data (on the shared process pool)
+        executor = self.job_scheduler if self.job_scheduler.process_workers > 1 else None
+        self.prototypes = UtilsTools.process_prototypes(self.color_data, executor=executor)
 
         # Create and store the fuzzy color space using the generated prototypes
         self.fuzzy_color_space = FuzzyColorSpace(space_name=" ", prototypes=self.prototypes)
@@ -1938,6 +1960,14 @@ class PyFCSApp:
         if not hasattr(self, "mapping_locked_until_original"):
             self.mapping_locked_until_original = {}
 
+        # Restored if the background load fails, so the UI never mixes two spaces
+        previous_state = {
+            name: getattr(self, name, None)
+            for name in self.COLOR_SPACE_STATE_FIELDS
+        }
+        previous_state["CAN_APPLY_MAPPING"] = dict(self.CAN_APPLY_MAPPING)
+        previous_state["mapping_locked_until_original"] = dict(self.mapping_locked_until_original)
+
         if hasattr(self, "floating_images") and self.floating_images:
             for window_id in list(self.floating_images.keys()):
                 mode = getattr(self, "window_mapping_mode", {}).get(window_id)
@@ -1958,38 +1988,132 @@ class PyFCSApp:
 
         self.show_loading_color_space()
 
+        # A newer load supersedes any load still building geometry
+        previous_load = getattr(self, "_color_space_load", None)
+        if previous_load is not None:
+            previous_load.cancel()
+        self._color_space_load = None
+
         try:
-            data = self.fuzzy_manager.load_color_file(filename)
+            # Only the color table is read here; geometry is built in the background
+            load = self.fuzzy_manager.load_color_file_staged(filename, scheduler=self.job_scheduler)
+
+        except ValueError as e:
+            self.custom_warning("File Error", str(e))
+            self.hide_loading()
+            return
+
+        self._color_space_load = load
 
+        # Geometry-dependent tools stay disabled until the "packed" stage
+        self.COLOR_SPACE = False
+        self.CAN_APPLY_MAPPING = {key: False for key in self.CAN_APPLY_MAPPING}
+
+        try:
             self.file_path = filename
             self.file_base_name = os.path.splitext(os.path.basename(filename))[0]
 
             if hasattr(self, "cm_cache_by_image"):
                 self.cm_cache_by_image.clear()
-            if hasattr(self, "proto_percentage_cache_by_image"):
-                self.proto_percentage_cache_by_image.clear()
+            # Per-image color indices stay valid; results of any space do not
+            self.image_result_cache.clear_results()
 
-            self.color_data = data["color_data"]
+            self.color_data = load.color_data
             self.edit_color_data = copy.deepcopy(self.color_data)
             self.display_data_window()
             self._reset_3d_canvas()
+            self._plot_representatives_preview()
 
-            if data["type"] == "cns":
-                self.update_volumes()
+        finally:
+            self.hide_loading()
 
-            elif data["type"] == "fcs":
-                self.fuzzy_color_space = data["fuzzy_color_space"]
-                self.cores = self.fuzzy_color_space.cores
-                self.supports = self.fuzzy_color_space.supports
-                self.prototypes = self.fuzzy_color_space.prototypes
-                self.fuzzy_color_space.precompute_pack()
-                self.update_prototypes_info()
+        def on_stage(load, stage):
+            if stage in ("packed", "error"):
+                self.root.after(0, lambda: self._on_color_space_load_stage(load, stage, previous_state))
 
-        except ValueError as e:
-            self.custom_warning("File Error", str(e))
+        load.add_callback(on_stage)
 
-        finally:
-            self.hide_loading()
+
+
+    def _on_color_space_load_stage(self, load, stage, previous_state=None):
+        """
+        Apply a finished background color-space load on the Tk thread.
+        If it failed, the color space that was loaded before is restored.
+        """
+        if load is not getattr(self, "_color_space_load", None):
+            return
+
+        self._color_space_load = None
+
+        if stage == "error":
+            if previous_state is not None:
+                self._restore_color_space_state(previous_state)
+            self.custom_warning("File Error", str(load.error))
+            return
+
+        self.fuzzy_color_space = load.fuzzy_color_space
+        self.prototypes = load.prototypes
+        self.cores = load.cores
+        self.supports = load.supports
+        self.update_prototypes_info()
+
+
+
+    def _restore_color_space_state(self, state):
+        """Put back the color space fields saved by load_color_space and redraw them."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
+        if getattr(self, "edit_color_data", None) is None:
+            self.edit_color_data = {}
+
+        self.display_data_window()
+        self._reset_3d_canvas()
+
+        if self.COLOR_SPACE:
+            self.update_prototypes_info()
+        elif self.color_data:
+            self._plot_representatives_preview()
+
+        # update_prototypes_info enables every window; keep the saved flags
+        self.CAN_APPLY_MAPPING = state["CAN_APPLY_MAPPING"]
+
+
+
+    def _plot_representatives_preview(self):
+        """
+        Draw only the representative points while the color-space geometry is
+        still loading, so the 3D view is usable at once.
+        """
+        try:
+            self._init_3d_canvas()
+
+            VisualManager.plot_combined_3D(
+                self.ax_3d,
+                self.file_base_name,
+                self.color_data,
+                [],
+                [],
+                [],
+                self.volume_limits,
+                self.hex_color,
+                ["Representative"],
+            )
+
+            display_name = str(self.file_base_name).replace("_", " ")
+            self.ax_3d.set_title(
+                f"{display_name} (loading volumes...)",
+                fontsize=13,
+                fontweight="semibold",
+                pad=10
+            )
+
+            self.graph_widget.draw()
+
+            if hasattr(self, "lab_value_frame"):
+                self.lab_value_frame.lift()
+        except Exception:
+            pass
 
 
 
@@ -2202,13 +2326,31 @@ class PyFCSApp:
                 )
 
 
-    def _on_apply_changes_saved_success(self, name, file_path, saved_color_data):
+    def _on_apply_changes_saved_success(self, name, file_path, saved_color_data, fuzzy_color_space=None, changes=None):
+        self._migrate_image_caches_after_edit(
+            getattr(self, "file_path", None),
+            file_path,
+            [p.label for p in getattr(self, "prototypes", None) or []],
+            [p.label for p in fuzzy_color_space.get_prototypes()] if fuzzy_color_space is not None else None,
+            changes
+        )
+
         self.color_data = copy.deepcopy(saved_color_data)
         self.edit_color_data = copy.deepcopy(saved_color_data)
         self.file_path = file_path
         self.file_base_name = name
 
-        self.update_volumes()
+        if fuzzy_color_space is not None:
+            # Incrementally edited space: unaffected cells were reused
+            self.fuzzy_color_space = fuzzy_color_space
+            self.fuzzy_color_space.precompute_pack()
+            self.prototypes = self.fuzzy_color_space.get_prototypes()
+            self.cores = self.fuzzy_color_space.get_cores()
+            self.supports = self.fuzzy_color_space.get_supports()
+            self.last_color_space_changes = changes
+            self.update_prototypes_info()
+        else:
+            self.update_volumes()
         self.display_data_window()
 
         messagebox.showinfo(
@@ -2217,9 +2359,63 @@ class PyFCSApp:
         )
         
 
-    def _save_color_space_file(self, name, color_dict, saved_color_data=None, apply_after_save=False):
+    def _migrate_image_caches_after_edit(self, old_file_path, new_file_path, old_labels, new_labels, changes):
+        """
+        Carry per-image results over a color-space edit instead of dropping them.
+
+        - Color Mapping All labels keep their unique colors and are marked with
+          the pending edit; run_process fixes them up with
+          ImageManager.relabel_uniques, reclassifying only affected colors.
+        - Prototype membership maps of prototypes whose geometry did not change
+          stay valid and are re-keyed to the prototype's new label.
+        Without a change report every result of the edited space is dropped.
+        """
+        cache = self.image_result_cache
+
+        # Palette/legend state refers to the old prototypes
+        view_cache = getattr(self, "cm_cache_by_image", {})
+        for scope in [scope for scope in list(view_cache) if scope[1] in (old_file_path, new_file_path)]:
+            view_cache.pop(scope, None)
+
+        items = cache.scope_items(old_file_path)
+        cache.drop_scope(old_file_path)
+        # Results stored under the target file name belong to another space
+        cache.drop_scope(new_file_path)
+
+        if changes is None or new_labels is None:
+            return
+
+        renamed = changes.get("renamed", {})
+        changed_old = set(changes.get("changed_old", ()))
+        new_label_set = set(new_labels)
+
+        for image_key, size, key, record in items:
+            record = dict(record)
+            values = record.pop("values")
+
+            if key == "labels":
+                if record.get("pending") is not None:
+                    # Edits are not chained; recompute this one from scratch
+                    continue
+                record["pending"] = {"old_labels": list(old_labels), "changes": changes}
+                new_key = key
+            else:
+                label = key[1]
+                new_label = renamed.get(label, label)
+                if label in changed_old or new_label not in new_label_set:
+                    continue
+                new_key = ("membership", new_label)
+
+            cache.put_result(image_key, size, new_file_path, new_key, values, **record)
+
+
+
+    def _save_color_space_file(self, name, color_dict, saved_color_data=None, apply_after_save=False, base_color_space=None):
         """
         Save a fuzzy color space file in a background thread.
+
+        If base_color_space is given, the saved space is derived from it with
+        FuzzyColorSpace.edited, so only the cells affected by the edit are rebuilt.
         """
         self.show_loading()
 
@@ -2256,17 +2452,24 @@ class PyFCSApp:
 
         def run_save_process():
             try:
+                edited_space, changes = None, None
+                if base_color_space is not None:
+                    edited_space, changes = base_color_space.edited(color_dict, space_name=name)
+
                 input_class = Input.instance(".fcs")
                 file_path = input_class.write_file(
                     name,
                     color_dict,
-                    progress_callback=update_progress
+                    progress_callback=update_progress,
+                    fuzzy_color_space=edited_space
                 )
 
                 if apply_after_save:
                     self.root.after(
                         0,
-                        lambda: self._on_apply_changes_saved_success(name, file_path, saved_color_data)
+                        lambda: self._on_apply_changes_saved_success(
+                            name, file_path, saved_color_data, edited_space, changes
+                        )
                     )
                 else:
                     self.root.after(
@@ -2284,14 +2487,14 @@ class PyFCSApp:
             finally:
                 self.root.after(0, self.hide_loading)
 
-        threading.Thread(target=run_save_process, daemon=True).start()
+        self.job_scheduler.submit(run_save_process, kind="save_color_space", priority=self._job_priority("save_color_space"))
 
 
     def save_cs(self, name, selected_colors_lab):
         self._save_color_space_file(name, selected_colors_lab)
 
 
-    def save_fcs(self, name, colors, color_dict=None, apply_after_save=False):
+    def save_fcs(self, name, colors, color_dict=None, apply_after_save=False, base_color_space=None):
         if color_dict is None:
             color_dict = {}
             used_names = set()
@@ -2316,7 +2519,8 @@ class PyFCSApp:
             name,
             color_dict,
             saved_color_data=copy.deepcopy(colors),
-            apply_after_save=apply_after_save
+            apply_after_save=apply_after_save,
+            base_color_space=base_color_space
         )
     
 
@@ -3971,7 +4175,7 @@ class PyFCSApp:
 
                     win.after(0, finish_error)
 
-            threading.Thread(target=worker, daemon=True).start()
+            self.job_scheduler.submit(worker, kind="auto_detection", priority=self._job_priority("auto_detection"))
 
         detect_button = ttk.Button(
             auto_controls,
@@ -4921,18 +5125,19 @@ class PyFCSApp:
                 self.lab_value_frame.lift()
             return
 
-        VisualManager.plot_combined_3D(
-            self.ax_3d,
-            self.file_base_name,
-            self.selected_centroids,
-            self.selected_core,
-            self.selected_alpha,
-            self.selected_support,
-            self.volume_limits,
-            self.hex_color,
-            selected_options,
-            self.filtered_points,
-        )
+        with instrumentation.stage("gui.model_3d.plot"):
+            VisualManager.plot_combined_3D(
+                self.ax_3d,
+                self.file_base_name,
+                self.selected_centroids,
+                self.selected_core,
+                self.selected_alpha,
+                self.selected_support,
+                self.volume_limits,
+                self.hex_color,
+                selected_options,
+                self.filtered_points,
+            )
 
         # Softer and smaller title
         display_name = str(self.file_base_name).replace("_", " ")
@@ -4943,7 +5148,8 @@ class PyFCSApp:
             pad=10
         )
 
-        self.graph_widget.draw()
+        # Coalesce quick successive toggles into a single redraw
+        self.graph_widget.draw_idle()
 
         if hasattr(self, "lab_value_frame"):
             self.lab_value_frame.lift()
@@ -4984,6 +5190,7 @@ class PyFCSApp:
             hex_color=self.hex_color,
             selected_options=selected_options,
             filtered_points=self.filtered_points,
+            fuzzy_color_space=getattr(self, "fuzzy_color_space", None),
         )
 
         if hasattr(self, "lab_value_frame"):
@@ -5901,7 +6108,8 @@ class PyFCSApp:
                 output_name,
                 new_color_data,
                 color_dict=color_dict,
-                apply_after_save=True
+                apply_after_save=True,
+                base_color_space=getattr(self, "fuzzy_color_space", None)
             )
 
         except Exception as e:
@@ -6292,6 +6500,7 @@ class PyFCSApp:
                 "window_mapping_mode",
                 "image_view_source",
                 "image_view_state",
+                "image_view_pyramid",
                 "_image_zoom_callbacks",
             ):
                 if hasattr(self, attr_name):
@@ -6397,6 +6606,44 @@ class PyFCSApp:
             pass
 
 
+    # Delay (ms) after the last zoom/resize event before the LANCZOS re-render
+    IMAGE_VIEW_SETTLE_MS = 180
+
+    def _get_image_view_level(self, window_id, source_pil, scale):
+        """
+        Return the coarsest cached pyramid level of source_pil that still has at
+        least `scale` times the source resolution, as (level_pil, fx, fy), where
+        fx/fy map source coordinates to level coordinates.
+
+        Levels are halved with Image.reduce and built lazily. The pyramid is
+        rebuilt when the window's zoom source changes.
+        """
+        if not hasattr(self, "image_view_pyramid"):
+            self.image_view_pyramid = {}
+
+        pyramid = self.image_view_pyramid.get(window_id)
+        if pyramid is None or pyramid["source"] is not source_pil:
+            pyramid = {"source": source_pil, "levels": [source_pil], "settle_after": None}
+            self.image_view_pyramid[window_id] = pyramid
+
+        levels = pyramid["levels"]
+        k = 0
+        while 1.0 / (2 ** (k + 1)) >= scale:
+            if k + 1 >= len(levels):
+                prev = levels[k]
+                if min(prev.size) < 4:
+                    break
+                try:
+                    levels.append(prev.reduce(2))
+                except ValueError:
+                    levels.append(prev.convert("RGBA").reduce(2))
+            k += 1
+
+        level = levels[k]
+        source_w, source_h = source_pil.size
+        return level, level.size[0] / source_w, level.size[1] / source_h
+
+
     def _ensure_image_zoom_mousewheel_binding(self):
         """
         Bind mouse wheel zoom once directly to the image canvas.
@@ -6610,8 +6857,6 @@ class PyFCSApp:
             self.window_image_key = {}
         if not hasattr(self, "cm_cache_by_image"):
             self.cm_cache_by_image = {}
-        if not hasattr(self, "proto_percentage_cache_by_image"):
-            self.proto_percentage_cache_by_image = {}
 
         # Generate unique ID
         while True:
@@ -6796,7 +7041,7 @@ class PyFCSApp:
 
             self._focus_floating_window(window_id)
 
-        def _update_image_to_size(window_id, target_w, target_h, reset_view=True):
+        def _update_image_to_size(window_id, target_w, target_h, reset_view=True, interactive=False):
             """
             Resize the floating image window while preserving aspect ratio.
 
@@ -6804,6 +7049,7 @@ class PyFCSApp:
             - This changes the window/image display size.
             - Mouse-wheel zoom does NOT call this function anymore.
             - Mouse-wheel zoom only changes the viewport crop.
+            - interactive=True renders with a fast filter (used while dragging).
             """
             source_pil = self.image_view_source.get(
                 window_id,
@@ -6827,7 +7073,7 @@ class PyFCSApp:
                     "cy": oh / 2,
                 }
 
-            _render_image_view(window_id)
+            _render_image_view(window_id, interactive=interactive)
             _relayout(window_id)
 
 
@@ -6880,13 +7126,17 @@ class PyFCSApp:
             return left, top, right, bottom
 
 
-        def _render_image_view(window_id):
+        def _render_image_view(window_id, interactive=False):
             """
             Render the current viewport crop into the existing floating image size.
 
             This is the key difference:
             - The image item keeps the same width/height.
             - The crop area changes according to zoom and center.
+
+            Only the visible region of the nearest cached pyramid level is resampled.
+            interactive=True uses a fast filter and schedules a LANCZOS render once
+            zoom/resize events stop arriving.
             """
             if window_id not in self.floating_window_state:
                 return
@@ -6902,14 +7152,28 @@ class PyFCSApp:
 
             left, top, right, bottom = _get_view_crop_box(window_id)
 
-            crop = source_pil.crop((
-                int(round(left)),
-                int(round(top)),
-                int(round(right)),
-                int(round(bottom))
-            ))
+            scale = max(draw_w / max(1e-6, right - left), draw_h / max(1e-6, bottom - top))
+            level, fx, fy = self._get_image_view_level(window_id, source_pil, scale)
+
+            pil_view = level.resize(
+                (draw_w, draw_h),
+                Image.Resampling.BILINEAR if interactive else Image.Resampling.LANCZOS,
+                box=(left * fx, top * fy, right * fx, bottom * fy)
+            )
 
-            pil_view = crop.resize((draw_w, draw_h), Image.Resampling.LANCZOS)
+            pyramid = self.image_view_pyramid.get(window_id, {})
+            if pyramid.get("settle_after") is not None:
+                try:
+                    self.image_canvas.after_cancel(pyramid["settle_after"])
+                except Exception:
+                    pass
+                pyramid["settle_after"] = None
+
+            if interactive:
+                pyramid["settle_after"] = self.image_canvas.after(
+                    self.IMAGE_VIEW_SETTLE_MS,
+                    lambda: _render_image_view(window_id)
+                )
 
             self.images[window_id] = pil_view
             self.image_dimensions[window_id] = (draw_w, draw_h)
@@ -7055,7 +7319,7 @@ class PyFCSApp:
                 state["cx"] = new_left + crop_w / 2
                 state["cy"] = new_top + crop_h / 2
 
-            _render_image_view(window_id)
+            _render_image_view(window_id, interactive=True)
 
             try:
                 self.image_canvas.itemconfig(
@@ -7164,6 +7428,7 @@ class PyFCSApp:
                 "window_mapping_mode",
                 "image_view_source",
                 "image_view_state",
+                "image_view_pyramid",
                 "_image_zoom_callbacks",
             ):
                 if hasattr(self, attr_name):
@@ -7304,7 +7569,8 @@ class PyFCSApp:
                 window_id,
                 desired_w,
                 desired_h,
-                reset_view=True
+                reset_view=True,
+                interactive=True
             )
             return "break"
 
@@ -7461,6 +7727,21 @@ class PyFCSApp:
 
 
 
+    # Scheduler priority per job kind (lower runs first). Interactive tools go
+    # before per-image analysis, and full-image mapping goes last.
+    JOB_PRIORITIES = {
+        "auto_detection": PRIORITY_INTERACTIVE,
+        "proto_percentage": PRIORITY_NORMAL,
+        "threshold_filter": PRIORITY_NORMAL,
+        "save_color_space": PRIORITY_NORMAL,
+        "color_mapping_all": PRIORITY_BATCH,
+    }
+
+    def _job_priority(self, kind):
+        return self.JOB_PRIORITIES.get(kind, PRIORITY_NORMAL)
+
+
+
     def _has_active_job(self, window_id):
         """Returns True if there is an active job for this image."""
         self._ensure_image_jobs()
@@ -7468,9 +7749,8 @@ class PyFCSApp:
         if not info:
             return False
 
-        th = info.get("thread")
-        cancel_event = info.get("cancel_event")
-        return th is not None and th.is_alive() and cancel_event is not None and not cancel_event.is_set()
+        job = info.get("job")
+        return job is not None and job.is_active()
 
 
 
@@ -7520,7 +7800,7 @@ class PyFCSApp:
 
     def _start_window_job(self, window_id, kind, target):
         """
-        Starts a thread-bound job associated with one image/window.
+        Queues a job associated with one image/window on the shared scheduler.
         Only one job can run at a time per window_id.
         """
         self._ensure_image_jobs()
@@ -7536,7 +7816,7 @@ class PyFCSApp:
         job_id = next(self._image_job_counter)
 
         self.image_jobs[window_id] = {
-            "thread": None,
+            "job": None,
             "cancel_event": cancel_event,
             "job_id": job_id,
             "kind": kind,
@@ -7553,21 +7833,28 @@ class PyFCSApp:
                     self.image_canvas.after(0, _ui_error)
                 except Exception:
                     pass
-            finally:
-                def _cleanup():
-                    info = self.image_jobs.get(window_id)
-                    if info and info.get("job_id") == job_id:
-                        self._hide_window_loading(window_id)
-                        self.image_jobs.pop(window_id, None)
 
-                try:
-                    self.image_canvas.after(0, _cleanup)
-                except Exception:
-                    pass
+        def on_done(_job):
+            # Also runs when the job was cancelled before leaving the queue
+            def _cleanup():
+                info = self.image_jobs.get(window_id)
+                if info and info.get("job_id") == job_id:
+                    self._hide_window_loading(window_id)
+                    self.image_jobs.pop(window_id, None)
+
+            try:
+                self.image_canvas.after(0, _cleanup)
+            except Exception:
+                pass
 
-        th = threading.Thread(target=runner, daemon=True)
-        self.image_jobs[window_id]["thread"] = th
-        th.start()
+        job = self.job_scheduler.submit(
+            runner,
+            kind=kind,
+            priority=self._job_priority(kind),
+            cancel_event=cancel_event
+        )
+        self.image_jobs[window_id]["job"] = job
+        job.add_done_callback(on_done)
 
         return job_id
 
@@ -7797,9 +8084,8 @@ class PyFCSApp:
         self._ensure_image_jobs()
 
         for info in self.image_jobs.values():
-            th = info.get("thread")
-            cancel_event = info.get("cancel_event")
-            if th is not None and th.is_alive() and cancel_event is not None and not cancel_event.is_set():
+            job = info.get("job")
+            if job is not None and job.is_active():
                 return True
         return False
 
@@ -8165,17 +8451,12 @@ class PyFCSApp:
 
         image_key = self.window_image_key[window_id]
         color_space_key = getattr(self, "file_path", None)
-        cache_scope = (image_key, color_space_key)
 
         def run_process(cancel_event, job_id):
             try:
                 if self._is_job_cancelled(window_id, cancel_event, job_id):
                     return
 
-                if not hasattr(self, "proto_percentage_cache_by_image"):
-                    self.proto_percentage_cache_by_image = {}
-                scope_cache = self.proto_percentage_cache_by_image.setdefault(cache_scope, {})
-
                 if not hasattr(self, "images") or window_id not in self.images:
                     self.image_canvas.after(
                         0,
@@ -8189,27 +8470,33 @@ class PyFCSApp:
                 valid_mask = UtilsTools._get_alpha_mask_from_pil(source_img)
                 processing_img = UtilsTools._pil_rgb_for_processing(source_img)
 
-                cache_key = (pos, w, h)
-                cached_entry = scope_cache.get(cache_key)
+                cache = self.image_result_cache
+                cache_key = ("membership", selected_proto)
+                cached_entry = cache.get_result(image_key, (w, h), color_space_key, cache_key)
+                grayscale_image_array = None
 
                 if cached_entry is not None:
                     if self._is_job_cancelled(window_id, cancel_event, job_id):
                         return
-                    grayscale_image_array = cached_entry["array"]
+                    grayscale_image_array = cache.expand(image_key, (w, h), cached_entry["values"], fill=0)
                     pct = cached_entry["pct"]
-                else:
+
+                if grayscale_image_array is None:
                     def update_progress(current_step, total_steps):
                         if cancel_event.is_set():
                             raise RuntimeError("__JOB_CANCELLED__")
                         self._update_window_progress(window_id, job_id, current_step, total_steps)
 
+                    unique_pack = cache.get_index(image_key, (w, h)) or {}
+
                     grayscale_image_array = self.image_manager.get_proto_percentage(
                         prototypes=self.prototypes,
                         image=processing_img,
                         fuzzy_color_space=self.fuzzy_color_space,
                         selected_option=pos,
                         progress_callback=update_progress,
-                        cancel_callback=lambda: cancel_event.is_set()
+                        cancel_callback=lambda: cancel_event.is_set(),
+                        unique_pack=unique_pack
                     )
 
                     if grayscale_image_array is None:
@@ -8227,11 +8514,13 @@ class PyFCSApp:
                         valid_mask
                     )
 
-                    scope_cache[cache_key] = {
-                        "array": grayscale_image_array,
-                        "pct": pct,
-                        "thresh_used": thresh
-                    }
+                    cache.put_index(image_key, (w, h), unique_pack["uniq"], unique_pack["inv"], valid_mask)
+                    cache.put_result(
+                        image_key, (w, h), color_space_key, cache_key,
+                        unique_pack["values"],
+                        pct=pct,
+                        thresh_used=thresh
+                    )
 
                 def _ui():
                     if not self._is_current_job(window_id, job_id):
@@ -8260,6 +8549,7 @@ class PyFCSApp:
 
 
 
+    @instrumentation.timed("gui.color_mapping.display")
     def display_color_mapping(self, grayscale_image_array, window_id):
         """Displays the generated grayscale image in the graphical interface, preserving transparency."""
         try:
@@ -8479,12 +8769,21 @@ class PyFCSApp:
 
 
 
+    # Images with at least this many pixels are mapped progressively: a coarse
+    # preview first, then exact results band by band.
+    PROGRESSIVE_MAPPING_MIN_PIXELS = 250000
+
+    # Bands finished within this many seconds of the last redraw are not drawn;
+    # the next redraw (or the final map) includes them.
+    PROGRESSIVE_REDRAW_INTERVAL = 0.1
+
     def color_mapping_all(self, window_id):
         """
         Fast Tkinter Color Mapping All operation.
 
         UI/job/cache orchestration stays here.
         Label-map computation, palette generation and recoloring live in ImageManager.
+        Large images show a coarse preview at once and refine it as exact bands arrive.
         """
         items = self.image_canvas.find_withtag(window_id)
         if not items:
@@ -8555,7 +8854,7 @@ class PyFCSApp:
                 return
             self._update_window_progress(window_id, job_id, current_step, total_steps)
 
-        def build_legend_frame(prototypes, parent_canvas, palette_uint8):
+        def build_legend_frame(prototypes, parent_canvas, palette_uint8, coverage=None):
             """Create and return the legend frame for the current palette."""
             legend_frame = tk.Frame(parent_canvas, bg="white", relief="solid", bd=1)
             legend_frame.grid_rowconfigure(0, weight=1)
@@ -8605,9 +8904,13 @@ class PyFCSApp:
                 luminance = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
                 text_color = "white" if luminance < 80 else "black"
 
+                text = prototype.label
+                if coverage is not None and i < len(coverage):
+                    text = f"{prototype.label} ({coverage[i]:.1f}%)"
+
                 label = tk.Label(
                     inner_frame,
-                    text=prototype.label,
+                    text=text,
                     bg=color_hex,
                     fg=text_color,
                     padx=5,
@@ -8620,6 +8923,7 @@ class PyFCSApp:
 
             return legend_frame
 
+        @instrumentation.timed("gui.color_mapping_all.display")
         def update_ui(recolored_image, new_legend_frame):
             """Update the UI safely from the main thread."""
             try:
@@ -8700,6 +9004,87 @@ class PyFCSApp:
             except Exception as e:
                 self.custom_warning("Display Error", f"Error displaying the image: {e}")
 
+        partial_view = {"previous_photo": None, "latest": 0}
+
+        @instrumentation.timed("gui.color_mapping_all.preview")
+        def show_partial(job_id, label_map, palette, seq):
+            """Show an intermediate label map without touching the image source or zoom state."""
+            if not self._is_current_job(window_id, job_id) or not self._window_exists(window_id):
+                return
+
+            # A newer snapshot is already queued behind this one
+            if seq != partial_view["latest"]:
+                return
+
+            try:
+                recolored = self.image_manager.recolor_label_map(label_map, palette)
+                img_tk = ImageTk.PhotoImage(Image.fromarray(recolored, mode="RGBA"))
+
+                image_items = self.image_canvas.find_withtag(f"{window_id}_click_image")
+                if not image_items:
+                    return
+
+                if partial_view["previous_photo"] is None:
+                    partial_view["previous_photo"] = self.floating_images.get(window_id)
+
+                self.floating_images[window_id] = img_tk
+                self.image_canvas.itemconfig(image_items[0], image=img_tk)
+                self._raise_all_loading_panels()
+            except Exception:
+                pass
+
+        def restore_partial():
+            """Put back the image shown before the preview if the job did not finish."""
+            previous = partial_view["previous_photo"]
+            if previous is None or self._has_active_job(window_id) or not self._window_exists(window_id):
+                return
+
+            try:
+                image_items = self.image_canvas.find_withtag(f"{window_id}_click_image")
+                if image_items:
+                    self.floating_images[window_id] = previous
+                    self.image_canvas.itemconfig(image_items[0], image=previous)
+            except Exception:
+                pass
+
+        def compute_progressive(job_id, cancel_event, processing_img, valid_mask, palette, executor, unique_pack=None):
+            working = {"labels": None, "last_redraw": 0.0}
+
+            def schedule_partial(labels):
+                working["last_redraw"] = time.perf_counter()
+                partial_view["latest"] += 1
+                snapshot, seq = labels.copy(), partial_view["latest"]
+                self.image_canvas.after(0, lambda: show_partial(job_id, snapshot, palette, seq))
+
+            def on_preview(preview):
+                working["labels"] = preview
+                schedule_partial(preview)
+
+            def on_tile(y0, y1, band):
+                labels = working["labels"]
+                if labels is None:
+                    return
+                labels[y0:y1] = band
+                if time.perf_counter() - working["last_redraw"] >= self.PROGRESSIVE_REDRAW_INTERVAL:
+                    schedule_partial(labels)
+
+            label_map = self.image_manager.get_best_prototype_label_map_progressive(
+                image=processing_img,
+                fuzzy_color_space=self.fuzzy_color_space,
+                valid_mask=valid_mask,
+                preview_callback=on_preview,
+                tile_callback=on_tile,
+                progress_callback=lambda current, total: update_progress(job_id, current, total),
+                cancel_callback=lambda: self._is_job_cancelled(window_id, cancel_event, job_id),
+                executor=executor,
+                unique_pack=unique_pack
+            )
+
+            if label_map is None:
+                self.image_canvas.after(0, restore_partial)
+
+            return label_map
+
         def recolor(window_id):
             """Switch displayed palette without recomputing memberships."""
             if getattr(self, "mapping_locked_until_original", {}).get(window_id, False):
@@ -8720,7 +9105,20 @@ class PyFCSApp:
             if not cache_pack:
                 return
 
-            label_map = cache_pack["label_map"]
+            cache = self.image_result_cache
+            size = cache_pack["size"]
+            entry = cache.get_result(image_key, size, color_space_key, "labels")
+            label_map = None
+            if entry is not None and entry.get("pending") is None:
+                label_map = cache.expand(image_key, size, entry["values"], fill=-1, dtype=np.int32)
+
+            if label_map is None:
+                self.custom_warning(
+                    "Color Mapping All",
+                    "This result is no longer cached. Run Color Mapping All again to switch palettes."
+                )
+                return
+
             palettes = cache_pack["palettes"]
             current = cache_pack["scheme"]
 
@@ -8730,8 +9128,9 @@ class PyFCSApp:
             palette = palettes[new]
             recolored_image = self.image_manager.recolor_label_map(label_map, palette)
 
-            new_legend_frame = build_legend_frame(self.prototypes, self.image_canvas, palette)
-            cache_pack["legend_frame"] = new_legend_frame
+            new_legend_frame = build_legend_frame(
+                self.prototypes, self.image_canvas, palette, cache_pack.get("coverage")
+            )
 
             self.image_canvas.after(0, lambda: update_ui(recolored_image, new_legend_frame))
 
@@ -8758,41 +9157,97 @@ class PyFCSApp:
                 scope_cache = self.cm_cache_by_image.setdefault(cache_scope, {})
 
                 proto_labels = tuple([p.label for p in self.prototypes])
-                cache_key = (w, h, proto_labels)
-                label_map = scope_cache.get(cache_key)
-
-                if label_map is None:
-                    label_map = self.image_manager.get_best_prototype_label_map(
-                        image=processing_img,
-                        fuzzy_color_space=self.fuzzy_color_space,
-                        valid_mask=valid_mask,
-                        progress_callback=lambda current, total: update_progress(job_id, current, total),
+                size = (w, h)
+                executor = self.job_scheduler if self.job_scheduler.is_process_backed("color_mapping_all") else None
+
+                cache = self.image_result_cache
+                label_map = None
+                index = cache.get_index(image_key, size)
+                entry = cache.get_result(image_key, size, color_space_key, "labels") if index is not None else None
+
+                if entry is not None and entry.get("pending") is not None:
+                    # Cached before a color-space edit: reclassify only affected colors
+                    pending = entry["pending"]
+                    result = self.image_manager.relabel_uniques(
+                        index["uniq"],
+                        entry["values"],
+                        pending["old_labels"],
+                        self.fuzzy_color_space,
+                        pending["changes"],
+                        executor=executor,
                         cancel_callback=lambda: self._is_job_cancelled(window_id, cancel_event, job_id)
                     )
+                    if result is None:
+                        return
+
+                    labels, _reclassified = result
+                    entry = cache.put_result(
+                        image_key, size, color_space_key, "labels",
+                        labels.astype(np.int16),
+                        proto_labels=proto_labels,
+                        pending=None
+                    )
+
+                if entry is not None and entry.get("proto_labels") == proto_labels:
+                    label_map = cache.expand(image_key, size, entry["values"], fill=-1, dtype=np.int32)
+
+                original_palette = self.image_manager.build_original_palette_uint8(self.prototypes)
+                alt_palette = self.image_manager.build_alt_palette_uint8(
+                    self.prototypes, self.fuzzy_color_space.get_hex_colors()
+                )
+
+                if label_map is None:
+                    unique_pack = dict(index) if index is not None else {}
+
+                    if w * h >= self.PROGRESSIVE_MAPPING_MIN_PIXELS:
+                        label_map = compute_progressive(
+                            job_id, cancel_event, processing_img, valid_mask, alt_palette, executor, unique_pack
+                        )
+                    else:
+                        label_map = self.image_manager.get_best_prototype_label_map(
+                            image=processing_img,
+                            fuzzy_color_space=self.fuzzy_color_space,
+                            valid_mask=valid_mask,
+                            progress_callback=lambda current, total: update_progress(job_id, current, total),
+                            cancel_callback=lambda: self._is_job_cancelled(window_id, cancel_event, job_id),
+                            executor=executor,
+                            unique_pack=unique_pack
+                        )
 
                     if label_map is None:
                         return
 
-                    scope_cache[cache_key] = label_map
+                    cache.put_index(image_key, size, unique_pack["uniq"], unique_pack["inv"], valid_mask)
+                    cache.put_result(
+                        image_key, size, color_space_key, "labels",
+                        unique_pack["labels"].astype(np.int16),
+                        proto_labels=proto_labels,
+                        pending=None
+                    )
 
                 if self._is_job_cancelled(window_id, cancel_event, job_id):
+                    self.image_canvas.after(0, restore_partial)
                     return
 
-                original_palette = self.image_manager.build_original_palette_uint8(self.prototypes)
-                alt_palette = self.image_manager.build_alt_palette_uint8(self.prototypes, self.hex_color)
+                # Full coverage distribution from the same label map, in one pass.
+                coverage = self.image_manager.estimate_all_proto_coverage(
+                    label_map,
+                    valid_mask=valid_mask,
+                    n_prototypes=len(self.prototypes)
+                )
 
                 # Show representative color-space colors first.
                 scheme = "alt"
                 palette = alt_palette
                 recolored_image = self.image_manager.recolor_label_map(label_map, palette)
-                new_legend_frame = build_legend_frame(self.prototypes, self.image_canvas, palette)
+                new_legend_frame = build_legend_frame(self.prototypes, self.image_canvas, palette, coverage)
 
+                # Palette state only; the label map is rebuilt from image_result_cache
                 scope_cache["last_pack"] = {
-                    "label_map": label_map,
                     "palettes": {"original": original_palette, "alt": alt_palette},
                     "scheme": scheme,
-                    "legend_frame": new_legend_frame,
-                    "cache_key": cache_key,
+                    "size": size,
+                    "coverage": coverage,
                 }
 
                 def _ui():
@@ -8957,7 +9412,11 @@ class PyFCSApp:
                 self.root.after(0, self.hide_loading)
 
         # Run the expensive filtering process in a background thread.
-        threading.Thread(target=run_threshold_process, daemon=True).start()
+        self.job_scheduler.submit(
+            run_threshold_process,
+            kind="threshold_filter",
+            priority=self._job_priority("threshold_filter")
+        )
 
 
 
@@ -16119,6 +16578,7 @@ class PyFCSApp:
             closest_label=ctx.get("closest_label"),
             closest_lab=ctx.get("closest_lab"),
             closest_hex=ctx.get("closest_hex", "#000000"),
+            fuzzy_color_space=getattr(self, "fuzzy_color_space", None),
         )
 
         self._show_color_eval_plotly_figure_in_browser(
@@ -16662,4 +17122,6 @@ def start_up():
     root.mainloop()
 
 if __name__ == '__main__':
+    # Required for the scheduler's process pool in frozen Windows builds
+    multiprocessing.freeze_support()
     start_up()
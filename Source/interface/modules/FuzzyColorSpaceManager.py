@@ -1,10 +1,13 @@
 from tkinter import ttk
 import tkinter as tk
 import os
+import threading
 import numpy as np
 
 ### my libraries ###
 from Source.input_output.Input import Input
+from Source.fuzzy.FuzzyColorSpace import FuzzyColorSpace
+from Source.interface.modules.JobScheduler import PRIORITY_INTERACTIVE
 import Source.interface.modules.UtilsTools as UtilsTools
 
 """
@@ -18,8 +21,118 @@ In practice, it acts as a bridge between:
 (1) file parsing (delegated to Input.instance(extension))
 and
 (2) the GUI representation of colors in scrollable lists or selection panels.
+
+It also provides a staged loader (StagedColorSpaceLoad) that returns the color
+table at once and builds or parses the geometry in the background.
 """
 
+
+class StagedColorSpaceLoad:
+    """
+    Handle for a color space being loaded in the background.
+
+    Stages are reached in order:
+        "prototypes"   color_data (representatives) is available
+        "voronoi"      Voronoi prototypes are built/parsed
+        "core/support" cores and supports are built/parsed
+        "packed"       fuzzy_color_space is ready for membership queries
+
+    Each stage has a threading.Event in `events`. Callbacks registered with
+    add_callback are called as fn(load, stage) for every stage reached and with
+    stage "error" if loading fails. They run on the loading thread.
+    """
+    STAGES = ("prototypes", "voronoi", "core/support", "packed")
+
+    def __init__(self, filename, file_type, color_data, executor=None):
+        self.filename = filename
+        self.type = file_type
+        self.color_data = color_data
+        # Process pool reused for the Voronoi builds (None: temporary pool)
+        self.executor = executor
+
+        self.prototypes = None
+        self.cores = None
+        self.supports = None
+        self.fuzzy_color_space = None
+        self.error = None
+
+        self.events = {stage: threading.Event() for stage in self.STAGES}
+        self.cancel_event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+        self.events["prototypes"].set()
+
+    def is_ready(self, stage):
+        return self.events[stage].is_set()
+
+    def wait(self, stage, timeout=None):
+        return self.events[stage].wait(timeout)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def add_callback(self, fn):
+        """Register fn(load, stage); stages already reached are replayed at once."""
+        with self._lock:
+            self._callbacks.append(fn)
+            reached = [stage for stage in self.STAGES if self.events[stage].is_set()]
+            failed = self.error is not None
+
+        for stage in reached:
+            fn(self, stage)
+        if failed:
+            fn(self, "error")
+
+    def _notify(self, stage):
+        with self._lock:
+            if stage != "error":
+                self.events[stage].set()
+            callbacks = list(self._callbacks)
+
+        for fn in callbacks:
+            try:
+                fn(self, stage)
+            except Exception:
+                pass
+
+    def _run(self):
+        """Build or parse the geometry, reporting each stage. Runs on a scheduler worker thread."""
+        try:
+            if self.type == "cns":
+                self.prototypes = UtilsTools.process_prototypes(self.color_data, executor=self.executor)
+                if self.cancel_event.is_set():
+                    return
+                self._notify("voronoi")
+
+                fuzzy_color_space = FuzzyColorSpace(space_name=" ", prototypes=self.prototypes)
+                self.cores = fuzzy_color_space.get_cores()
+                self.supports = fuzzy_color_space.get_supports()
+                if self.cancel_event.is_set():
+                    return
+                self._notify("core/support")
+
+            else:
+                input_class = Input.instance(".fcs")
+                _color_data, fuzzy_color_space = input_class.read_file(self.filename)
+                self.prototypes = fuzzy_color_space.prototypes
+                self.cores = fuzzy_color_space.cores
+                self.supports = fuzzy_color_space.supports
+                if self.cancel_event.is_set():
+                    return
+                self._notify("voronoi")
+                self._notify("core/support")
+
+            fuzzy_color_space.precompute_pack()
+            self.fuzzy_color_space = fuzzy_color_space
+            if self.cancel_event.is_set():
+                return
+            self._notify("packed")
+
+        except Exception as e:
+            self.error = e
+            self._notify("error")
+
 class FuzzyColorSpaceManager:
     # Supported file extensions for fuzzy color spaces / color datasets
     SUPPORTED_EXTENSIONS = {'.cns', '.fcs'}
@@ -75,6 +188,51 @@ class FuzzyColorSpaceManager:
                 'fuzzy_color_space': fuzzy_color_space
             }
 
+    @staticmethod
+    def load_color_file_staged(filename, scheduler=None):
+        """
+        Start loading a .cns or .fcs file in stages.
+
+        The color table is read synchronously, so the returned
+        StagedColorSpaceLoad already has color_data ("prototypes" stage).
+        Geometry is built (.cns) or parsed (.fcs) on the scheduler. Without a
+        scheduler it is built before returning, so every stage (or "error")
+        has been reached. Voronoi builds use the scheduler's process pool
+        when it has one.
+
+        Raises
+        ------
+        ValueError
+            If the file extension is not supported or the color table is invalid.
+        """
+        extension = os.path.splitext(filename)[1].lower()
+
+        if extension not in FuzzyColorSpaceManager.SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {extension}")
+
+        input_class = Input.instance(extension)
+
+        if extension == '.cns':
+            color_data = input_class.read_file(filename)
+        else:
+            color_data = input_class.read_color_table(filename)
+
+        # Reuse the scheduler's process pool instead of starting one per load
+        executor = scheduler if scheduler is not None and scheduler.process_workers > 1 else None
+        load = StagedColorSpaceLoad(filename, extension[1:], color_data, executor=executor)
+
+        if scheduler is not None:
+            scheduler.submit(
+                load._run,
+                kind="load_color_space",
+                priority=PRIORITY_INTERACTIVE,
+                cancel_event=load.cancel_event
+            )
+        else:
+            load._run()
+
+        return load
+
     def create_color_display_frame(
     self,
     parent,
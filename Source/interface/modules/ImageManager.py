@@ -2,12 +2,20 @@ import tkinter as tk
 from tkinter import ttk
 from skimage import color
 import matplotlib.pyplot as plt
-import math, colorsys, numpy as np
+import math, colorsys, hashlib, threading, numpy as np
+from collections import OrderedDict
+from scipy import ndimage
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
 from sklearn.cluster import DBSCAN
 from PIL import Image
 
 ### my libraries ###
+from Source.core import instrumentation
+from Source.core import labelmaps
+from Source.core.labelmaps import best_labels_for_lab_chunk as _best_labels_for_lab_chunk, lab_from_scaled as _lab_from_scaled
 from Source.interface.modules import UtilsTools  
+from Source.interface.modules.JobScheduler import JobCancelled
 
 
 """
@@ -23,7 +31,29 @@ It provides:
     - Automatic main-color detection in an image using DBSCAN clustering in LAB space, returning
     representative colors in both LAB and RGB.
 """
+
+
 class ImageManager:
+    # Unique colors per process-pool task in get_best_prototype_label_map
+    LABEL_MAP_CHUNK_SIZE = 4000
+
+    # Fewer unique colors are classified in the calling thread: below this,
+    # starting and feeding the spawn process pool costs more than it saves
+    PROCESS_MIN_UNIQUE_COLORS = 100000
+
+    # Unique colors per vectorized membership call (bounds memory, keeps cancel responsive)
+    MEMBERSHIP_BATCH_SIZE = 2048
+
+    # Radius used to build the cached palette neighbourhood graph. It covers the
+    # largest DBSCAN eps reachable from the threshold slider (threshold 0.0).
+    PALETTE_GRAPH_RADIUS = 1.5
+
+    # Number of image graphs kept in memory for threshold re-detection.
+    PALETTE_GRAPH_CACHE_SIZE = 4
+
+    # Pixels converted to LAB and binned at a time by get_fcs_image_histogram
+    HISTOGRAM_CHUNK_PIXELS = 1 << 18
+
     def __init__(self, root=None, custom_warning=None, center_popup=None):
         """
         Args:
@@ -35,6 +65,10 @@ class ImageManager:
         self.custom_warning = custom_warning
         self.center_popup = center_popup
 
+        # Palette neighbourhood graphs keyed by a digest of the quantized LAB samples
+        self._palette_graph_cache = OrderedDict()
+        self._palette_graph_lock = threading.Lock()
+
     # ------------------------------------------------------------------
     # Simple utilities
     # ------------------------------------------------------------------
@@ -273,25 +307,11 @@ class ImageManager:
 
 
 
-    @staticmethod
-    def _pil_to_rgb_uint8(image):
-        """Return a uint8 RGB NumPy array from a PIL image, safely handling grayscale/RGBA images."""
-        img_np = np.asarray(image)
-
-        if img_np.ndim == 2:
-            img_np = np.stack([img_np, img_np, img_np], axis=-1)
-        elif img_np.shape[-1] == 4:
-            img_np = img_np[..., :3]
-        elif img_np.shape[-1] > 3:
-            img_np = img_np[..., :3]
-
-        return img_np.astype(np.uint8, copy=False)
+    _pil_to_rgb_uint8 = staticmethod(labelmaps.pil_to_rgb_uint8)
 
     def _pil_to_lab_image(self, image):
         """Convert a PIL image to LAB using skimage, returning an H x W x 3 float array."""
-        img_rgb = self._pil_to_rgb_uint8(image)
-        img01 = img_rgb.astype(np.float32) / 255.0
-        return color.rgb2lab(img01)
+        return labelmaps.pil_to_lab_image(image)
 
     def get_proto_percentage(
         self,
@@ -301,6 +321,7 @@ class ImageManager:
         selected_option,
         progress_callback=None,
         cancel_callback=None,
+        unique_pack=None,
     ):
         """
         Generate a grayscale membership map for one selected prototype.
@@ -310,6 +331,10 @@ class ImageManager:
         - Quantizes LAB to 0.01.
         - Computes membership only for unique LAB values.
         - Reconstructs the full image using the inverse map.
+
+        If `unique_pack` is a dict, "uniq"/"inv" are reused when present and it
+        is filled with "uniq", "inv" and "values" (uint8 membership per unique
+        color), as in get_best_prototype_label_map.
         """
         if selected_option < 0 or selected_option >= len(prototypes):
             raise ValueError("Selected prototype index is out of range.")
@@ -317,38 +342,37 @@ class ImageManager:
         if cancel_callback and cancel_callback():
             return None
 
-        lab_image = self._pil_to_lab_image(image)
-        height, width = lab_image.shape[:2]
-
-        lab_int = np.round(lab_image.reshape(-1, 3) * 100.0).astype(np.int32)
-        uniq, inv = np.unique(lab_int, axis=0, return_inverse=True)
+        uniq, inv, height, width = self._image_uniques(image, unique_pack)
 
         values_for_uniq = np.empty((uniq.shape[0],), dtype=np.float32)
         total_uniqs = int(uniq.shape[0])
+        instrumentation.count("image.evaluated_colors", total_uniqs)
 
-        for i in range(total_uniqs):
-            if cancel_callback and cancel_callback():
-                return None
-
-            lab_tuple = tuple((uniq[i].astype(np.float32) / 100.0).tolist())
-            value = fuzzy_color_space.calculate_membership_for_prototype(
-                lab_tuple,
-                selected_option
-            )
-            values_for_uniq[i] = np.clip(float(value), 0.0, 1.0)
+        batch = self.MEMBERSHIP_BATCH_SIZE
 
-            if progress_callback and (i % 500 == 0 or i == total_uniqs - 1):
+        with instrumentation.stage("image.membership_for_prototype"):
+            for start in range(0, total_uniqs, batch):
                 if cancel_callback and cancel_callback():
                     return None
-                progress_callback(i + 1, total_uniqs)
 
-        grayscale_image = (
-            values_for_uniq[inv]
-            .reshape(height, width)
-            * 255.0
-        ).astype(np.uint8)
+                stop = min(total_uniqs, start + batch)
+                values = fuzzy_color_space.calculate_membership_for_prototype_batch(
+                    _lab_from_scaled(uniq[start:stop]),
+                    selected_option
+                )
+                values_for_uniq[start:stop] = np.clip(values, 0.0, 1.0)
+
+                if progress_callback:
+                    progress_callback(stop, total_uniqs)
+
+        values_uint8 = (values_for_uniq * 255.0).astype(np.uint8)
 
-        return grayscale_image
+        if unique_pack is not None:
+            unique_pack["uniq"] = uniq
+            unique_pack["inv"] = inv
+            unique_pack["values"] = values_uint8
+
+        return values_uint8[inv].reshape(height, width)
 
     @staticmethod
     def estimate_proto_coverage(grayscale_image_array, valid_mask):
@@ -381,6 +405,9 @@ class ImageManager:
         pct = 100.0 * (colored / valid_total)
         return pct, threshold
 
+    # Percentage of valid pixels covered by every prototype (label map and/or membership stack)
+    estimate_all_proto_coverage = staticmethod(labelmaps.estimate_all_proto_coverage)
+
     def get_best_prototype_label_map(
         self,
         image,
@@ -388,10 +415,23 @@ class ImageManager:
         valid_mask=None,
         progress_callback=None,
         cancel_callback=None,
+        executor=None,
+        unique_pack=None,
     ):
         """
         Compute the best-prototype label map for the full image.
 
+        If `executor` is given (a JobScheduler with more than one process
+        worker) and the image has at least PROCESS_MIN_UNIQUE_COLORS unique
+        colors, they are split into chunks and evaluated on its process pool;
+        otherwise they are evaluated in the calling thread.
+
+        If `unique_pack` is a dict, it is filled with "uniq" (U x 3 LAB scaled
+        by 100), "labels" (best prototype per unique color) and "inv" (flat
+        pixel -> unique index), so the map can later be fixed up with
+        relabel_uniques instead of recomputed. If it already holds "uniq" and
+        "inv" for this image (e.g. from ImageResultCache), they are reused.
+
         Returns:
             np.ndarray of shape (H, W), dtype int32.
             Pixels without assignment/background are -1 when valid_mask is supplied.
@@ -401,162 +441,610 @@ class ImageManager:
 
         fuzzy_color_space.precompute_pack()
 
-        lab_image = self._pil_to_lab_image(image)
-        height, width = lab_image.shape[:2]
-
-        lab_int = np.round(lab_image.reshape(-1, 3) * 100.0).astype(np.int32)
-        uniq, inv = np.unique(lab_int, axis=0, return_inverse=True)
+        uniq, inv, height, width = self._image_uniques(image, unique_pack)
 
-        best_for_uniq = np.empty((uniq.shape[0],), dtype=np.int32)
         total_uniqs = int(uniq.shape[0])
+        instrumentation.count("image.evaluated_colors", total_uniqs)
 
-        for i in range(total_uniqs):
-            if cancel_callback and cancel_callback():
+        if self._use_executor(executor, total_uniqs):
+            with instrumentation.stage("image.classify_parallel"):
+                best_for_uniq = self._best_labels_parallel(
+                    uniq, fuzzy_color_space, executor, progress_callback, cancel_callback
+                )
+            if best_for_uniq is None:
                 return None
+            self._fill_unique_pack(unique_pack, uniq, best_for_uniq, inv)
+            return self._finish_label_map(best_for_uniq[inv], height, width, valid_mask)
+
+        best_for_uniq = np.empty((total_uniqs,), dtype=np.int32)
 
-            lab_tuple = tuple((uniq[i].astype(np.float32) / 100.0).tolist())
-            best_idx = fuzzy_color_space.best_prototype_index_from_lab(lab_tuple)
-            best_for_uniq[i] = int(best_idx) if best_idx is not None else -1
+        batch = self.MEMBERSHIP_BATCH_SIZE
 
-            if progress_callback and (i % 500 == 0 or i == total_uniqs - 1):
+        with instrumentation.stage("image.classify"):
+            for start in range(0, total_uniqs, batch):
                 if cancel_callback and cancel_callback():
                     return None
-                progress_callback(i + 1, total_uniqs)
 
-        label_map = best_for_uniq[inv].reshape(height, width).astype(np.int32)
+                stop = min(total_uniqs, start + batch)
+                best_for_uniq[start:stop] = _best_labels_for_lab_chunk(fuzzy_color_space, uniq[start:stop])
 
-        if valid_mask is not None:
-            if valid_mask.shape != label_map.shape:
-                raise ValueError("valid_mask shape does not match the generated label map.")
-            label_map[~valid_mask] = -1
+                if progress_callback:
+                    progress_callback(stop, total_uniqs)
 
-        return label_map
+        self._fill_unique_pack(unique_pack, uniq, best_for_uniq, inv)
+        return self._finish_label_map(best_for_uniq[inv], height, width, valid_mask)
 
-    @staticmethod
-    def build_original_palette_uint8(prototypes):
-        """
-        Build a dynamic high-contrast visualization palette in prototype order.
-        Requires: import matplotlib.pyplot as plt
-        """
-        n = len(prototypes)
-        if n == 0:
-            return np.zeros((0, 3), dtype=np.uint8)
-
-        qualitative_cmaps = ["tab20", "tab20b", "tab20c", "Set3", "Dark2", "Accent"]
-        colors = []
-
-        for cmap_name in qualitative_cmaps:
-            cmap = plt.get_cmap(cmap_name)
-            for i in range(cmap.N):
-                rgb01 = np.array(cmap(i)[:3], dtype=float)
-                colors.append((np.clip(rgb01, 0, 1) * 255).astype(np.uint8))
-                if len(colors) >= n:
-                    break
-            if len(colors) >= n:
-                break
+    def _use_executor(self, executor, n_colors):
+        """True if n_colors unique colors are worth sending to executor's process pool."""
+        return (
+            executor is not None
+            and executor.process_workers > 1
+            and n_colors >= self.PROCESS_MIN_UNIQUE_COLORS
+        )
 
-        if len(colors) < n:
-            remaining = n - len(colors)
-            hsv = plt.get_cmap("hsv", remaining)
-            for i in range(remaining):
-                rgb01 = np.array(hsv(i)[:3], dtype=float)
-                colors.append((np.clip(rgb01, 0, 1) * 255).astype(np.uint8))
+    def _image_uniques(self, image, unique_pack=None):
+        """
+        Unique LAB colors (scaled by 100) of an image and the flat inverse index.
+        Reuses unique_pack["uniq"] / ["inv"] when they are already known.
+        Returns (uniq, inv, height, width).
+        """
+        if unique_pack is not None and unique_pack.get("uniq") is not None and unique_pack.get("inv") is not None:
+            width, height = image.size
+            return unique_pack["uniq"], unique_pack["inv"], height, width
 
-        palette = []
-        for i, prototype in enumerate(prototypes):
-            rgb255 = colors[i].copy()
-            if getattr(prototype, "label", "").lower() == "black":
-                rgb255 = np.array([0, 0, 0], dtype=np.uint8)
-            palette.append(rgb255)
+        return labelmaps.image_uniques(image)
 
-        return np.stack(palette, axis=0).astype(np.uint8)
+    @staticmethod
+    def _fill_unique_pack(unique_pack, uniq, labels, inv):
+        if unique_pack is not None:
+            unique_pack["uniq"] = uniq
+            unique_pack["labels"] = labels
+            unique_pack["inv"] = inv.reshape(-1)
 
     @staticmethod
-    def build_alt_palette_uint8(prototypes, hex_color):
-        """Build the representative-color palette using the colors stored in hex_color."""
-        if isinstance(hex_color, dict):
-            hex_colors = list(hex_color.keys())
+    def _lab_keys(lab_int):
+        """
+        Pack (N, 3) LAB values scaled by 100 into sortable int64 keys.
+        Key order matches the lexicographic row order used by np.unique(axis=0).
+        """
+        lab_int = lab_int.astype(np.int64, copy=False)
+        return (lab_int[:, 0] * 25600 + (lab_int[:, 1] + 12800)) * 25600 + (lab_int[:, 2] + 12800)
+
+    @instrumentation.timed("image.classify")
+    def _resolve_lab_values(self, lab_rows, fuzzy_color_space, executor=None, cancel_callback=None):
+        """
+        Best-prototype index for each row of lab_rows (int32 LAB scaled by 100).
+        Returns None if cancelled.
+        """
+        instrumentation.count("image.evaluated_colors", int(lab_rows.shape[0]))
+
+        if self._use_executor(executor, lab_rows.shape[0]):
+            return self._best_labels_parallel(lab_rows, fuzzy_color_space, executor, cancel_callback=cancel_callback)
+
+        batch = self.MEMBERSHIP_BATCH_SIZE
+        best = np.empty((lab_rows.shape[0],), dtype=np.int32)
+        for start in range(0, lab_rows.shape[0], batch):
+            if cancel_callback and cancel_callback():
+                return None
+            best[start:start + batch] = _best_labels_for_lab_chunk(fuzzy_color_space, lab_rows[start:start + batch])
+        return best
+
+    def get_best_prototype_label_map_progressive(
+        self,
+        image,
+        fuzzy_color_space,
+        valid_mask=None,
+        preview_callback=None,
+        tile_callback=None,
+        progress_callback=None,
+        cancel_callback=None,
+        executor=None,
+        preview_max_side=160,
+        n_tiles=12,
+        unique_pack=None,
+    ):
+        """
+        Coarse-to-fine variant of get_best_prototype_label_map.
+
+        1. Classifies a strided subsample of the image (about preview_max_side
+           pixels on the longest side) and calls preview_callback(label_map)
+           with it expanded to full size by nearest-neighbour repetition.
+        2. Resolves the exact labels in horizontal bands and calls
+           tile_callback(y0, y1, band_labels) for each band as it is ready.
+
+        Colors resolved for the preview and for earlier bands are reused, so the
+        total work is the same as the one-shot method. The final label map is
+        identical to get_best_prototype_label_map.
+
+        unique_pack is filled as in get_best_prototype_label_map; "uniq" and
+        "inv" already in it are reused, skipping the LAB conversion.
+
+        Returns:
+            np.ndarray of shape (H, W), dtype int32, or None if cancelled.
+        """
+        if cancel_callback and cancel_callback():
+            return None
+
+        fuzzy_color_space.precompute_pack()
+
+        # Unique colors and pixel indices already known for this image are reused
+        cached = unique_pack is not None and unique_pack.get("uniq") is not None and unique_pack.get("inv") is not None
+
+        if cached:
+            width, height = image.size
+        else:
+            img_rgb = self._pil_to_rgb_uint8(image)
+            height, width = img_rgb.shape[:2]
+
+        if valid_mask is not None and valid_mask.shape != (height, width):
+            raise ValueError("valid_mask shape does not match the generated label map.")
+
+        # --- Coarse preview on a strided subsample (actual pixel colors, so results are exact)
+        step = max(1, int(math.ceil(max(height, width) / float(max(1, preview_max_side)))))
+
+        if cached:
+            uniq_rows = unique_pack["uniq"]
+            inv = np.asarray(unique_pack["inv"]).reshape(height, width)
+
+            sub_inv = inv[::step, ::step]
+            sub_shape = sub_inv.shape
+            seed_uniq, seed_inv = np.unique(sub_inv.reshape(-1), return_inverse=True)
+            seed_rows = uniq_rows[seed_uniq]
         else:
-            hex_colors = list(hex_color or [])
+            sub_rgb = np.ascontiguousarray(img_rgb[::step, ::step])
+            sub_shape = sub_rgb.shape[:2]
+            sub_lab = color.rgb2lab(sub_rgb.astype(np.float32) / 255.0)
+            sub_int = np.round(sub_lab.reshape(-1, 3) * 100.0).astype(np.int32)
+
+            seed_keys, seed_index, seed_inv = np.unique(
+                self._lab_keys(sub_int), return_index=True, return_inverse=True
+            )
+            seed_rows = sub_int[seed_index]
+
+        seed_best = self._resolve_lab_values(seed_rows, fuzzy_color_space, executor, cancel_callback)
+        if seed_best is None:
+            return None
+
+        if preview_callback is not None:
+            sub_labels = seed_best[seed_inv.reshape(-1)].reshape(sub_shape)
+            preview = np.repeat(np.repeat(sub_labels, step, axis=0), step, axis=1)[:height, :width]
+            preview = preview.astype(np.int32)
+            if valid_mask is not None:
+                preview[~valid_mask] = -1
+            preview_callback(preview)
+
+        # --- Exact labels, band by band
+        if not cached:
+            with instrumentation.stage("image.lab_conversion"):
+                lab_image = color.rgb2lab(img_rgb.astype(np.float32) / 255.0)
+                lab_int = np.round(lab_image.reshape(-1, 3) * 100.0).astype(np.int32)
+                del lab_image
+
+            with instrumentation.stage("image.unique"):
+                keys = self._lab_keys(lab_int)
+                uniq_keys, uniq_index, inv = np.unique(keys, return_index=True, return_inverse=True)
+                del keys
+                inv = inv.reshape(height, width)
+                uniq_rows = lab_int[uniq_index]
+                del lab_int
+
+            seed_uniq = np.searchsorted(uniq_keys, seed_keys)
+
+            instrumentation.count("image.pixels", height * width)
+            instrumentation.count("image.unique_colors", int(uniq_rows.shape[0]))
+
+        best_for_uniq = np.full((uniq_rows.shape[0],), -2, dtype=np.int32)
+        best_for_uniq[seed_uniq] = seed_best
+
+        total_uniqs = int(uniq_rows.shape[0])
+        resolved = int(seed_uniq.shape[0])
+        if progress_callback:
+            progress_callback(resolved, total_uniqs)
+
+        band_height = max(1, int(math.ceil(height / float(max(1, n_tiles)))))
+        label_map = np.empty((height, width), dtype=np.int32)
+
+        for y0 in range(0, height, band_height):
+            if cancel_callback and cancel_callback():
+                return None
+
+            y1 = min(height, y0 + band_height)
+            band_inv = inv[y0:y1]
 
-        alt = []
-        for i, _prototype in enumerate(prototypes):
-            rgb = np.array([0, 0, 0], dtype=np.uint8)
+            band_uniq = np.unique(band_inv)
+            pending = band_uniq[best_for_uniq[band_uniq] == -2]
 
-            if i < len(hex_colors):
-                hx = str(hex_colors[i]).strip()
-                if hx.startswith("#") and len(hx) == 7:
-                    try:
-                        rgb = np.array(
-                            [int(hx[j:j + 2], 16) for j in (1, 3, 5)],
-                            dtype=np.uint8
-                        )
-                    except ValueError:
-                        rgb = np.array([0, 0, 0], dtype=np.uint8)
+            if pending.size:
+                best = self._resolve_lab_values(
+                    uniq_rows[pending], fuzzy_color_space, executor, cancel_callback
+                )
+                if best is None:
+                    return None
+                best_for_uniq[pending] = best
+                resolved += int(pending.size)
 
-            alt.append(rgb)
+            band = best_for_uniq[band_inv]
+            if valid_mask is not None:
+                band[~valid_mask[y0:y1]] = -1
+            label_map[y0:y1] = band
 
-        if not alt:
-            return np.zeros((0, 3), dtype=np.uint8)
+            if tile_callback is not None:
+                tile_callback(y0, y1, band.copy())
+            if progress_callback:
+                progress_callback(resolved, total_uniqs)
 
-        return np.stack(alt, axis=0).astype(np.uint8)
+        self._fill_unique_pack(unique_pack, uniq_rows, best_for_uniq, inv)
+        return label_map
 
     @staticmethod
-    def recolor_label_map(label_map, palette_uint8):
+    def _points_inside_volume(points, volume, eps=1e-9, margin=1e-6):
+        """
+        Vectorized Volume.isInside for an (N, 3) float array, widened by `margin`
+        so borderline points are reported as inside.
+        """
+        rep = volume.getRepresentative()
+        inside = np.ones((points.shape[0],), dtype=bool)
+
+        for face in volume.getFaces():
+            plane = face.getPlane()
+            s_rep = plane.evaluatePoint(rep)
+            s_xyz = points[:, 0] * plane.A + points[:, 1] * plane.B + points[:, 2] * plane.C + plane.D
+            inside &= s_rep * s_xyz >= -(eps + margin * abs(s_rep))
+
+        return inside
+
+    def relabel_uniques(
+        self,
+        uniq,
+        labels,
+        old_labels,
+        fuzzy_color_space,
+        changes,
+        executor=None,
+        cancel_callback=None,
+    ):
         """
-        Convert a label map to an RGBA image using a palette.
-        label_map == -1 remains transparent/background.
+        Update cached best-prototype labels of unique colors after an edit.
+
+        Parameters
+        ----------
+        uniq, labels : np.ndarray
+            Unique LAB values (scaled by 100) and their labels as indices into
+            old_labels (the prototype labels before the edit).
+        fuzzy_color_space : FuzzyColorSpace
+            The edited space.
+        changes : dict
+            Change report from FuzzyColorSpace.edited.
+
+        A prototype's membership depends only on its own cell, core and support,
+        so a color keeps its label unless its old prototype changed geometry or
+        it lies in the support of a prototype whose geometry changed. Only
+        those colors are reclassified.
+
+        Returns
+        -------
+        (np.ndarray, int) or None
+            New labels (indices into the edited space) and the number of colors
+            reclassified, or None if cancelled.
         """
-        h, w = label_map.shape[:2]
-        recolored_rgb = np.zeros((h, w, 3), dtype=np.uint8)
+        fuzzy_color_space.precompute_pack()
+        prototypes = fuzzy_color_space.get_prototypes()
+        new_index = {p.label: i for i, p in enumerate(prototypes)}
 
-        valid_label_mask = (label_map >= 0) & (label_map < len(palette_uint8))
-        if np.any(valid_label_mask):
-            idx = label_map[valid_label_mask].astype(np.int32)
-            recolored_rgb[valid_label_mask] = palette_uint8[idx]
+        renamed = changes.get("renamed", {})
+        changed_old = set(changes.get("changed_old", ()))
+        changed_new = set(changes.get("changed_new", ()))
 
-        return UtilsTools._apply_alpha_to_rgb_array(recolored_rgb, valid_label_mask)
+        index_map = np.full((len(old_labels) + 1,), -2, dtype=np.int32)
+        index_map[-1] = -1
+        for i, label in enumerate(old_labels):
+            if label in changed_old:
+                continue
+            target = new_index.get(renamed.get(label, label))
+            if target is not None:
+                index_map[i] = target
+
+        labels = np.asarray(labels)
+        new_labels = index_map[np.where(labels >= 0, labels, -1)]
+
+        # Colors that may now belong to a changed prototype
+        keep = np.flatnonzero(new_labels != -2)
+        if keep.size and changed_new:
+            points = uniq[keep].astype(np.float32) / 100.0
+            points = points.astype(np.float64)
+            supports = fuzzy_color_space.get_supports()
+
+            for label in changed_new:
+                k = new_index.get(label)
+                if k is None:
+                    continue
+                hit = self._points_inside_volume(points, supports[k].voronoi_volume)
+                new_labels[keep[hit]] = -2
+
+        pending = np.flatnonzero(new_labels == -2)
+        if pending.size:
+            best = self._resolve_lab_values(uniq[pending], fuzzy_color_space, executor, cancel_callback)
+            if best is None:
+                return None
+            new_labels[pending] = best
 
+        return new_labels, int(pending.size)
 
+    _finish_label_map = staticmethod(labelmaps.finish_label_map)
 
+    def _best_labels_parallel(self, uniq, fuzzy_color_space, executor, progress_callback=None, cancel_callback=None):
+        """
+        Evaluate best-prototype indices for `uniq` on the executor's process pool.
+        Returns None if cancelled.
+        """
+        chunk_size = self.LABEL_MAP_CHUNK_SIZE
+        chunks = [uniq[i:i + chunk_size] for i in range(0, uniq.shape[0], chunk_size)]
+        total_uniqs = int(uniq.shape[0])
 
+        def on_chunk(done, _total):
+            if progress_callback:
+                progress_callback(min(done * chunk_size, total_uniqs), total_uniqs)
 
-    def get_fcs_image(
+        try:
+            parts = executor.map_shared(
+                _best_labels_for_lab_chunk,
+                fuzzy_color_space,
+                chunks,
+                cancel_callback=cancel_callback,
+                progress_callback=on_chunk
+            )
+        except JobCancelled:
+            return None
+
+        return np.concatenate(parts).astype(np.int32, copy=False)
+
+    def get_membership_stack(
         self,
         image,
-        threshold=0.5,
-        min_samples=160,
-        max_pixels=80000,
-        max_side=650,
-        lab_quantization=1.0
+        fuzzy_color_space,
+        valid_mask=None,
+        progress_callback=None,
+        cancel_callback=None,
     ):
         """
-        Detect the main colors in an image using DBSCAN clustering in LAB space.
+        Compute the normalized membership of every pixel to every prototype.
 
-        Optimized version:
-        - Uses a resized copy only for automatic detection.
-        - Limits the number of processed pixels to avoid MemoryError.
-        - Quantizes LAB values and uses DBSCAN sample_weight to reduce memory usage.
-        - Keeps the same output format: [{"rgb": (R,G,B), "lab": (L,A,B)}, ...].
+        Membership is evaluated once per unique LAB value (quantized to 0.01)
+        and expanded with the inverse map, as in get_best_prototype_label_map.
+        Pixels outside `valid_mask` are not evaluated and get zero membership.
+
+        Returns:
+            np.ndarray of shape (H, W, P), dtype float32, where P is the number
+            of prototypes in `fuzzy_color_space`.
+        """
+        if cancel_callback and cancel_callback():
+            return None
+
+        prototypes = fuzzy_color_space.get_prototypes()
+
+        lab_image = self._pil_to_lab_image(image)
+        height, width = lab_image.shape[:2]
+
+        lab_int = np.round(lab_image.reshape(-1, 3) * 100.0).astype(np.int32)
+
+        if valid_mask is not None:
+            if valid_mask.shape != (height, width):
+                raise ValueError("valid_mask shape does not match the image.")
+            flat_mask = valid_mask.reshape(-1)
+            lab_int = lab_int[flat_mask]
+
+        with instrumentation.stage("image.unique"):
+            uniq, inv = np.unique(lab_int, axis=0, return_inverse=True)
+
+        total_uniqs = int(uniq.shape[0])
+        values_for_uniq = np.zeros((total_uniqs, len(prototypes)), dtype=np.float32)
+
+        instrumentation.count("image.pixels", height * width)
+        instrumentation.count("image.unique_colors", total_uniqs)
+        instrumentation.count("image.evaluated_colors", total_uniqs)
+
+        batch = self.MEMBERSHIP_BATCH_SIZE
+
+        with instrumentation.stage("image.membership_stack"):
+            for start in range(0, total_uniqs, batch):
+                if cancel_callback and cancel_callback():
+                    return None
+
+                stop = min(total_uniqs, start + batch)
+                values_for_uniq[start:stop] = fuzzy_color_space.calculate_membership_batch(
+                    _lab_from_scaled(uniq[start:stop])
+                )
+
+                if progress_callback:
+                    progress_callback(stop, total_uniqs)
+
+        if valid_mask is None:
+            return values_for_uniq[inv.reshape(-1)].reshape(height, width, len(prototypes))
+
+        stack = np.zeros((height * width, len(prototypes)), dtype=np.float32)
+        stack[flat_mask] = values_for_uniq[inv.reshape(-1)]
+        return stack.reshape(height, width, len(prototypes))
+
+    @staticmethod
+    def grid_region_map(height, width, rows=3, cols=3, cells=None):
+        """
+        Build a region map that splits an image into a rows x cols grid.
+
+        Cell (r, c) gets region id r * cols + c. The last row/column absorbs the
+        remainder when the size is not divisible, as the VITA thirds do.
+        If `cells` is given (list of (r, c) tuples), only those cells are kept,
+        numbered in list order, and every other pixel is -1.
+
+        Returns:
+            np.ndarray of shape (H, W), dtype int32.
+        """
+        row_step = max(1, int(height) // int(rows))
+        col_step = max(1, int(width) // int(cols))
+
+        row_idx = np.minimum(np.arange(height) // row_step, rows - 1)
+        col_idx = np.minimum(np.arange(width) // col_step, cols - 1)
+
+        region_map = (row_idx[:, None] * cols + col_idx[None, :]).astype(np.int32)
+
+        if cells is not None:
+            lut = np.full(rows * cols, -1, dtype=np.int32)
+            for i, (r, c) in enumerate(cells):
+                lut[r * cols + c] = i
+            region_map = lut[region_map]
+
+        return region_map
+
+    @staticmethod
+    def region_statistics(
+        regions,
+        label_map=None,
+        membership_stack=None,
+        n_prototypes=None,
+        valid_mask=None,
+        n_regions=None,
+    ):
+        """
+        Aggregate prototype statistics per image region.
 
         Parameters
         ----------
-        image:
-            PIL image or array-like image.
-        threshold:
-            Detection threshold. Higher threshold means smaller DBSCAN eps.
-        min_samples:
-            Base DBSCAN min_samples.
-        max_pixels:
-            Maximum number of pixels used for clustering after resize/sampling.
-        max_side:
-            Maximum width or height used for automatic detection.
-        lab_quantization:
-            LAB quantization step. Higher values are faster and more compact.
-            Recommended: 0.5 to 2.0. Default 1.0 is a good balance.
+        regions:
+            (H, W) integer region map (ids >= 0, -1 ignored), e.g. from
+            grid_region_map, or a boolean mask treated as a single region.
+        label_map:
+            Optional (H, W) best-prototype label map (-1 = unassigned).
+        membership_stack:
+            Optional (H, W, P) membership stack, e.g. from get_membership_stack.
+        n_prototypes:
+            Number of prototypes. Inferred from the inputs when omitted.
+        valid_mask:
+            Optional (H, W) boolean mask of pixels to include.
+        n_regions:
+            Number of regions. Inferred from the region map when omitted.
+
+        Returns
+        -------
+        dict with:
+            "pixels": (R,) number of valid pixels per region.
+            "counts": (R, P) label histogram per region (label_map only).
+            "coverage": (R, P) counts divided by the region pixel count.
+            "membership_sums": (R, P) summed memberships (membership_stack only).
+            "membership_normalized": (R, P) membership sums normalized per region.
+        """
+        regions = np.asarray(regions)
+        if regions.dtype == bool:
+            regions = np.where(regions, 0, -1)
+        regions = regions.astype(np.int64, copy=False)
+
+        include = regions >= 0
+        if valid_mask is not None:
+            if valid_mask.shape != regions.shape:
+                raise ValueError("valid_mask shape does not match the region map.")
+            include &= valid_mask
+
+        if n_regions is None:
+            n_regions = int(regions.max()) + 1 if np.any(regions >= 0) else 0
+
+        if n_prototypes is None:
+            if membership_stack is not None:
+                n_prototypes = int(membership_stack.shape[-1])
+            elif label_map is not None and np.any(label_map >= 0):
+                n_prototypes = int(label_map.max()) + 1
+            else:
+                n_prototypes = 0
+
+        region_ids = regions[include]
+        pixels = np.bincount(region_ids, minlength=n_regions)[:n_regions]
+
+        stats = {"pixels": pixels}
+
+        if label_map is not None:
+            if label_map.shape != regions.shape:
+                raise ValueError("label_map shape does not match the region map.")
+
+            labels = label_map[include].astype(np.int64, copy=False)
+            labelled = (labels >= 0) & (labels < n_prototypes)
+
+            combined = region_ids[labelled] * n_prototypes + labels[labelled]
+            counts = np.bincount(combined, minlength=n_regions * n_prototypes)
+            counts = counts[:n_regions * n_prototypes].reshape(n_regions, n_prototypes)
+
+            stats["counts"] = counts
+            stats["coverage"] = counts / np.maximum(pixels, 1)[:, None]
+
+        if membership_stack is not None:
+            if membership_stack.shape[:2] != regions.shape:
+                raise ValueError("membership_stack shape does not match the region map.")
+
+            values = membership_stack[include].astype(np.float64, copy=False)
+            sums = np.stack(
+                [
+                    np.bincount(region_ids, weights=values[:, p], minlength=n_regions)[:n_regions]
+                    for p in range(n_prototypes)
+                ],
+                axis=1
+            ) if n_prototypes else np.zeros((n_regions, 0))
+
+            totals = sums.sum(axis=1, keepdims=True)
+
+            stats["membership_sums"] = sums
+            stats["membership_normalized"] = np.divide(
+                sums,
+                totals,
+                out=np.zeros_like(sums),
+                where=totals > 0
+            )
+
+        return stats
+
+    # Visualization palettes in prototype order and label map -> RGBA recoloring
+    build_original_palette_uint8 = staticmethod(labelmaps.build_original_palette_uint8)
+    build_alt_palette_uint8 = staticmethod(labelmaps.build_alt_palette_uint8)
+    recolor_label_map = staticmethod(labelmaps.recolor_label_map)
+
+    @staticmethod
+    def _detection_lab_pixels(image, max_pixels=None, max_side=None):
+        """
+        Convert a PIL image or array-like image into the flat LAB samples used by
+        automatic color detection.
+
+        The image is resized (bilinear) so that it fits `max_side` and `max_pixels`,
+        and the result is deterministically subsampled if it still exceeds
+        `max_pixels`. Returns an (N, 3) float32 array, or None if the image cannot
+        be interpreted.
+        """
+        img_np = ImageManager._detection_rgb_image(image, max_pixels=max_pixels, max_side=max_side)
+        if img_np is None:
+            return None
+
+        img01 = img_np.astype(np.float32) / 255.0
+        lab_img = color.rgb2lab(img01).astype(np.float32, copy=False)
+
+        pixels = lab_img.reshape((-1, 3))
+        total_pixels = pixels.shape[0]
+
+        if total_pixels == 0:
+            return None
+
+        # ------------------------------------------------------------
+        # Safety pixel cap after resize
+        # ------------------------------------------------------------
+        if max_pixels is not None and max_pixels > 0 and total_pixels > max_pixels:
+            # Deterministic sampling to avoid random UI behavior
+            idx = np.linspace(0, total_pixels - 1, int(max_pixels), dtype=np.int64)
+            pixels = pixels[idx]
+
+        return pixels
+
+    @staticmethod
+    def _detection_rgb_image(image, max_pixels=None, max_side=None):
+        """
+        Convert a PIL image or array-like image into the H x W x 3 uint8 RGB array
+        used by automatic color detection, resized (bilinear) so that it fits
+        `max_side` and `max_pixels`. Returns None if the image cannot be interpreted.
         """
         if image is None:
-            return []
+            return None
 
         # ------------------------------------------------------------
         # Convert input to RGB PIL image
@@ -578,9 +1066,9 @@ class ImageManager:
                     else:
                         pil_img = Image.fromarray(img_np[..., :3], mode="RGB")
                 else:
-                    return []
+                    return None
         except Exception:
-            return []
+            return None
 
         original_w, original_h = pil_img.size
         original_pixels = max(1, original_w * original_h)
@@ -609,9 +1097,6 @@ class ImageManager:
 
             pil_img = pil_img.resize((new_w, new_h), resample_filter)
 
-        # ------------------------------------------------------------
-        # RGB -> LAB
-        # ------------------------------------------------------------
         img_np = np.asarray(pil_img, dtype=np.uint8)
 
         if img_np.ndim == 2:
@@ -619,30 +1104,26 @@ class ImageManager:
         elif img_np.ndim == 3 and img_np.shape[-1] > 3:
             img_np = img_np[..., :3]
 
-        img01 = img_np.astype(np.float32) / 255.0
-        lab_img = color.rgb2lab(img01).astype(np.float32, copy=False)
-
-        pixels = lab_img.reshape((-1, 3))
-        total_pixels = pixels.shape[0]
+        return img_np
 
-        if total_pixels == 0:
-            return []
+    def _get_palette_graph(self, pixels, q, radius):
+        """
+        Return the cached neighbourhood graph of the quantized LAB samples.
 
-        # ------------------------------------------------------------
-        # Safety pixel cap after resize
-        # ------------------------------------------------------------
-        if max_pixels is not None and max_pixels > 0 and total_pixels > max_pixels:
-            # Deterministic sampling to avoid random UI behavior
-            idx = np.linspace(0, total_pixels - 1, int(max_pixels), dtype=np.int64)
-            pixels = pixels[idx]
-            total_pixels = pixels.shape[0]
+        The graph stores every pair of unique quantized colors closer than
+        `radius`, sorted by distance, so any DBSCAN eps <= radius can be served
+        by slicing the edge list instead of recomputing distances.
+        """
+        lab_q = np.round(pixels / q).astype(np.int32)
 
-        # ------------------------------------------------------------
-        # Quantize LAB and group repeated/similar values
-        # ------------------------------------------------------------
-        q = max(0.05, float(lab_quantization))
+        digest = hashlib.blake2b(np.ascontiguousarray(lab_q).tobytes(), digest_size=16)
+        key = (digest.hexdigest(), float(q))
 
-        lab_q = np.round(pixels / q).astype(np.int32)
+        with self._palette_graph_lock:
+            graph = self._palette_graph_cache.get(key)
+            if graph is not None and graph["radius"] >= radius:
+                self._palette_graph_cache.move_to_end(key)
+                return graph
 
         unique_lab_q, counts = np.unique(
             lab_q,
@@ -652,14 +1133,143 @@ class ImageManager:
 
         unique_pixels = unique_lab_q.astype(np.float32) * q
 
-        if unique_pixels.shape[0] == 0:
+        if unique_pixels.shape[0] > 1:
+            pairs = cKDTree(unique_pixels).query_pairs(r=radius, output_type="ndarray")
+        else:
+            pairs = np.zeros((0, 2), dtype=np.int64)
+
+        rows = pairs[:, 0].astype(np.int32, copy=False)
+        cols = pairs[:, 1].astype(np.int32, copy=False)
+        dists = np.linalg.norm(unique_pixels[rows] - unique_pixels[cols], axis=1)
+
+        order = np.argsort(dists, kind="stable")
+
+        graph = {
+            "radius": float(radius),
+            "unique_pixels": unique_pixels,
+            "counts": counts,
+            "rows": rows[order],
+            "cols": cols[order],
+            "dists": dists[order],
+        }
+
+        with self._palette_graph_lock:
+            self._palette_graph_cache[key] = graph
+            self._palette_graph_cache.move_to_end(key)
+            while len(self._palette_graph_cache) > self.PALETTE_GRAPH_CACHE_SIZE:
+                self._palette_graph_cache.popitem(last=False)
+
+        return graph
+
+    @staticmethod
+    def _palette_graph_distances(graph, eps):
+        """Build the symmetric sparse distance matrix holding the graph edges within eps."""
+        n = graph["unique_pixels"].shape[0]
+        n_edges = int(np.searchsorted(graph["dists"], eps, side="right"))
+
+        rows = np.concatenate([graph["rows"][:n_edges], graph["cols"][:n_edges]])
+        cols = np.concatenate([graph["cols"][:n_edges], graph["rows"][:n_edges]])
+        dists = np.concatenate([graph["dists"][:n_edges], graph["dists"][:n_edges]])
+
+        # Row-major, distance-sorted CSR layout, which is what DBSCAN expects
+        # from a precomputed radius graph (avoids an internal re-sort).
+        order = np.lexsort((dists, rows))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        return csr_matrix((dists[order], cols[order], indptr), shape=(n, n))
+
+    def clear_palette_cache(self):
+        """Drop every cached palette neighbourhood graph."""
+        with self._palette_graph_lock:
+            self._palette_graph_cache.clear()
+
+    def get_fcs_image(
+        self,
+        image,
+        threshold=0.5,
+        min_samples=160,
+        max_pixels=80000,
+        max_side=650,
+        lab_quantization=1.0,
+        method="dbscan"
+    ):
+        """
+        Detect the main colors in an image using DBSCAN clustering in LAB space.
+
+        With method="histogram" the detection is delegated to
+        `get_fcs_image_histogram`, whose cost is linear in the pixel count.
+
+        Optimized version:
+        - Uses a resized copy only for automatic detection.
+        - Limits the number of processed pixels to avoid MemoryError.
+        - Quantizes LAB values and uses DBSCAN sample_weight to reduce memory usage.
+        - Builds the KD-tree radius graph once per image and caches it, so changing
+          threshold or min_samples re-clusters without recomputing distances.
+        - Keeps the same output format: [{"rgb": (R,G,B), "lab": (L,A,B)}, ...].
+
+        Parameters
+        ----------
+        image:
+            PIL image or array-like image.
+        threshold:
+            Detection threshold. Higher threshold means smaller DBSCAN eps.
+        min_samples:
+            Base DBSCAN min_samples.
+        max_pixels:
+            Maximum number of pixels used for clustering after resize/sampling.
+        max_side:
+            Maximum width or height used for automatic detection.
+        lab_quantization:
+            LAB quantization step. Higher values are faster and more compact.
+            Recommended: 0.5 to 2.0. Default 1.0 is a good balance.
+        method:
+            "dbscan" (default) or "histogram". In histogram mode the threshold
+            controls the minimum LAB distance between detected colors
+            (higher threshold -> closer colors are kept apart) and
+            min_samples, max_pixels and lab_quantization are not used.
+        """
+        if image is None:
+            return []
+
+        if method == "histogram":
+            return self.get_fcs_image_histogram(
+                image,
+                min_distance=max(2.0, 20.0 * (1.5 - float(threshold))),
+                max_side=max_side
+            )
+
+        if method != "dbscan":
+            raise ValueError(f"Unknown palette detection method: {method}")
+
+        pixels = self._detection_lab_pixels(image, max_pixels, max_side)
+        if pixels is None:
             return []
 
+        total_pixels = pixels.shape[0]
+
         # ------------------------------------------------------------
-        # DBSCAN on unique LAB values using sample weights
+        # Neighbourhood graph on quantized unique LAB values (cached)
         # ------------------------------------------------------------
+        q = max(0.05, float(lab_quantization))
         eps = max(0.05, 1.5 - float(threshold))
 
+        try:
+            graph = self._get_palette_graph(pixels, q, max(eps, self.PALETTE_GRAPH_RADIUS))
+        except MemoryError:
+            # Last-resort fallback: coarser quantization and fewer points
+            q = max(q * 2.0, 2.0)
+            graph = self._get_palette_graph(pixels, q, max(eps, self.PALETTE_GRAPH_RADIUS))
+
+        unique_pixels = graph["unique_pixels"]
+        counts = graph["counts"]
+
+        if unique_pixels.shape[0] == 0:
+            return []
+
+        # ------------------------------------------------------------
+        # DBSCAN on the precomputed graph using sample weights
+        # ------------------------------------------------------------
         effective_min_samples = max(5, int(min_samples))
 
         # Avoid impossible min_samples on small sampled images
@@ -670,36 +1280,20 @@ class ImageManager:
 
         dbscan = DBSCAN(
             eps=eps,
-            min_samples=effective_min_samples
+            min_samples=effective_min_samples,
+            metric="precomputed"
         )
 
-        try:
-            labels = dbscan.fit_predict(
-                unique_pixels,
-                sample_weight=counts
-            )
-        except MemoryError:
-            # Last-resort fallback: coarser quantization and fewer points
-            q = max(q * 2.0, 2.0)
-            lab_q = np.round(pixels / q).astype(np.int32)
-
-            unique_lab_q, counts = np.unique(
-                lab_q,
-                axis=0,
-                return_counts=True
-            )
-
-            unique_pixels = unique_lab_q.astype(np.float32) * q
-
-            labels = dbscan.fit_predict(
-                unique_pixels,
-                sample_weight=counts
-            )
+        labels = dbscan.fit_predict(
+            self._palette_graph_distances(graph, eps),
+            sample_weight=counts
+        )
 
         # ------------------------------------------------------------
         # Extract representative colors
         # ------------------------------------------------------------
-        colors_found = []
+        centers = []
+        weights = []
 
         for label in set(labels):
             if label == -1:
@@ -717,31 +1311,159 @@ class ImageManager:
                 continue
 
             # Weighted centroid in LAB
-            mean_color_lab = np.average(
+            centers.append(np.average(
                 cluster_pixels,
                 axis=0,
                 weights=cluster_weights
-            )
+            ))
+            weights.append(int(np.sum(cluster_weights)))
 
-            # Convert LAB -> RGB
-            mean_color_rgb = color.lab2rgb([[mean_color_lab]])
-            mean_color_rgb = np.clip(mean_color_rgb[0, 0] * 255.0, 0, 255)
-            mean_color_rgb = np.round(mean_color_rgb).astype(int)
+        return self._palette_from_centers(centers, weights)
 
-            colors_found.append({
-                "rgb": tuple(int(v) for v in mean_color_rgb),
-                "lab": tuple(float(v) for v in mean_color_lab),
-                "weight": int(np.sum(cluster_weights))
-            })
+    @staticmethod
+    def _palette_from_centers(centers, weights):
+        """
+        Convert LAB cluster centers into the detection output format
+        [{"rgb": (R,G,B), "lab": (L,A,B)}, ...], largest clusters first.
+        """
+        if len(centers) == 0:
+            return []
+
+        centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+
+        # Convert LAB -> RGB in a single call
+        rgb = color.lab2rgb(centers[np.newaxis, :, :])[0]
+        rgb = np.round(np.clip(rgb * 255.0, 0, 255)).astype(int)
 
         # Sort by cluster size, largest colors first
-        colors_found.sort(key=lambda item: item.get("weight", 0), reverse=True)
+        order = sorted(range(len(centers)), key=lambda i: weights[i], reverse=True)
 
-        # Keep previous external format clean
         return [
             {
-                "rgb": item["rgb"],
-                "lab": item["lab"]
+                "rgb": tuple(int(v) for v in rgb[i]),
+                "lab": tuple(float(v) for v in centers[i])
             }
-            for item in colors_found
+            for i in order
         ]
+
+    def get_fcs_image_histogram(
+        self,
+        image,
+        max_colors=12,
+        bin_size=4.0,
+        min_fraction=0.005,
+        min_distance=10.0,
+        max_side=None,
+        kmeans_iterations=5
+    ):
+        """
+        Detect the main colors in an image from a 3D LAB histogram.
+
+        Faster alternative to the DBSCAN detection for bulk color space creation:
+        - Converts and bins the pixels into a fixed LAB grid with np.bincount,
+          HISTOGRAM_CHUNK_PIXELS at a time (linear cost, memory bounded by the
+          number of bins and the chunk size, not by image size or detail).
+        - Finds density peaks as local maxima of the smoothed histogram.
+        - Refines the peaks with a few weighted k-means iterations on the
+          non-empty bin means.
+        - Keeps the same output format: [{"rgb": (R,G,B), "lab": (L,A,B)}, ...].
+
+        Parameters
+        ----------
+        image:
+            PIL image or array-like image.
+        max_colors:
+            Maximum number of colors returned.
+        bin_size:
+            Histogram bin size in LAB units.
+        min_fraction:
+            Minimum fraction of the image a color must cover to be reported.
+        min_distance:
+            Minimum Euclidean LAB distance between two detected colors.
+        max_side:
+            Optional maximum width or height. None processes the full image.
+        kmeans_iterations:
+            Number of weighted k-means refinement iterations.
+        """
+        img_np = self._detection_rgb_image(image, max_pixels=None, max_side=max_side)
+        if img_np is None or img_np.size == 0:
+            return []
+
+        height, width = img_np.shape[:2]
+        total_pixels = height * width
+        bin_size = max(0.5, float(bin_size))
+
+        # ------------------------------------------------------------
+        # LAB histogram with per-bin mean color, accumulated over row chunks
+        # so memory stays bounded for full-resolution images
+        # ------------------------------------------------------------
+        lows = np.array([0.0, -128.0, -128.0], dtype=np.float32)
+        highs = np.array([100.0, 128.0, 128.0], dtype=np.float32)
+        shape = tuple(int(math.ceil(float(h - l) / bin_size)) + 1 for l, h in zip(lows, highs))
+
+        n_bins = int(np.prod(shape))
+        hist = np.zeros((n_bins,), dtype=np.float64)
+        sums = np.zeros((n_bins, 3), dtype=np.float64)
+
+        chunk_rows = max(1, self.HISTOGRAM_CHUNK_PIXELS // width)
+
+        for y0 in range(0, height, chunk_rows):
+            rows = img_np[y0:y0 + chunk_rows]
+            pixels = color.rgb2lab(rows.astype(np.float32) / 255.0).astype(np.float32, copy=False).reshape((-1, 3))
+
+            idx3 = np.floor((np.clip(pixels, lows, highs) - lows) / bin_size).astype(np.int64)
+            flat = np.ravel_multi_index((idx3[:, 0], idx3[:, 1], idx3[:, 2]), shape)
+
+            hist += np.bincount(flat, minlength=n_bins)
+            for c in range(3):
+                sums[:, c] += np.bincount(flat, weights=pixels[:, c], minlength=n_bins)
+
+        occupied = np.flatnonzero(hist)
+        bin_weights = hist[occupied]
+        bin_means = sums[occupied] / bin_weights[:, np.newaxis]
+
+        # ------------------------------------------------------------
+        # Density peaks (local maxima of the smoothed histogram)
+        # ------------------------------------------------------------
+        density = ndimage.uniform_filter(hist.reshape(shape), size=3, mode="constant")
+        local_max = (density == ndimage.maximum_filter(density, size=3, mode="constant"))
+
+        peak_density = density.reshape(-1)[occupied]
+        is_peak = local_max.reshape(-1)[occupied]
+
+        candidates = np.flatnonzero(is_peak)
+        candidates = candidates[np.argsort(-peak_density[candidates], kind="stable")]
+
+        seeds = []
+        for c in candidates:
+            center = bin_means[c]
+            if any(np.linalg.norm(center - other) < min_distance for other in seeds):
+                continue
+            seeds.append(center)
+            if len(seeds) >= max_colors:
+                break
+
+        if not seeds:
+            return []
+
+        # ------------------------------------------------------------
+        # Weighted k-means refinement on bin means
+        # ------------------------------------------------------------
+        centers = np.array(seeds, dtype=np.float64)
+        k = centers.shape[0]
+
+        for _ in range(max(0, int(kmeans_iterations))):
+            d2 = ((bin_means[:, np.newaxis, :] - centers[np.newaxis, :, :]) ** 2).sum(axis=2)
+            assign = np.argmin(d2, axis=1)
+
+            cluster_w = np.bincount(assign, weights=bin_weights, minlength=k)
+            for c in range(3):
+                num = np.bincount(assign, weights=bin_weights * bin_means[:, c], minlength=k)
+                centers[:, c] = np.where(cluster_w > 0, num / np.maximum(cluster_w, 1e-12), centers[:, c])
+
+        d2 = ((bin_means[:, np.newaxis, :] - centers[np.newaxis, :, :]) ** 2).sum(axis=2)
+        cluster_w = np.bincount(np.argmin(d2, axis=1), weights=bin_weights, minlength=k)
+
+        keep = cluster_w >= max(1.0, float(min_fraction) * total_pixels)
+
+        return self._palette_from_centers(centers[keep], cluster_w[keep].astype(int).tolist())
@@ -0,0 +1,200 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+
+
+"""
+Module summary
+--------------
+Compact, memory-bounded store for per-image mapping results shown by the GUI.
+
+Results are kept per unique color instead of per pixel:
+    - Every (image, size) has one shared index: its unique LAB colors (int16,
+      LAB scaled by 100), the pixel -> unique inverse index (uint16 when there
+      are few enough colors, uint32 otherwise) and a bit-packed alpha mask.
+    - Color Mapping All results are int16 best-prototype labels per unique color.
+    - Prototype membership results are uint8 memberships per unique color.
+Full (H, W) maps are rebuilt on demand with a single fancy-index, which is much
+cheaper than recomputing them and much smaller than keeping them.
+
+All images share one LRU byte budget; when it is exceeded, the least recently
+used images are dropped together with every result computed on them.
+"""
+
+
+class ImageResultCache:
+    # Shared budget for every open image (indices + results)
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = int(self.DEFAULT_MAX_BYTES if max_bytes is None else max_bytes)
+
+        self._images = OrderedDict()
+        self._lock = threading.RLock()
+        self._nbytes = 0
+
+    # ------------------------------------------------------------------
+    # Shared per-image index
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _image_id(image_key, size):
+        return (image_key, tuple(int(v) for v in size))
+
+    def get_index(self, image_key, size):
+        """
+        Return {"uniq", "inv"} for the image at this size, or None.
+        The dict can be passed as `unique_pack` to ImageManager to skip np.unique.
+        """
+        with self._lock:
+            entry = self._touch(image_key, size)
+            if entry is None:
+                return None
+            return {"uniq": entry["uniq"], "inv": entry["inv"]}
+
+    def put_index(self, image_key, size, uniq, inv, valid_mask=None):
+        """
+        Store the shared index of an image (no-op if it is already cached).
+        Returns {"uniq", "inv"} in the compact dtypes actually stored.
+        """
+        with self._lock:
+            entry = self._touch(image_key, size)
+            if entry is not None:
+                return {"uniq": entry["uniq"], "inv": entry["inv"]}
+
+            uniq = np.ascontiguousarray(uniq, dtype=np.int16)
+            inv_dtype = np.uint16 if uniq.shape[0] <= np.iinfo(np.uint16).max + 1 else np.uint32
+            inv = np.ascontiguousarray(np.asarray(inv).reshape(-1), dtype=inv_dtype)
+            mask_bits = None if valid_mask is None else np.packbits(np.asarray(valid_mask, dtype=bool).reshape(-1))
+
+            entry = {
+                "uniq": uniq,
+                "inv": inv,
+                "mask_bits": mask_bits,
+                "results": {},
+                "nbytes": uniq.nbytes + inv.nbytes + (0 if mask_bits is None else mask_bits.nbytes),
+            }
+            self._images[self._image_id(image_key, size)] = entry
+            self._nbytes += entry["nbytes"]
+            self._evict()
+
+            return {"uniq": uniq, "inv": inv}
+
+    def _touch(self, image_key, size):
+        image_id = self._image_id(image_key, size)
+        entry = self._images.get(image_id)
+        if entry is not None:
+            self._images.move_to_end(image_id)
+        return entry
+
+    # ------------------------------------------------------------------
+    # Results per unique color
+    # ------------------------------------------------------------------
+
+    def get_result(self, image_key, size, scope, key):
+        """Return the record stored with put_result, or None."""
+        with self._lock:
+            entry = self._touch(image_key, size)
+            if entry is None:
+                return None
+            return entry["results"].get((scope, key))
+
+    def put_result(self, image_key, size, scope, key, values, **extra):
+        """
+        Store per-unique `values` (int16 labels or uint8 memberships) under
+        (scope, key) for an image whose index is already cached. `extra` holds
+        small metadata (coverage, thresholds, pending edits...).
+        Returns the stored record, or None if the image index is not cached.
+        """
+        with self._lock:
+            entry = self._touch(image_key, size)
+            if entry is None:
+                return None
+
+            record = dict(extra, values=np.ascontiguousarray(values))
+            old = entry["results"].get((scope, key))
+            delta = record["values"].nbytes - (0 if old is None else old["values"].nbytes)
+
+            entry["results"][(scope, key)] = record
+            entry["nbytes"] += delta
+            self._nbytes += delta
+            self._evict()
+
+            return record
+
+    def _drop_result(self, entry, result_key):
+        record = entry["results"].pop(result_key, None)
+        if record is not None:
+            entry["nbytes"] -= record["values"].nbytes
+            self._nbytes -= record["values"].nbytes
+        return record
+
+    def expand(self, image_key, size, values, fill=0, dtype=None):
+        """
+        Rebuild the full (H, W) map of per-unique `values`. Pixels outside the
+        stored alpha mask are set to `fill`. Returns None if the image is gone.
+        """
+        with self._lock:
+            entry = self._images.get(self._image_id(image_key, size))
+            if entry is None:
+                return None
+            inv = entry["inv"]
+            mask_bits = entry["mask_bits"]
+
+        width, height = size
+        full = np.asarray(values)[inv]
+        if dtype is not None:
+            full = full.astype(dtype, copy=False)
+        full = full.reshape(height, width)
+
+        if mask_bits is not None:
+            valid = np.unpackbits(mask_bits, count=inv.shape[0]).view(bool).reshape(height, width)
+            full[~valid] = fill
+
+        return full
+
+    # ------------------------------------------------------------------
+    # Scopes (one per color space)
+    # ------------------------------------------------------------------
+
+    def scope_items(self, scope):
+        """List (image_key, size, key, record) for every result stored under scope."""
+        with self._lock:
+            items = []
+            for (image_key, size), entry in self._images.items():
+                for (result_scope, key), record in entry["results"].items():
+                    if result_scope == scope:
+                        items.append((image_key, size, key, record))
+            return items
+
+    def drop_scope(self, scope):
+        with self._lock:
+            for entry in self._images.values():
+                for result_key in [k for k in entry["results"] if k[0] == scope]:
+                    self._drop_result(entry, result_key)
+
+    def clear_results(self):
+        """Drop every result but keep the per-image indices."""
+        with self._lock:
+            for entry in self._images.values():
+                for result_key in list(entry["results"]):
+                    self._drop_result(entry, result_key)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._nbytes = 0
+
+    # ------------------------------------------------------------------
+    # Budget
+    # ------------------------------------------------------------------
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def _evict(self):
+        # The most recently used image is always kept, even if it alone exceeds the budget
+        while self._nbytes > self.max_bytes and len(self._images) > 1:
+            _image_id, entry = self._images.popitem(last=False)
+            self._nbytes -= entry["nbytes"]
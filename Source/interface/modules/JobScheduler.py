@@ -0,0 +1,373 @@
+import os
+import time
+import queue
+import pickle
+import hashlib
+import itertools
+import threading
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+### my libraries ###
+from Source.core import instrumentation
+
+
+"""
+Module summary
+--------------
+Shared, bounded job scheduler for background work started by the GUI.
+
+It provides:
+    - A fixed pool of worker threads fed by a priority queue, so interactive jobs
+      (pixel inspection, detection) run before batch jobs (mapping) and the number
+      of concurrent jobs is bounded.
+    - Cooperative cancellation based on a threading.Event per job. Jobs cancelled
+      while queued are skipped; running jobs are expected to poll their event.
+    - An optional process pool for CPU-heavy kinds. `map_shared` publishes a large
+      shared object (e.g. a FuzzyColorSpace) once in shared memory; each worker
+      process reads it once and then maps a function over chunks of work, so
+      pure-Python kernels use every core. Workers are started with the "spawn"
+      method, since forking the threaded Tk process is not safe.
+"""
+
+
+# Lower values run first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BATCH = 20
+
+
+# Per-process cache of shared objects received through JobScheduler.map_shared
+_SHARED_CACHE = {}
+_SHARED_CACHE_SIZE = 2
+
+
+def _run_with_shared(fn, token, block_name, size, item):
+    """Process-pool entry point: resolve the shared object once per worker, then call fn."""
+    shared = _SHARED_CACHE.get(token)
+    if shared is None:
+        block = shared_memory.SharedMemory(name=block_name)
+        try:
+            shared = pickle.loads(bytes(block.buf[:size]))
+        finally:
+            block.close()
+        while len(_SHARED_CACHE) >= _SHARED_CACHE_SIZE:
+            _SHARED_CACHE.pop(next(iter(_SHARED_CACHE)))
+        _SHARED_CACHE[token] = shared
+    return fn(shared, item)
+
+
+class JobCancelled(Exception):
+    """Raised by JobScheduler.map_shared when the job is cancelled while waiting."""
+
+
+class Job:
+    def __init__(self, job_id, kind, priority, target, args, cancel_event):
+        """
+        Args:
+            job_id: Unique increasing id assigned by the scheduler.
+            kind: Free-form job kind, e.g. "color_mapping_all".
+            priority: Queue priority (lower runs first).
+            target: Callable executed on a worker thread.
+            args: Positional arguments for target.
+            cancel_event: threading.Event used for cooperative cancellation.
+        """
+        self.job_id = job_id
+        self.kind = kind
+        self.priority = priority
+        self.target = target
+        self.args = args
+        self.cancel_event = cancel_event
+        self.error = None
+        self.submitted_at = time.perf_counter()
+
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Request cancellation. Queued jobs are skipped, running jobs must poll."""
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def is_active(self):
+        """True while the job is queued or running and has not been cancelled."""
+        return not self.done() and not self.is_cancelled()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, fn):
+        """
+        Call fn(job) once the job has finished, failed or been skipped.
+        Callbacks run on the worker thread (or immediately if already done).
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self):
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception:
+                traceback.print_exc()
+
+
+class JobScheduler:
+    def __init__(self, max_workers=None, process_workers=None, process_kinds=()):
+        """
+        Args:
+            max_workers: Number of worker threads. Defaults to the CPU count (min 2).
+            process_workers: Size of the process pool used by map_shared.
+                Defaults to the CPU count. 0 disables the process pool.
+            process_kinds: Job kinds that should use the process pool for their
+                heavy kernels (see is_process_backed).
+        """
+        cpu_count = os.cpu_count() or 1
+
+        self.max_workers = max(1, int(max_workers or max(2, cpu_count)))
+        self.process_workers = cpu_count if process_workers is None else max(0, int(process_workers))
+        self.process_kinds = set(process_kinds)
+
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count(1)
+        self._threads = []
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+        self._process_pool = None
+        self._process_lock = threading.Lock()
+        # token -> [SharedMemory, number of map_shared calls using it]
+        self._shared_blocks = {}
+
+    # ------------------------------------------------------------------
+    # Thread jobs
+    # ------------------------------------------------------------------
+
+    def submit(self, target, *args, kind=None, priority=PRIORITY_NORMAL, cancel_event=None):
+        """
+        Queue target(*args) on the worker pool and return its Job handle.
+
+        If cancel_event is given it is used as the job's cancellation flag, so
+        callers can keep their existing cancel_event checks.
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("JobScheduler has been shut down.")
+
+            job_id = next(self._counter)
+            job = Job(
+                job_id,
+                kind,
+                priority,
+                target,
+                args,
+                cancel_event if cancel_event is not None else threading.Event()
+            )
+            self._jobs[job_id] = job
+            self._ensure_threads()
+
+        self._queue.put((priority, job_id, job))
+        return job
+
+    def _ensure_threads(self):
+        while len(self._threads) < self.max_workers:
+            th = threading.Thread(
+                target=self._worker_loop,
+                name=f"PyFCS-job-{len(self._threads) + 1}",
+                daemon=True
+            )
+            self._threads.append(th)
+            th.start()
+
+    def _worker_loop(self):
+        while True:
+            _priority, _job_id, job = self._queue.get()
+            if job is None:
+                return
+
+            try:
+                if not job.is_cancelled():
+                    instrumentation.record(f"job.{job.kind}.queued", time.perf_counter() - job.submitted_at)
+                    with instrumentation.stage(f"job.{job.kind}"):
+                        job.target(*job.args)
+            except JobCancelled:
+                pass
+            except Exception as e:
+                job.error = e
+                traceback.print_exc()
+            finally:
+                with self._lock:
+                    self._jobs.pop(job.job_id, None)
+                job._finish()
+
+    def active_jobs(self, kind=None):
+        """Return queued or running jobs that have not been cancelled."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in jobs if j.is_active() and (kind is None or j.kind == kind)]
+
+    def cancel_all(self, kind=None):
+        for job in self.active_jobs(kind):
+            job.cancel()
+
+    # ------------------------------------------------------------------
+    # Process-backed kernels
+    # ------------------------------------------------------------------
+
+    def is_process_backed(self, kind):
+        """True if jobs of this kind should push their heavy kernels to processes."""
+        # A single worker process only adds pickling overhead
+        return self.process_workers > 1 and kind in self.process_kinds
+
+    def _get_process_pool(self):
+        with self._process_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+    def _acquire_shared_block(self, token, payload):
+        """Return the shared-memory block holding payload, creating it on first use."""
+        with self._process_lock:
+            entry = self._shared_blocks.get(token)
+            if entry is None:
+                block = shared_memory.SharedMemory(create=True, size=len(payload))
+                block.buf[:len(payload)] = payload
+                entry = self._shared_blocks[token] = [block, 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _release_shared_block(self, token):
+        with self._process_lock:
+            entry = self._shared_blocks.get(token)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._shared_blocks[token]
+                entry[0].close()
+                entry[0].unlink()
+
+    def map(self, fn, *iterables, chunksize=1):
+        """
+        Compute list(map(fn, *iterables)) on the process pool.
+
+        fn must be a module-level function. Results keep the order of items.
+        """
+        return list(self._get_process_pool().map(fn, *iterables, chunksize=chunksize))
+
+    def map_shared(self, fn, shared, items, cancel_callback=None, progress_callback=None):
+        """
+        Compute [fn(shared, item) for item in items] on the process pool.
+
+        `shared` is pickled once per call into a shared-memory block and
+        unpickled once per worker process, so only the block name travels with
+        each item; fn must be a module-level function. Results keep the order of items.
+        Raises JobCancelled if cancel_callback() becomes True while waiting.
+        Runs serially in the calling thread when process_workers <= 1.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        if self.process_workers <= 1:
+            return self._map_serial(fn, shared, items, cancel_callback, progress_callback)
+
+        with instrumentation.stage("job.map_shared.pickle"):
+            payload = pickle.dumps(shared, protocol=pickle.HIGHEST_PROTOCOL)
+        instrumentation.count("job.map_shared.payload_bytes", len(payload))
+        token = hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+        pool = self._get_process_pool()
+        block = self._acquire_shared_block(token, payload)
+        pending = set()
+
+        try:
+            futures = {
+                pool.submit(_run_with_shared, fn, token, block.name, len(payload), item): i
+                for i, item in enumerate(items)
+            }
+
+            results = [None] * len(items)
+            pending = set(futures)
+            completed = 0
+
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    results[futures[future]] = future.result()
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, len(items))
+
+                if cancel_callback and cancel_callback():
+                    raise JobCancelled()
+        finally:
+            for future in pending:
+                future.cancel()
+            self._release_shared_block(token)
+
+        return results
+
+    @staticmethod
+    def _map_serial(fn, shared, items, cancel_callback=None, progress_callback=None):
+        """map_shared without a process pool: no pickling, same cancellation and progress."""
+        results = []
+        for item in items:
+            if cancel_callback and cancel_callback():
+                raise JobCancelled()
+            results.append(fn(shared, item))
+            if progress_callback:
+                progress_callback(len(results), len(items))
+        return results
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def shutdown(self, wait_threads=False):
+        """Cancel every job, stop the worker threads and the process pool."""
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            jobs = list(self._jobs.values())
+            threads = list(self._threads)
+
+        for job in jobs:
+            job.cancel()
+
+        for _ in threads:
+            self._queue.put((float("inf"), float("inf"), None))
+
+        with self._process_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+            for block, _users in self._shared_blocks.values():
+                block.close()
+                block.unlink()
+            self._shared_blocks.clear()
+
+        if wait_threads:
+            for th in threads:
+                th.join()
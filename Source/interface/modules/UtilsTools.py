@@ -1,5 +1,4 @@
 import os
-import sys
 import numpy as np
 from skimage import color
 import tkinter as tk
@@ -7,6 +6,8 @@ from tkinter import ttk, filedialog
 import colorsys
 
 ### my libraries ###
+from Source.core.paths import get_base_path
+from Source.core import labelmaps
 from Source.input_output.Input import Input
 from Source.geometry.Prototype import Prototype
 
@@ -29,21 +30,7 @@ and data preparation.
 #  PATH HELPERS
 # ============================================================================================================================================================
 
-def get_base_path():
-    """
-    Return the base directory of the application.
-
-    Behavior depends on how the application is executed:
-    - When running as a .py file -> returns the project root directory.
-    - When running as a frozen .exe, e.g. via PyInstaller -> returns the
-      directory containing the executable.
-    """
-    if getattr(sys, "frozen", False):
-        return os.path.dirname(sys.executable)
-
-    return os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "..", "..", "..")
-    )
+# get_base_path is defined in Source.core.paths (GUI-free) and re-exported here.
 
 
 # ============================================================================================================================================================
@@ -733,7 +720,7 @@ def prompt_file_selection(initial_subdir, parent=None):
 #  COLOR DATA HELPERS
 # ============================================================================================================================================================
 
-def process_prototypes(color_data):
+def process_prototypes(color_data, executor=None):
     """
     Create Prototype objects from parsed color data.
 
@@ -742,26 +729,23 @@ def process_prototypes(color_data):
     color_data : dict
         Dictionary mapping color names to their data, including
         'positive_prototype' and 'negative_prototypes'.
+    executor : JobScheduler, optional
+        Process pool reused for the parallel builds (see
+        Prototype.build_prototypes).
 
     Returns
     -------
     list
-        List of Prototype instances.
-    """
-    prototypes = []
-
-    for color_name, color_value in color_data.items():
-        positive_prototype = color_value["positive_prototype"]
-        negative_prototypes = color_value["negative_prototypes"]
-
-        prototype = Prototype(
-            label=color_name,
-            positive=positive_prototype,
-            negatives=negative_prototypes
-        )
-        prototypes.append(prototype)
-
-    return prototypes
+        List of Prototype instances, in the order of color_data. Large color
+        sets are built in parallel worker processes.
+    """
+    return Prototype.build_prototypes(
+        [
+            (color_name, color_value["positive_prototype"], color_value["negative_prototypes"])
+            for color_name, color_value in color_data.items()
+        ],
+        executor=executor
+    )
 
 
 def load_color_data(file_path):
@@ -934,24 +918,10 @@ def handle_image_selection(event, listbox, popup, images_names, callback):
 #  ALPHA / PIL IMAGE HELPERS
 # ============================================================================================================================================================
 
-def _get_alpha_mask_from_pil(pil_img):
-    """
-    Returns a boolean mask where True means valid visible pixel.
-    If the image has no alpha channel, all pixels are valid.
-    """
-    if pil_img.mode == "RGBA":
-        alpha = np.array(pil_img.getchannel("A"))
-        return alpha > 0
-
-    return np.ones((pil_img.height, pil_img.width), dtype=bool)
-
-
-def _pil_rgb_for_processing(pil_img):
-    """
-    Returns an RGB version for LAB processing.
-    Transparent pixels are kept as RGB but will be ignored using the alpha mask.
-    """
-    return pil_img.convert("RGB")
+# Alpha handling shared with the GUI-free label map helpers
+_get_alpha_mask_from_pil = labelmaps.alpha_mask_from_pil
+_pil_rgb_for_processing = labelmaps.rgb_for_processing
+_apply_alpha_to_rgb_array = labelmaps.apply_alpha_to_rgb_array
 
 
 def _apply_alpha_to_gray_array(gray_array, valid_mask):
@@ -968,17 +938,3 @@ def _apply_alpha_to_gray_array(gray_array, valid_mask):
     rgba[..., 3] = np.where(valid_mask, 255, 0).astype(np.uint8)
 
     return rgba
-
-
-def _apply_alpha_to_rgb_array(rgb_array, valid_mask):
-    """
-    Converts an RGB array into RGBA, using valid_mask as alpha.
-    Transparent pixels get alpha 0.
-    """
-    rgb = rgb_array.astype(np.uint8)
-
-    rgba = np.zeros((rgb.shape[0], rgb.shape[1], 4), dtype=np.uint8)
-    rgba[..., :3] = rgb
-    rgba[..., 3] = np.where(valid_mask, 255, 0).astype(np.uint8)
-
-    return rgba
\ No newline at end of file
@@ -1,4 +1,5 @@
 import numpy as np
+from matplotlib.colors import to_rgba
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import plotly.graph_objects as go
 import plotly.express as px
@@ -33,14 +34,25 @@ It provides:
     - Geometry helpers to:
         * Clip polygon faces to a bounding volume
         * Triangulate polygonal faces
+        * Build indexed (shared-vertex), optionally simplified volume meshes, cached per color space
         * Find display HEX colors from LAB coordinates
 """
 
 
+class _HexLookup(dict):
+    """{rounded LAB: "#rrggbb"} index built by VisualManager.hex_lookup."""
+
+
 class VisualManager:
     # Shared flag that can be used to control legend duplication across traces.
     SHOW_LEGENDS = True
 
+    # Vertex-clustering grid (LAB units) used to simplify exported volume meshes.
+    MESH_SIMPLIFY_TOLERANCE = 0.25
+
+    # From this many prototypes on, each volume layer is exported as a single merged trace.
+    MERGED_MESH_MIN_PROTOTYPES = 40
+
     # ============================================================================================================================================================
     #  GEOMETRY / COLOR HELPERS
     # ============================================================================================================================================================
@@ -83,6 +95,29 @@ class VisualManager:
         return tuple(np.round(np.asarray(lab, dtype=float).reshape(-1)[:3], 6))
 
 
+    @staticmethod
+    def hex_lookup(hex_color):
+        """
+        Index a {"#rrggbb": lab} mapping by rounded LAB, so each lookup is O(1).
+
+        Plotting functions call this once on their hex_color argument; passing
+        the result again (or to _find_hex_for_lab) does not rebuild it.
+        """
+        if isinstance(hex_color, _HexLookup):
+            return hex_color
+
+        lookup = _HexLookup()
+
+        if isinstance(hex_color, dict):
+            for hex_value, lab_value in hex_color.items():
+                try:
+                    lookup.setdefault(VisualManager._lab_key(lab_value), hex_value)
+                except Exception:
+                    continue
+
+        return lookup
+
+
     @staticmethod
     def _find_hex_for_lab(lab, hex_color, default="#000000"):
         """
@@ -92,20 +127,15 @@ class VisualManager:
             {
                 "#rrggbb": lab
             }
+        or as the index returned by hex_lookup (preferred inside loops).
         """
         if not isinstance(hex_color, dict):
             return default
 
-        target_key = VisualManager._lab_key(lab)
-
-        for hex_value, lab_value in hex_color.items():
-            try:
-                if VisualManager._lab_key(lab_value) == target_key:
-                    return hex_value
-            except Exception:
-                continue
-
-        return default
+        try:
+            return VisualManager.hex_lookup(hex_color).get(VisualManager._lab_key(lab), default)
+        except Exception:
+            return default
 
 
     @staticmethod
@@ -121,6 +151,91 @@ class VisualManager:
         return triangles
 
 
+    @staticmethod
+    def build_volume_mesh(volume, volume_limits, tolerance=0.0):
+        """
+        Indexed triangle mesh of a Voronoi volume in Plotly axis order (a*, b*, L*).
+
+        Faces are fan-triangulated and share their vertices. With tolerance > 0,
+        vertices falling in the same tolerance-sized grid cell are clustered
+        (vertex-clustering simplification) and degenerate triangles are dropped.
+
+        Returns
+        -------
+        (np.ndarray, np.ndarray)
+            float32 vertices (V, 3) and int32 triangles (T, 3), or (None, None).
+        """
+        polygons = []
+
+        for face in getattr(volume, "faces", None) or []:
+            try:
+                if face.infinity or face.vertex is None:
+                    continue
+
+                clipped = VisualManager.clip_face_to_volume(face.vertex, volume_limits)
+                if len(clipped) >= 3:
+                    polygons.append(clipped[:, [1, 2, 0]])
+            except Exception:
+                continue
+
+        if not polygons:
+            return None, None
+
+        points = np.concatenate(polygons)
+        sizes = np.array([len(polygon) for polygon in polygons])
+        starts = np.cumsum(sizes) - sizes
+
+        # Fan triangulation (same as _triangulate_face) as index triples
+        n_triangles = sizes - 2
+        fan_start = np.repeat(starts, n_triangles)
+        fan_step = np.arange(int(n_triangles.sum())) - np.repeat(np.cumsum(n_triangles) - n_triangles, n_triangles)
+        triangles = np.stack([fan_start, fan_start + fan_step + 1, fan_start + fan_step + 2], axis=1)
+
+        grid = tolerance if tolerance > 0 else 1e-6
+        keys = np.round(points / grid).astype(np.int64)
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        triangles = inverse.reshape(-1)[triangles]
+
+        keep = (
+            (triangles[:, 0] != triangles[:, 1])
+            & (triangles[:, 1] != triangles[:, 2])
+            & (triangles[:, 0] != triangles[:, 2])
+        )
+        triangles = triangles[keep]
+        if not len(triangles):
+            return None, None
+
+        used, triangles = np.unique(triangles, return_inverse=True)
+        vertices = points[first[used]]
+
+        return vertices.astype(np.float32), triangles.reshape(-1, 3).astype(np.int32)
+
+
+    @staticmethod
+    def get_volume_mesh(prototype, volume_limits, tolerance=0.0, fuzzy_color_space=None):
+        """
+        build_volume_mesh for a prototype's volume, cached on fuzzy_color_space when given.
+        """
+        volume = prototype.voronoi_volume
+
+        def build():
+            vertices, triangles = VisualManager.build_volume_mesh(volume, volume_limits, tolerance)
+            # Keep the volume referenced so its id() stays unique while cached
+            return volume, vertices, triangles
+
+        if fuzzy_color_space is None:
+            return build()[1:]
+
+        limits = None
+        if volume_limits is not None:
+            limits = tuple(
+                tuple(float(v) for v in comp)
+                for comp in (volume_limits.comp1, volume_limits.comp2, volume_limits.comp3)
+            )
+
+        return fuzzy_color_space.get_cached(("volume_mesh", id(volume), limits, float(tolerance)), build)[1:]
+
+
     @staticmethod
     def _safe_lab(lab):
         """
@@ -198,6 +313,91 @@ class VisualManager:
     #  EMBEDDED MATPLOTLIB 3D MODEL
     # ============================================================================================================================================================
 
+    @staticmethod
+    def _get_model_3d_scene(ax, volume_limits):
+        """
+        Persistent artists drawn by plot_combined_3D on this axis.
+
+        The scene is rebuilt whenever the axis has been cleared elsewhere
+        (ax.cla()) or the LAB limits changed.
+        """
+        limits_key = None
+        if volume_limits:
+            limits_key = (tuple(volume_limits.comp1), tuple(volume_limits.comp2), tuple(volume_limits.comp3))
+
+        scene = getattr(ax, "_pyfcs_scene", None)
+        if scene is not None:
+            collections = list(ax.collections)
+            alive = all(layer["collection"] in collections for layer in scene["layers"].values())
+            if not alive or scene["limits"] != limits_key:
+                scene = None
+
+        if scene is None:
+            scene = {"limits": limits_key, "layers": {}, "points": []}
+            ax._pyfcs_scene = scene
+
+        return scene
+
+
+    @staticmethod
+    def _build_model_3d_layer(option, prototypes, volume_limits, hex_for_lab):
+        """
+        One Poly3DCollection holding the faces of every prototype in the layer.
+
+        Face alphas are baked into the RGBA arrays (no collection-level alpha),
+        so a prototype can later be hidden by zeroing the alpha of its faces.
+        """
+        cache_attr = f"_cached_faces_{option.replace('-', '_')}"
+
+        all_faces = []
+        ranges = {}
+        face_rgba = []
+
+        for prototype in prototypes:
+            if not hasattr(prototype, cache_attr):
+                valid_faces = []
+
+                for face in prototype.voronoi_volume.faces:
+                    if face.infinity or face.vertex is None:
+                        continue
+
+                    clipped_face = VisualManager.clip_face_to_volume(
+                        face.vertex,
+                        volume_limits,
+                    )
+
+                    if len(clipped_face) >= 3:
+                        valid_faces.append(clipped_face[:, [1, 2, 0]])
+
+                setattr(prototype, cache_attr, valid_faces)
+
+            valid_faces = getattr(prototype, cache_attr)
+            rgba = to_rgba(hex_for_lab(prototype.positive))
+
+            start = len(all_faces)
+            all_faces.extend(valid_faces)
+            face_rgba.extend([rgba] * len(valid_faces))
+            ranges[id(prototype)] = (start, len(all_faces), prototype)
+
+        face_rgba = np.asarray(face_rgba, dtype=float).reshape(-1, 4)
+        edge_rgba = np.zeros_like(face_rgba)
+
+        collection = Poly3DCollection(
+            all_faces,
+            facecolors=face_rgba,
+            edgecolors=edge_rgba,
+            linewidths=0.5,
+        )
+
+        return {
+            "collection": collection,
+            "ranges": ranges,
+            "face_rgba": face_rgba,
+            "edge_rgba": edge_rgba,
+            "selection": None,
+        }
+
+
     @staticmethod
     def plot_combined_3D(
         ax,
@@ -215,9 +415,12 @@ class VisualManager:
         Draw the complete 3D model on an existing Axes3D instance.
 
         This function reuses the provided axis instead of creating a new figure
-        every time. That makes repeated updates much cheaper.
+        every time. Each volume layer is one persistent Poly3DCollection kept on
+        the axis: toggling a layer only changes its visibility, and changing the
+        selected prototypes only rewrites the face/edge alpha arrays. A layer is
+        rebuilt only when a selected prototype is not part of it yet.
         """
-        ax.cla()
+        scene = VisualManager._get_model_3d_scene(ax, volume_limits)
 
         data_map = {
             "Representative": color_data,
@@ -226,13 +429,17 @@ class VisualManager:
             "Support": support,
         }
 
-        def lab_to_key(lab):
-            return tuple(np.round(np.asarray(lab, dtype=float), 6))
+        hex_color = VisualManager.hex_lookup(hex_color)
 
-        inverse_hex_color = {
-            lab_to_key(lab_val): hex_key
-            for hex_key, lab_val in hex_color.items()
-        }
+        def hex_for_lab(lab):
+            return VisualManager._find_hex_for_lab(lab, hex_color)
+
+        # Point artists are cheap and depend on the selection: always redrawn
+        collections = list(ax.collections)
+        for artist in scene["points"]:
+            if artist in collections:
+                artist.remove()
+        scene["points"] = []
 
         filtered_points_arrays = {}
 
@@ -250,71 +457,67 @@ class VisualManager:
             if lab_values:
                 lab_array = np.asarray(lab_values, dtype=float)
 
-                colors = [
-                    inverse_hex_color.get(lab_to_key(lab), "#000000")
-                    for lab in lab_values
-                ]
-
-                ax.scatter(
-                    lab_array[:, 1],
-                    lab_array[:, 2],
-                    lab_array[:, 0],
-                    c=colors,
-                    s=30,
-                    edgecolor="k",
-                    linewidths=0.6,
-                    alpha=0.8,
-                    depthshade=False,
+                colors = [hex_for_lab(lab) for lab in lab_values]
+
+                scene["points"].append(
+                    ax.scatter(
+                        lab_array[:, 1],
+                        lab_array[:, 2],
+                        lab_array[:, 0],
+                        c=colors,
+                        s=30,
+                        edgecolor="k",
+                        linewidths=0.6,
+                        alpha=0.8,
+                        depthshade=False,
+                    )
                 )
 
         # ------------------------------------------------------------------
         # Fuzzy volumes and filtered points
         # ------------------------------------------------------------------
         for option in ("0.5-cut", "Core", "Support"):
-            if option not in selected_options:
-                continue
-
-            prototypes = data_map.get(option)
+            layer = scene["layers"].get(option)
+            prototypes = data_map.get(option) or []
 
-            if not prototypes:
+            if option not in selected_options:
+                if layer is not None:
+                    layer["collection"].set_visible(False)
                 continue
 
-            all_faces = []
-            all_facecolors = []
-            all_filtered_points = []
-
-            for prototype in prototypes:
-                color = inverse_hex_color.get(
-                    lab_to_key(prototype.positive),
-                    "#000000",
-                )
-
-                cache_attr = f"_cached_faces_{option.replace('-', '_')}"
+            if layer is not None and any(id(p) not in layer["ranges"] for p in prototypes):
+                layer["collection"].remove()
+                layer = None
 
-                if not hasattr(prototype, cache_attr):
-                    valid_faces = []
+            if layer is None:
+                if not prototypes:
+                    continue
+                layer = VisualManager._build_model_3d_layer(option, prototypes, volume_limits, hex_for_lab)
+                ax.add_collection3d(layer["collection"])
+                scene["layers"][option] = layer
 
-                    for face in prototype.voronoi_volume.faces:
-                        if face.infinity or face.vertex is None:
-                            continue
+            selection = tuple(id(p) for p in prototypes)
+            if selection != layer["selection"]:
+                face_alpha = np.zeros((len(layer["face_rgba"]),), dtype=float)
+                for prototype in prototypes:
+                    start, stop, _prototype = layer["ranges"][id(prototype)]
+                    face_alpha[start:stop] = 0.5
 
-                        clipped_face = VisualManager.clip_face_to_volume(
-                            face.vertex,
-                            volume_limits,
-                        )
+                face_rgba = layer["face_rgba"].copy()
+                face_rgba[:, 3] = face_alpha
+                edge_rgba = layer["edge_rgba"].copy()
+                edge_rgba[:, 3] = face_alpha
 
-                        if len(clipped_face) >= 3:
-                            valid_faces.append(clipped_face[:, [1, 2, 0]])
+                layer["collection"].set_facecolor(face_rgba)
+                layer["collection"].set_edgecolor(edge_rgba)
+                layer["selection"] = selection
 
-                    setattr(prototype, cache_attr, valid_faces)
+            layer["collection"].set_visible(True)
 
-                valid_faces = getattr(prototype, cache_attr)
-
-                for face_vertices in valid_faces:
-                    all_faces.append(face_vertices)
-                    all_facecolors.append(color)
+            all_filtered_points = []
 
-                if filtered_points_arrays:
+            if filtered_points_arrays:
+                for prototype in prototypes:
                     for _proto_name, points_array in filtered_points_arrays.items():
                         if len(points_array) == 0:
                             continue
@@ -328,29 +531,20 @@ class VisualManager:
                         if points_inside:
                             all_filtered_points.extend(points_inside)
 
-            if all_faces:
-                ax.add_collection3d(
-                    Poly3DCollection(
-                        all_faces,
-                        facecolors=all_facecolors,
-                        edgecolors="black",
-                        linewidths=0.5,
-                        alpha=0.5,
-                    )
-                )
-
             if all_filtered_points:
                 points_array = np.asarray(all_filtered_points, dtype=float)
 
-                ax.scatter(
-                    points_array[:, 1],
-                    points_array[:, 2],
-                    points_array[:, 0],
-                    c="red",
-                    marker="o",
-                    s=10,
-                    alpha=0.8,
-                    depthshade=False,
+                scene["points"].append(
+                    ax.scatter(
+                        points_array[:, 1],
+                        points_array[:, 2],
+                        points_array[:, 0],
+                        c="red",
+                        marker="o",
+                        s=10,
+                        alpha=0.8,
+                        depthshade=False,
+                    )
                 )
 
         # ------------------------------------------------------------------
@@ -463,6 +657,9 @@ class VisualManager:
         closest_label=None,
         closest_lab=None,
         closest_hex="#000000",
+        fuzzy_color_space=None,
+        merge_layers=None,
+        mesh_tolerance=None,
     ):
         """
         Generate a unified interactive Plotly 3D LAB figure.
@@ -476,7 +673,17 @@ class VisualManager:
         - Optional closest prototype is highlighted.
         - Optional custom-to-closest distance line can be toggled with a button.
         - Layout adapts its height when many colors are shown.
+
+        Volume meshes
+        -------------
+        - Each volume is an indexed mesh with shared vertices (build_volume_mesh),
+          simplified with mesh_tolerance (default MESH_SIMPLIFY_TOLERANCE) and
+          cached on fuzzy_color_space when it is given.
+        - With merge_layers (default: at least MERGED_MESH_MIN_PROTOTYPES
+          prototypes), each layer is one Mesh3d trace colored per vertex; the
+          per-color legend entries then no longer toggle the volumes.
         """
+        hex_color = VisualManager.hex_lookup(hex_color)
 
         fig = go.Figure()
 
@@ -672,45 +879,20 @@ class VisualManager:
             color_control_indices.append(trace_idx)
             legend_labels_added.add(label)
 
-        def _build_mesh_vertices_and_faces(prototype):
-            vertices = []
-            faces = []
+        if mesh_tolerance is None:
+            mesh_tolerance = VisualManager.MESH_SIMPLIFY_TOLERANCE
 
+        def _build_mesh_vertices_and_faces(prototype):
             try:
-                voronoi_faces = prototype.voronoi_volume.faces
+                return VisualManager.get_volume_mesh(
+                    prototype,
+                    volume_limits,
+                    tolerance=mesh_tolerance,
+                    fuzzy_color_space=fuzzy_color_space,
+                )
             except Exception:
                 return None, None
 
-            for face in voronoi_faces:
-                try:
-                    if face.infinity or face.vertex is None:
-                        continue
-
-                    clipped = VisualManager.clip_face_to_volume(
-                        face.vertex,
-                        volume_limits
-                    )
-
-                    if len(clipped) < 3:
-                        continue
-
-                    # Plotly axes: x=a*, y=b*, z=L*
-                    clipped = clipped[:, [1, 2, 0]]
-                    triangles = VisualManager._triangulate_face(clipped)
-
-                    for triangle in triangles:
-                        base_idx = len(vertices)
-                        vertices.extend(triangle)
-                        faces.append([base_idx, base_idx + 1, base_idx + 2])
-
-                except Exception:
-                    continue
-
-            if not vertices or not faces:
-                return None, None
-
-            return np.asarray(vertices, dtype=float), faces
-
         # ------------------------------------------------------------------
         # Legend anchors first.
         # ------------------------------------------------------------------
@@ -778,10 +960,28 @@ class VisualManager:
             "Support": support,
         }
 
+        mesh_lighting = dict(
+            ambient=0.58,
+            diffuse=0.72,
+            specular=0.18,
+            roughness=0.82,
+            fresnel=0.08,
+        )
+        mesh_lightposition = dict(
+            x=120,
+            y=160,
+            z=240,
+        )
+
+        if merge_layers is None:
+            merge_layers = max(len(p or []) for p in volume_sources.values()) >= VisualManager.MERGED_MESH_MIN_PROTOTYPES
+
         for layer_name, prototypes in volume_sources.items():
             if not prototypes:
                 continue
 
+            layer_meshes = []
+
             for prototype in prototypes:
                 try:
                     proto_label = _safe_label(prototype.label)
@@ -794,14 +994,69 @@ class VisualManager:
                 if vertices is None or faces is None:
                     continue
 
+                layer_meshes.append((proto_label, proto_hex, vertices, faces))
+
+            if not layer_meshes:
+                continue
+
+            if merge_layers:
+                # One trace for the whole layer; each vertex carries its prototype
+                # index as intensity, mapped to the prototype color by a stepped colorscale.
+                n_meshes = len(layer_meshes)
+                offsets = np.cumsum([0] + [len(mesh[2]) for mesh in layer_meshes[:-1]])
+
+                vertices = np.concatenate([mesh[2] for mesh in layer_meshes])
+                faces = np.concatenate([mesh[3] + offset for mesh, offset in zip(layer_meshes, offsets)])
+                intensity = np.repeat(
+                    np.arange(n_meshes, dtype=np.float32) + 0.5,
+                    [len(mesh[2]) for mesh in layer_meshes]
+                )
+
+                colorscale = []
+                for idx, mesh in enumerate(layer_meshes):
+                    colorscale.append([idx / n_meshes, mesh[1]])
+                    colorscale.append([(idx + 1) / n_meshes, mesh[1]])
+
+                fig.add_trace(
+                    go.Mesh3d(
+                        x=vertices[:, 0],
+                        y=vertices[:, 1],
+                        z=vertices[:, 2],
+                        i=faces[:, 0],
+                        j=faces[:, 1],
+                        k=faces[:, 2],
+                        intensity=intensity,
+                        intensitymode="vertex",
+                        colorscale=colorscale,
+                        cmin=0,
+                        cmax=n_meshes,
+                        showscale=False,
+                        opacity=_initial_opacity(layer_name),
+                        visible=True,
+                        name=layer_name,
+                        legendgroup=f"__{layer_name}__",
+                        showlegend=False,
+                        hoverinfo="skip",
+                        flatshading=True,
+                        lighting=mesh_lighting,
+                        lightposition=mesh_lightposition,
+                    )
+                )
+
+                trace_idx = len(fig.data) - 1
+                layer_indices[layer_name].append(trace_idx)
+                color_control_indices.append(trace_idx)
+                continue
+
+            for proto_label, proto_hex, vertices, faces in layer_meshes:
                 fig.add_trace(
                     go.Mesh3d(
                         x=vertices[:, 0],
                         y=vertices[:, 1],
                         z=vertices[:, 2],
-                        i=[face[0] for face in faces],
-                        j=[face[1] for face in faces],
-                        k=[face[2] for face in faces],
+                        i=faces[:, 0],
+                        j=faces[:, 1],
+                        k=faces[:, 2],
                         color=proto_hex,
                         opacity=_initial_opacity(layer_name),
                         visible=True,
@@ -809,19 +1064,9 @@ class VisualManager:
                         legendgroup=proto_label,
                         showlegend=False,
                         hoverinfo="skip",
-                        flatshading=False,
-                        lighting=dict(
-                            ambient=0.58,
-                            diffuse=0.72,
-                            specular=0.18,
-                            roughness=0.82,
-                            fresnel=0.08,
-                        ),
-                        lightposition=dict(
-                            x=120,
-                            y=160,
-                            z=240,
-                        ),
+                        flatshading=True,
+                        lighting=mesh_lighting,
+                        lightposition=mesh_lightposition,
                     )
                 )
 
@@ -1212,6 +1457,7 @@ class VisualManager:
         If custom and closest colors are available, they are highlighted and connected.
         The default interaction mode is pan instead of zoom.
         """
+        hex_color = VisualManager.hex_lookup(hex_color)
         fig = go.Figure()
 
         color_data = color_data or {}
@@ -1499,6 +1745,7 @@ class VisualManager:
         The default interaction mode is pan instead of zoom.
         If custom color is available, the closest prototype is inferred when needed.
         """
+        hex_color = VisualManager.hex_lookup(hex_color)
         fig = go.Figure()
 
         color_data = color_data or {}
@@ -1784,6 +2031,7 @@ class VisualManager:
         Works with or without a custom/sample color.
         If custom color is available, the closest prototype is inferred when needed.
         """
+        hex_color = VisualManager.hex_lookup(hex_color)
         fig = go.Figure()
 
         color_data = color_data or {}
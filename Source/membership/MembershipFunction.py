@@ -1,5 +1,6 @@
 from typing import Optional
 import math
+import numpy as np
 
 class MembershipFunction():
     def __init__(self, a: float = 0, b: float = 0, c: float = 0, name: Optional[str] = None):
@@ -14,29 +15,70 @@ class MembershipFunction():
         return self.dimension
 
     def getValue(self, o: object) -> float:
+        return self.evaluate_scalar(o, self.a, self.b, self.c)
+
+    @staticmethod
+    def evaluate_scalar(o: object, a: float, b: float, c: float) -> float:
+        """
+        Stateless form of getValue: membership of distance o for parameters
+        (a, b, c). Safe to call from several threads on a shared instance.
+        """
         x = float(o)
 
-        if not (math.isfinite(self.a) and math.isfinite(self.b) and math.isfinite(self.c)):
+        if not (math.isfinite(a) and math.isfinite(b) and math.isfinite(c)):
             return 0.0
 
-        if not (self.a <= self.b <= self.c):
+        if not (a <= b <= c):
             return 0.0
 
-        if x <= self.a:
+        if x <= a:
             return 1.0
-        if x > self.c:
+        if x > c:
             return 0.0
 
-        if self.a < x <= self.b:
-            denom = 2 * (self.b - self.a)
+        if a < x <= b:
+            denom = 2 * (b - a)
             if denom == 0:
                 return 1.0
-            return ((self.b - x) + (self.b - self.a)) / denom
+            return ((b - x) + (b - a)) / denom
         else:
-            denom = 2 * (self.c - self.b)
+            denom = 2 * (c - b)
             if denom == 0:
                 return 0.0
-            return (self.c - x) / denom
+            return (c - x) / denom
+
+    @staticmethod
+    def evaluate(d, a, b, c) -> np.ndarray:
+        """
+        Array form of evaluate_scalar. d, a, b and c are broadcast together and
+        the piecewise-linear membership is computed with np.select:
+
+            d <= a       -> 1
+            a < d <= b   -> ((b - d) + (b - a)) / (2 (b - a))    (1 .. 0.5)
+            b < d <= c   -> (c - d) / (2 (c - b))                (0.5 .. 0)
+            d > c        -> 0
+
+        Entries with non-finite parameters or a <= b <= c violated are 0.
+        Returns a float64 array with the broadcast shape.
+        """
+        d, a, b, c = np.broadcast_arrays(
+            np.asarray(d, dtype=np.float64),
+            np.asarray(a, dtype=np.float64),
+            np.asarray(b, dtype=np.float64),
+            np.asarray(c, dtype=np.float64),
+        )
+
+        valid = np.isfinite(a) & np.isfinite(b) & np.isfinite(c) & (a <= b) & (b <= c)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rising = ((b - d) + (b - a)) / (2 * (b - a))
+            falling = (c - d) / (2 * (c - b))
+
+        return np.select(
+            [~valid, d <= a, d > c, d <= b],
+            [0.0, 1.0, 0.0, rising],
+            default=falling
+        )
 
     def setParam(self, p: Optional[list]) -> None:
         if p is not None and len(p) == 3:
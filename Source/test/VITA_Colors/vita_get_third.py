@@ -19,7 +19,7 @@ pyfcs_dir = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
 sys.path.append(pyfcs_dir)
 
 ### my libraries ###
-from Source import Input, Prototype, FuzzyColorSpace
+from Source import Input, Prototype, FuzzyColorSpace, ImageManager
 from Source.input_output.utils import Utils
 
 
@@ -50,62 +50,40 @@ def process_image(img_path, fuzzy_color_space):
         return None
 
     lab_image = color.rgb2lab(image)  # Convert the image to LAB color space
-    membership_cache = {}  # Cache to store membership values for already processed colors
-    region_counts = [{}, {}, {}]  # Store membership degree sums for each region
-
-    # Define the boundaries for the 3x3 divisions
-    height_third = image.shape[0] // 3
-    width_third = image.shape[1] // 3
 
     # Define a threshold to exclude pixels close to black in the LAB space
     L_THRESHOLD = 20  # L value threshold for detecting black (lower values represent darker pixels)
     AB_THRESHOLD = 10  # a and b value threshold for detecting black (close to 0)
 
-    # Loop through the image pixels, focusing on the central column of each third
-    for y in range(image.shape[0]):
-        for x in range(image.shape[1]):
-            if width_third <= x < 2 * width_third:  # Only consider the central column
-                if y < height_third:
-                    region_idx = 0  # Region 1,1
-                elif height_third <= y < 2 * height_third:
-                    region_idx = 1  # Region 2,2
-                elif 2 * height_third <= y < image.shape[0]:
-                    region_idx = 2  # Region 3,3
-                else:
-                    continue  # Skip if not in any defined region
-
-                lab_color = tuple(lab_image[y, x])  # Get the color at the current pixel
-
-                # Create a mask to exclude pixels close to black
-                L, a, b = lab_color
-                if L < L_THRESHOLD and abs(a) < AB_THRESHOLD and abs(b) < AB_THRESHOLD:
-                    continue  # Skip pixel if it's close to black
-
-                # Check if the color's membership degrees are cached
-                if lab_color in membership_cache:
-                    membership_degrees = membership_cache[lab_color]  # Use cached values
-                else:
-                    membership_degrees = fuzzy_color_space.calculate_membership(lab_color)  # Calculate membership
-                    membership_cache[lab_color] = membership_degrees  # Cache the result
-
-                # Add the membership degrees to the corresponding region count
-                for name, degree in membership_degrees.items():
-                    if name in region_counts[region_idx]:
-                        region_counts[region_idx][name] += degree  # Accumulate the degree
-                    else:
-                        region_counts[region_idx][name] = degree  # Initialize the degree if not present
+    L, a, b = lab_image[..., 0], lab_image[..., 1], lab_image[..., 2]
+    valid_mask = ~((L < L_THRESHOLD) & (np.abs(a) < AB_THRESHOLD) & (np.abs(b) < AB_THRESHOLD))
+
+    # Central column of the 3x3 grid: regions 0, 1, 2 = top, middle, bottom
+    regions = ImageManager.grid_region_map(
+        image.shape[0], image.shape[1], rows=3, cols=3, cells=[(0, 1), (1, 1), (2, 1)]
+    )
+
+    # Membership of every pixel to every prototype, computed once per unique color
+    image_uint8 = np.round(image * 255.0).astype(np.uint8)
+    membership_stack = ImageManager().get_membership_stack(
+        image_uint8, fuzzy_color_space, valid_mask=valid_mask & (regions >= 0)
+    )
+
+    stats = ImageManager.region_statistics(
+        regions,
+        membership_stack=membership_stack,
+        valid_mask=valid_mask,
+        n_regions=3
+    )
+    labels = [p.label for p in fuzzy_color_space.get_prototypes()]
 
     # Store the results in a format suitable for saving to Excel
     region_results = {}
-    for region_idx, counts in enumerate(region_counts):
-        # Normalize the membership degrees so they sum to 1
-        total_degree = sum(counts.values())
-        if total_degree > 0:
-            normalized_counts = {k: v / total_degree for k, v in counts.items()}
-
+    for region_idx, normalized in enumerate(stats["membership_normalized"]):
+        if normalized.sum() > 0:
             # Sort the prototypes by degree, excluding "BLACK"
             sorted_prototypes = sorted(
-                {k: v for k, v in normalized_counts.items() if k != "BLACK"}.items(),
+                ((labels[p], float(normalized[p])) for p in range(len(labels)) if labels[p] != "BLACK"),
                 key=lambda item: item[1],  # Sort by degree value
                 reverse=True  # Sort in descending order
             )
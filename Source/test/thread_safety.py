@@ -0,0 +1,132 @@
+import os
+import sys
+import argparse
+import threading
+import numpy as np
+
+# Get the path to the directory containing PyFCS
+current_dir = os.path.dirname(__file__)
+pyfcs_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+
+# Add the PyFCS path to sys.path
+sys.path.append(pyfcs_dir)
+
+### my libraries ###
+from Source.core import Input
+
+
+"""
+Multi-threaded stress test for FuzzyColorSpace
+
+Loads a color space once, computes reference answers single-threaded, then lets
+many threads query one freshly loaded (not yet precomputed) space at the same
+time: scalar and batch memberships, best-prototype lookups, single-prototype
+memberships and display colors. A second thread keeps dropping the precomputed
+pack while they run. Every concurrent answer must equal the reference.
+
+    python Source/test/thread_safety.py [--space ISCC_NBS_BASIC] [--threads 8] [--colors 400]
+
+Exits with status 1 on the first mismatch.
+"""
+
+
+def load_space(name):
+    path = os.path.join(pyfcs_dir, 'fuzzy_color_spaces', f'{name}.fcs')
+    _color_data, fuzzy_color_space = Input.instance('.fcs').read_file(path)
+    return fuzzy_color_space
+
+
+def run_queries(fuzzy_color_space, colors, proto_index):
+    """All query kinds on `colors`, as plain comparable Python values."""
+    return {
+        'membership': [fuzzy_color_space.calculate_membership(tuple(c)) for c in colors],
+        'best': [fuzzy_color_space.best_prototype_index_from_lab(tuple(c)) for c in colors],
+        'proto': [fuzzy_color_space.calculate_membership_for_prototype(tuple(c), proto_index) for c in colors],
+        'membership_batch': fuzzy_color_space.calculate_membership_batch(colors).tolist(),
+        'best_batch': fuzzy_color_space.best_prototype_indices_from_lab(colors).tolist(),
+        'proto_batch': fuzzy_color_space.calculate_membership_for_prototype_batch(colors, proto_index).tolist(),
+        'hex': list(fuzzy_color_space.get_hex_colors()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent FuzzyColorSpace queries against single-threaded results.')
+    parser.add_argument('--space', default='ISCC_NBS_BASIC', help='Name of a .fcs file in fuzzy_color_spaces/.')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--colors', type=int, default=400, help='LAB colors queried per thread.')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    reference_space = load_space(args.space)
+    prototypes = reference_space.get_prototypes()
+
+    # Random colors plus every prototype (core hits) and midpoints (fuzzy borders)
+    positives = np.array([p.positive for p in prototypes], dtype=float)
+    random_lab = np.column_stack([
+        rng.uniform(0.0, 100.0, args.colors),
+        rng.uniform(-100.0, 100.0, args.colors),
+        rng.uniform(-100.0, 100.0, args.colors),
+    ])
+    midpoints = (positives + np.roll(positives, 1, axis=0)) / 2.0
+    all_colors = np.vstack([random_lab, positives, midpoints])
+
+    failures = []
+
+    for round_index in range(args.rounds):
+        # A fresh space each round, so the lazy precompute itself is raced
+        shared_space = load_space(args.space)
+        barrier = threading.Barrier(args.threads + 1)
+        stop = threading.Event()
+
+        tasks = []
+        for t in range(args.threads):
+            order = rng.permutation(all_colors.shape[0])[:args.colors]
+            tasks.append((all_colors[order], int(rng.integers(len(prototypes)))))
+
+        expected = [run_queries(reference_space, colors, proto_index) for colors, proto_index in tasks]
+        results = [None] * args.threads
+
+        def worker(t):
+            barrier.wait()
+            try:
+                results[t] = run_queries(shared_space, *tasks[t])
+            except Exception as e:
+                results[t] = e
+
+        def clear_pack():
+            barrier.wait()
+            while not stop.is_set():
+                shared_space.clear_precompute()
+                stop.wait(0.001)
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(args.threads)]
+        clearer = threading.Thread(target=clear_pack)
+        for th in threads + [clearer]:
+            th.start()
+        for th in threads:
+            th.join()
+        stop.set()
+        clearer.join()
+
+        for t in range(args.threads):
+            if isinstance(results[t], Exception):
+                failures.append(f'round {round_index}, thread {t}: {type(results[t]).__name__}: {results[t]}')
+                continue
+            for key, value in expected[t].items():
+                if results[t][key] != value:
+                    failures.append(f'round {round_index}, thread {t}: {key} differs from the single-threaded result')
+
+        print(f'Round {round_index + 1}/{args.rounds}: {args.threads} threads x {args.colors} colors checked')
+
+    if failures:
+        for failure in failures:
+            print('FAILED', failure)
+        return 1
+
+    print('All concurrent results match the single-threaded run.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
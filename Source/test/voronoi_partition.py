@@ -0,0 +1,139 @@
+import os
+import sys
+import argparse
+import numpy as np
+
+# Get the path to the directory containing PyFCS
+current_dir = os.path.dirname(__file__)
+pyfcs_dir = os.path.abspath(os.path.join(current_dir, '..', '..'))
+
+# Add the PyFCS path to sys.path
+sys.path.append(pyfcs_dir)
+
+### my libraries ###
+from Source.core import Input, Prototype, ReferenceDomain
+from Source.colorspace.ReferenceDomain import DEFAULT_VORONOI_BOUNDS
+from Source.geometry.Prototype import find_qvoronoi
+
+
+"""
+Nearest-site partition check for the Voronoi cell builders
+
+Builds the cell of every site of a color space (and of random site sets) with
+each available backend: the qvoronoi executable (if find_qvoronoi finds one),
+the in-process Delaunay ridges, and the direct bisector construction
+(build_volume_voronoi). Random LAB samples in the reference domain
+must lie in the cell of their nearest site and in no other cell.
+
+    python Source/test/voronoi_partition.py [--space BRUGUER-ACRYLIC] [--samples 20000] [--random-sets 3]
+
+Exits with status 1 if any backend misassigns a sample.
+"""
+
+
+def cell_from_ridges(positive, negatives, ridges):
+    """Clipped cell of `positive` from precomputed ridges, as Prototype.__init__ builds it."""
+    # A placeholder volume skips the build in __init__
+    prototype = Prototype('site', positive, negatives, voronoi_volume=ReferenceDomain.default_voronoi_reference_domain().get_volume())
+    prototype.voronoi_output = ridges
+    domain_volume = ReferenceDomain.default_voronoi_reference_domain().get_volume()
+    return Prototype._clip_volume_to_domain(prototype.read_voronoi_output(), domain_volume)
+
+
+def backends():
+    """(name, fn(positive, negatives) -> clipped cell) for every available builder."""
+    def qvoronoi(positive, negatives):
+        prototype = Prototype('site', positive, negatives, voronoi_volume=ReferenceDomain.default_voronoi_reference_domain().get_volume())
+        if not prototype.run_qvoronoi():
+            raise RuntimeError('Error running qvoronoi')
+        domain_volume = ReferenceDomain.default_voronoi_reference_domain().get_volume()
+        return Prototype._clip_volume_to_domain(prototype.read_voronoi_output(), domain_volume)
+
+    def delaunay(positive, negatives):
+        points = np.vstack((positive, negatives))
+        return cell_from_ridges(positive, negatives, Prototype._voronoi_ridges_in_process(points))
+
+    found = [('qvoronoi', qvoronoi)] if find_qvoronoi() is not None else []
+    return found + [
+        ('delaunay', delaunay),
+        ('direct', Prototype.build_volume_voronoi),
+    ]
+
+
+def inside(points, volume, margin):
+    """Points on the representative's side of every face, widened by margin (LAB units)."""
+    rep = volume.getRepresentative()
+    result = np.ones((points.shape[0],), dtype=bool)
+
+    for face in volume.getFaces():
+        plane = face.getPlane()
+        normal = np.array([plane.A, plane.B, plane.C], dtype=float)
+        scale = np.linalg.norm(normal)
+        s_rep = plane.evaluatePoint(rep)
+        s_xyz = (points @ normal + plane.D) * np.sign(s_rep) / scale
+        result &= s_xyz >= -margin
+
+    return result
+
+
+def misassigned(sites, build, samples, tol):
+    """Samples inside the cell of a site that is more than tol farther than the nearest one."""
+    distances = np.linalg.norm(samples[:, None, :] - sites[None, :, :], axis=2)
+    nearest = distances.min(axis=1)
+
+    wrong = np.zeros((samples.shape[0],), dtype=bool)
+    worst = 0.0
+    for k in range(sites.shape[0]):
+        cell = build(sites[k], np.delete(sites, k, axis=0))
+        extra = distances[:, k] - nearest
+        hit = inside(samples, cell, tol) & (extra > tol)
+        wrong |= hit
+        if np.any(hit):
+            worst = max(worst, float(extra[hit].max()))
+
+    return int(np.count_nonzero(wrong)), worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that Voronoi cells partition LAB by nearest site.')
+    parser.add_argument('--space', default='BRUGUER-ACRYLIC', help='Name of a .cns file in fuzzy_color_spaces/cns/.')
+    parser.add_argument('--samples', type=int, default=20000, help='Random LAB samples per site set.')
+    parser.add_argument('--random-sets', type=int, default=3, help='Random 30-site sets checked besides the space.')
+    parser.add_argument('--tol', type=float, default=1e-4, help='Distance tolerance in LAB units.')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    low = np.array(DEFAULT_VORONOI_BOUNDS[0::2], dtype=float)
+    high = np.array(DEFAULT_VORONOI_BOUNDS[1::2], dtype=float)
+
+    path = os.path.join(pyfcs_dir, 'fuzzy_color_spaces', 'cns', f'{args.space}.cns')
+    color_data = Input.instance('.cns').read_file(path)
+    site_sets = [(args.space, np.asarray([c['positive_prototype'] for c in color_data.values()], dtype=float))]
+    site_sets += [
+        (f'random {n + 1}', rng.uniform(low + 10.0, high - 10.0, (30, 3)))
+        for n in range(args.random_sets)
+    ]
+
+    failures = []
+
+    for set_name, sites in site_sets:
+        samples = rng.uniform(low, high, (args.samples, 3))
+
+        for backend_name, build in backends():
+            count, worst = misassigned(sites, build, samples, args.tol)
+            print(f'{set_name} / {backend_name}: {len(sites)} sites, {count} misassigned samples'
+                  + (f' (up to {worst:.2f} farther than the nearest site)' if count else ''))
+            if count:
+                failures.append(f'{set_name} / {backend_name}')
+
+    if failures:
+        for failure in failures:
+            print('FAILED', failure)
+        return 1
+
+    print('Every cell holds exactly the samples nearest to its site.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+
+"""
+Import-time benchmark for PyFCS
+
+Measures, in a fresh interpreter per sample, how long the core entry points take
+to import (python -X importtime, cumulative microseconds) and checks that none
+of them loads the GUI stack. Run from the project root:
+
+    python benchmarks/bench_import_time.py [--repeat 5] [--budget-ms 1000] [--json out.json]
+
+Exits with status 1 if a core module imports a GUI library or exceeds the budget.
+"""
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CORE_MODULES = [
+    "Source",
+    "Source.core",
+    "Source.membership.MembershipFunction",
+    "Source.geometry.Prototype",
+    "Source.fuzzy.FuzzyColorSpace",
+    "Source.input_output.InputCNS",
+    "Source.input_output.InputFCS",
+]
+
+# Reported for reference only; these are expected to be slow
+GUI_MODULES = [
+    "Source.interface.modules.ImageManager",
+    "Source.interface.modules.VisualManager",
+]
+
+FORBIDDEN_MODULES = ("tkinter", "matplotlib", "plotly", "sklearn", "pandas")
+
+_PROBE = (
+    "import sys, json, {module}; "
+    "print(json.dumps([m for m in {forbidden!r} if m in sys.modules]))"
+)
+
+
+def measure_import(module, repeat=5):
+    """
+    Return (best cumulative import time in ms, forbidden modules loaded).
+    """
+    best_us = None
+    loaded = []
+    pattern = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*" + re.escape(module) + r"\s*$")
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+
+    for _ in range(max(1, repeat)):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        cumulative = [int(m.group(1)) for m in map(pattern.match, result.stderr.splitlines()) if m]
+        if cumulative:
+            best_us = cumulative[-1] if best_us is None else min(best_us, cumulative[-1])
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+
+    return (best_us or 0) / 1000.0, loaded
+
+
+def run(repeat=5, budget_ms=1000.0, include_gui=False):
+    results = []
+
+    for module in CORE_MODULES + (GUI_MODULES if include_gui else []):
+        ms, loaded = measure_import(module, repeat)
+        core = module in CORE_MODULES
+        results.append({
+            "module": module,
+            "core": core,
+            "import_ms": round(ms, 2),
+            "gui_modules_loaded": loaded,
+            "ok": (not core) or (not loaded and ms <= budget_ms),
+        })
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure PyFCS import times.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (best is kept).")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Maximum import time of each core module.")
+    parser.add_argument("--gui", action="store_true", help="Also report GUI modules.")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.budget_ms, args.gui)
+
+    for item in results:
+        status = "ok" if item["ok"] else "FAIL"
+        extra = f"  loads {', '.join(item['gui_modules_loaded'])}" if item["gui_modules_loaded"] else ""
+        print(f"{item['module']:45s} {item['import_ms']:9.1f} ms  {status}{extra}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"budget_ms": args.budget_ms, "results": results}, f, indent=2)
+
+    return 0 if all(item["ok"] for item in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import os
+import tempfile
+import functools
+import numpy as np
+from PIL import Image
+
+
+"""
+Benchmark cases for PyFCS
+
+Each case is registered with @case and returns, from its setup, a zero-argument
+callable that runs the measured work once. Cases only use data bundled with the
+repository (fuzzy_color_spaces/ and image_test/) and fixed random seeds, so runs
+are comparable across commits and machines.
+
+The cases are shared by two entry points:
+    - benchmarks/run_benchmarks.py: standalone runner writing JSON results.
+    - benchmarks/test_benchmarks.py: the same cases for pytest-benchmark.
+"""
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FCS_DIR = os.path.join(ROOT, "fuzzy_color_spaces")
+CNS_DIR = os.path.join(FCS_DIR, "cns")
+IMAGE_DIR = os.path.join(ROOT, "image_test")
+
+CASES = []
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a setup when the case cannot run in this environment."""
+
+
+class Case:
+    def __init__(self, name, group, setup, units=1, unit="call"):
+        """
+        Args:
+            name: Unique case name, e.g. "load_fcs[ISCC_NBS_BASIC]".
+            group: Benchmark group (io, geometry, membership, image, delta_e, evaluation).
+            setup: Callable returning the measured zero-argument callable.
+            units: Work items processed per call, used to report throughput.
+            unit: Name of a work item ("color", "pixel", "pair"...).
+        """
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.units = units
+        self.unit = unit
+
+
+def case(group, name, units=1, unit="call"):
+    def register(setup):
+        CASES.append(Case(name, group, setup, units, unit))
+        return setup
+    return register
+
+
+# ============================================================================================================================================================
+#  SHARED DATA
+# ============================================================================================================================================================
+
+@functools.lru_cache(maxsize=None)
+def load_space(name):
+    from Source.input_output.Input import Input
+
+    _color_data, fuzzy_color_space = Input.instance(".fcs").read_file(os.path.join(FCS_DIR, f"{name}.fcs"))
+    fuzzy_color_space.precompute_pack()
+    return fuzzy_color_space
+
+
+def random_lab(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(5.0, 95.0, n),
+        rng.uniform(-80.0, 80.0, n),
+        rng.uniform(-80.0, 80.0, n),
+    ])
+
+
+@functools.lru_cache(maxsize=None)
+def load_image(name, size):
+    """Bundled test image as RGB, resized to `size` so pixel counts are fixed."""
+    img = Image.open(os.path.join(IMAGE_DIR, name)).convert("RGB")
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+# ============================================================================================================================================================
+#  I/O
+# ============================================================================================================================================================
+
+def _register_io_cases():
+    for name in ("ISCC_NBS_BASIC", "ISCC_NBS_COMPLETE"):
+        @case("io", f"load_fcs[{name}]")
+        def setup_load_fcs(name=name):
+            from Source.input_output.Input import Input
+            path = os.path.join(FCS_DIR, f"{name}.fcs")
+            return lambda: Input.instance(".fcs").read_file(path)
+
+        @case("io", f"read_color_table[{name}]")
+        def setup_color_table(name=name):
+            from Source.input_output.Input import Input
+            path = os.path.join(FCS_DIR, f"{name}.fcs")
+            return lambda: Input.instance(".fcs").read_color_table(path)
+
+        @case("io", f"load_cns[{name}]")
+        def setup_load_cns(name=name):
+            from Source.input_output.Input import Input
+            path = os.path.join(CNS_DIR, f"{name}.cns")
+            return lambda: Input.instance(".cns").read_file(path)
+
+
+_register_io_cases()
+
+
+# ============================================================================================================================================================
+#  GEOMETRY
+# ============================================================================================================================================================
+
+def _register_geometry_cases():
+    for n_prototypes in (8, 16, 32, 64):
+        @case("geometry", f"build_space[n={n_prototypes}]", units=n_prototypes, unit="prototype")
+        def setup_build_space(n_prototypes=n_prototypes):
+            from Source.geometry.Prototype import Prototype
+            from Source.fuzzy.FuzzyColorSpace import FuzzyColorSpace
+
+            positives = random_lab(n_prototypes, seed=n_prototypes)
+
+            def build():
+                prototypes = [
+                    Prototype(f"c{i}", positives[i], np.delete(positives, i, axis=0))
+                    for i in range(n_prototypes)
+                ]
+                return FuzzyColorSpace(f"bench_{n_prototypes}", prototypes)
+
+            # Voronoi construction may depend on an external tool (qvoronoi)
+            try:
+                build()
+            except Exception as e:
+                raise BenchmarkSkipped(f"{type(e).__name__}: {e}")
+
+            return build
+
+
+_register_geometry_cases()
+
+
+# ============================================================================================================================================================
+#  MEMBERSHIP
+# ============================================================================================================================================================
+
+MEMBERSHIP_COLORS = 200
+
+
+@case("membership", "membership_scalar[ISCC_NBS_BASIC]", units=MEMBERSHIP_COLORS, unit="color")
+def setup_membership_scalar():
+    fuzzy_color_space = load_space("ISCC_NBS_BASIC")
+    colors = [tuple(lab) for lab in random_lab(MEMBERSHIP_COLORS, seed=1)]
+    return lambda: [fuzzy_color_space.calculate_membership(lab) for lab in colors]
+
+
+@case("membership", "best_prototype[ISCC_NBS_COMPLETE]", units=MEMBERSHIP_COLORS, unit="color")
+def setup_best_prototype():
+    fuzzy_color_space = load_space("ISCC_NBS_COMPLETE")
+    colors = [tuple(lab) for lab in random_lab(MEMBERSHIP_COLORS, seed=2)]
+    return lambda: [fuzzy_color_space.best_prototype_index_from_lab(lab) for lab in colors]
+
+
+@case("membership", "membership_batch[ISCC_NBS_BASIC]", units=MEMBERSHIP_COLORS, unit="color")
+def setup_membership_batch():
+    fuzzy_color_space = load_space("ISCC_NBS_BASIC")
+    colors = random_lab(MEMBERSHIP_COLORS, seed=1)
+    return lambda: fuzzy_color_space.calculate_membership_batch(colors)
+
+
+@case("membership", "best_prototype_batch[ISCC_NBS_COMPLETE]", units=MEMBERSHIP_COLORS, unit="color")
+def setup_best_prototype_batch():
+    fuzzy_color_space = load_space("ISCC_NBS_COMPLETE")
+    colors = random_lab(MEMBERSHIP_COLORS, seed=2)
+    return lambda: fuzzy_color_space.best_prototype_indices_from_lab(colors)
+
+
+@case("membership", "membership_stack[ISCC_NBS_BASIC, 64x64]", units=64 * 64, unit="pixel")
+def setup_membership_stack():
+    from Source.interface.modules.ImageManager import ImageManager
+
+    fuzzy_color_space = load_space("ISCC_NBS_BASIC")
+    image = load_image("orange.jpg", (64, 64)).copy()
+    image_manager = ImageManager()
+    return lambda: image_manager.get_membership_stack(image, fuzzy_color_space)
+
+
+# ============================================================================================================================================================
+#  IMAGE MAPPING
+# ============================================================================================================================================================
+
+LABEL_MAP_SIZE = (400, 250)
+
+
+@case("image", "label_map[ISCC_NBS_BASIC, orange.jpg]", units=LABEL_MAP_SIZE[0] * LABEL_MAP_SIZE[1], unit="pixel")
+def setup_label_map():
+    from Source.interface.modules.ImageManager import ImageManager
+
+    fuzzy_color_space = load_space("ISCC_NBS_BASIC")
+    image = load_image("orange.jpg", LABEL_MAP_SIZE).copy()
+    image_manager = ImageManager()
+    return lambda: image_manager.get_best_prototype_label_map(image, fuzzy_color_space)
+
+
+# ============================================================================================================================================================
+#  DELTA E
+# ============================================================================================================================================================
+
+DELTA_E_PAIRS = 2000
+
+
+def _register_delta_e_cases():
+    for metric in ("CIEDE2000", "CIE76", "CIE94 Graphic Arts", "CMC 2:1"):
+        @case("delta_e", f"delta_e[{metric}]", units=DELTA_E_PAIRS, unit="pair")
+        def setup_delta_e(metric=metric):
+            from Source.interface.modules.ColorEvaluationManager import ColorEvaluationManager
+
+            first = [tuple(lab) for lab in random_lab(DELTA_E_PAIRS, seed=3)]
+            second = [tuple(lab) for lab in random_lab(DELTA_E_PAIRS, seed=4)]
+            return lambda: [
+                ColorEvaluationManager.calculate_metric_value(a, b, metric)
+                for a, b in zip(first, second)
+            ]
+
+
+_register_delta_e_cases()
+
+
+# ============================================================================================================================================================
+#  COLOR EVALUATION
+# ============================================================================================================================================================
+
+@case("evaluation", "filter_points_with_threshold[ISCC_NBS_BASIC, 3 cores]", units=3, unit="prototype")
+def setup_filter_points():
+    from Source.interface.modules.ColorEvaluationManager import ColorEvaluationManager
+
+    fuzzy_color_space = load_space("ISCC_NBS_BASIC")
+    manager = ColorEvaluationManager(output_dir=os.path.join(tempfile.gettempdir(), "pyfcs_benchmarks"))
+    volumes = fuzzy_color_space.get_cores()[:3]
+    return lambda: manager.filter_points_with_threshold(volumes, threshold=3.0, step=0.5)
+
+
+CASES_BY_NAME = {c.name: c for c in CASES}
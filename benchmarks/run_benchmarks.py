@@ -0,0 +1,162 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+### my libraries ###
+from benchmarks.cases import CASES, ROOT, BenchmarkSkipped
+
+
+"""
+Benchmark runner for PyFCS
+
+Runs the cases in benchmarks/cases.py (I/O, geometry construction, membership,
+label maps, ΔE kernels, color evaluation) with only the standard library and
+writes machine-readable results. Run from the project root:
+
+    python benchmarks/run_benchmarks.py [--filter REGEX] [--quick] [--json out.json]
+    python benchmarks/run_benchmarks.py --compare baseline.json [--fail-above 1.25]
+
+Each case is timed `--repeat` times after one warm-up call; min / median / mean
+seconds and throughput (work items per second) are reported. With --compare,
+cases whose median is more than --fail-above times the baseline median are
+reported as regressions and the exit status is 1.
+
+The same cases run under pytest-benchmark with:
+
+    python -m pytest benchmarks --benchmark-only --benchmark-json out.json
+"""
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except Exception:
+        return None
+
+
+def run_case(case, repeat, min_time):
+    """
+    Time one case. Returns a result dict (with "skipped" set if it cannot run).
+    """
+    try:
+        fn = case.setup()
+    except BenchmarkSkipped as e:
+        return {"name": case.name, "group": case.group, "skipped": str(e)}
+
+    # Warm-up (lazy imports, precompute packs, caches)
+    fn()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat or (time.perf_counter() - started < min_time and len(samples) < 10 * repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+
+    median = statistics.median(samples)
+    return {
+        "name": case.name,
+        "group": case.group,
+        "samples": len(samples),
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "units": case.units,
+        "unit": case.unit,
+        "throughput": case.units / median if median > 0 else None,
+    }
+
+
+def compare(results, baseline, fail_above):
+    """Return [(name, baseline_median, median, ratio)] for regressions above fail_above."""
+    previous = {r["name"]: r for r in baseline.get("results", []) if "median" in r}
+    regressions = []
+
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None or "median" not in result or old["median"] <= 0:
+            continue
+        ratio = result["median"] / old["median"]
+        result["baseline_median"] = old["median"]
+        result["ratio"] = ratio
+        if ratio > fail_above:
+            regressions.append((result["name"], old["median"], result["median"], ratio))
+
+    return regressions
+
+
+def format_result(result):
+    if "skipped" in result:
+        return f"{result['name']:<55} skipped ({result['skipped']})"
+
+    line = (
+        f"{result['name']:<55} median {result['median'] * 1000:10.2f} ms"
+        f"  min {result['min'] * 1000:10.2f} ms"
+    )
+    if result["throughput"] is not None and result["unit"] != "call":
+        line += f"  {result['throughput']:12,.0f} {result['unit']}/s"
+    if "ratio" in result:
+        line += f"  x{result['ratio']:.2f} vs baseline"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the PyFCS benchmark suite.")
+    parser.add_argument("--filter", default=None, help="Only run cases whose name or group matches this regex.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per case (default: 5).")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Keep sampling until this many seconds (default: 0.5).")
+    parser.add_argument("--quick", action="store_true", help="Single timed call per case, for smoke runs.")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file.")
+    parser.add_argument("--compare", default=None, help="Baseline JSON written by a previous run.")
+    parser.add_argument("--fail-above", type=float, default=1.25, help="Regression threshold for --compare (default: 1.25).")
+    args = parser.parse_args(argv)
+
+    repeat, min_time = (1, 0.0) if args.quick else (max(1, args.repeat), args.min_time)
+    pattern = re.compile(args.filter) if args.filter else None
+
+    results = []
+    for case in CASES:
+        if pattern is not None and not (pattern.search(case.name) or pattern.search(case.group)):
+            continue
+        result = run_case(case, repeat, min_time)
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.fail_above)
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    for name, old, new, ratio in regressions:
+        print(f"REGRESSION {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms (x{ratio:.2f})", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+### my libraries ###
+from benchmarks.cases import CASES, BenchmarkSkipped
+
+
+"""
+pytest-benchmark entry point for the cases in benchmarks/cases.py
+
+    python -m pytest benchmarks --benchmark-only --benchmark-json out.json
+    python -m pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=median:25%
+"""
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c.name for c in CASES])
+def test_benchmark(benchmark, case):
+    try:
+        fn = case.setup()
+    except BenchmarkSkipped as e:
+        pytest.skip(str(e))
+
+    benchmark.group = case.group
+    benchmark.extra_info.update({"units": case.units, "unit": case.unit})
+    benchmark(fn)